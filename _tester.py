@@ -1,17 +1,47 @@
 import requests
-from bs4 import BeautifulSoup
 import json
 import os
 import re
 from time import sleep
 from urllib.parse import urlparse
 
+from bs4.element import Tag
+
+from html_parsing import SelectorSet, declared_encoding, make_soup
+from http_client import fetch, get_session
+
+# Common selectors for event items, most specific first; the first one that matches wins
+EVENT_SELECTORS = SelectorSet([
+    '.event', '.event-item', '.event-listing', '.event-list li',
+    '.listing .item', '.list-item', '.card.event', 'article.event'
+])
+
+# Reported as the matched selector when no EVENT_SELECTORS entry matched and list items were used
+FALLBACK_SELECTOR = 'main li'
+
+DATE_RE = re.compile(r'\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\w*\s+\d{1,2}(?:,\s*\d{4})?')
+
+# Tags an item is searched for; only the first of each is used
+_ITEM_TAGS = frozenset(('h1', 'h2', 'h3', 'h4', 'a', 'time', 'p'))
+
 
 def _sanitize_filename(s: str) -> str:
     return re.sub(r'[^A-Za-z0-9_.-]', '_', s)
 
 
-def scrape_centennial(url: str, session: requests.Session = None, max_items: int = 200):
+def _first_tags(el) -> dict:
+    """Map each name in _ITEM_TAGS to its first occurrence under ``el``, in one walk."""
+    first = {}
+    for tag in el.descendants:
+        if isinstance(tag, Tag) and tag.name in _ITEM_TAGS and tag.name not in first:
+            first[tag.name] = tag
+            if len(first) == len(_ITEM_TAGS):
+                break
+    return first
+
+
+def scrape_centennial(url: str, session: requests.Session = None, max_items: int = 200, parser: str = None,
+                      with_selector: bool = False):
     """Fetch a page and try to extract event-like items for a Centennial/homecoming page.
 
     This is intentionally conservative and generic: it looks for common event containers
@@ -19,67 +49,91 @@ def scrape_centennial(url: str, session: requests.Session = None, max_items: int
 
     Returns a list of dicts with keys: title, date, description, url
     Saves results to DataSets/Centennial_<host>.json and returns the list.
+    Uses the shared keep-alive session unless one is passed in, and the
+    ELK_PARSER_BACKEND parser unless ``parser`` names another.
+    With ``with_selector``, returns ``(selector, results)`` as parse_centennial_items does.
     """
     if session is None:
-        session = requests.Session()
+        session = get_session()
 
     headers = {
         'User-Agent': 'Mozilla/5.0 (compatible; CentennialTester/1.0; +https://example.com)'
     }
 
-    resp = session.get(url, headers=headers, timeout=15)
+    # fetch rather than session.get, so the page lands in the archive when one is configured
+    resp = fetch(url, session=session, headers=headers, timeout=15)
     resp.raise_for_status()
 
-    soup = BeautifulSoup(resp.text, 'html.parser')
+    selector, results = parse_centennial_items(
+        resp.content, url, max_items, parser, declared_encoding(resp), with_selector=True)
 
-    # Try common selectors for event items
-    selectors = [
-        '.event', '.event-item', '.event-listing', '.event-list li',
-        '.listing .item', '.list-item', '.card.event', 'article.event'
-    ]
+    # Save output
+    parsed = urlparse(url)
+    host = parsed.netloc.replace(':', '_')
+    if not os.path.exists('DataSets'):
+        os.makedirs('DataSets')
 
-    items = []
-    for sel in selectors:
-        found = soup.select(sel)
-        if found:
-            items = found
-            break
+    out_file = os.path.join('DataSets', f'Centennial_{_sanitize_filename(host)}.json')
+    with open(out_file, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+
+    if with_selector:
+        return selector, results
+    return results
+
+
+def parse_centennial_items(html, url: str, max_items: int = 200, parser: str = None, encoding: str = None,
+                           with_selector: bool = False):
+    """Extract the event-like items of a page already fetched from ``url``.
+
+    This is the parsing half of scrape_centennial, with no network or file
+    access, so archived pages can be run through it again.
+    With ``with_selector``, returns ``(selector, results)``, where ``selector``
+    is the EVENT_SELECTORS entry that matched, FALLBACK_SELECTOR when list
+    items were used instead, or None when nothing was found.
+    """
+    soup = make_soup(html, parser, encoding=encoding)
+
+    selector, items = EVENT_SELECTORS.first_match(soup, limit=max_items)
 
     # fallback: find list items in main content
     if not items:
         main = soup.find('main') or soup.find(id='content') or soup
-        items = main.find_all('li')[:max_items]
+        items = main.find_all('li', limit=max_items)
+        selector = FALLBACK_SELECTOR if items else None
 
     results = []
     for el in items[:max_items]:
+        first = _first_tags(el)
+
         # title: prefer headings or link text
         title = None
         for tag in ('h1', 'h2', 'h3', 'h4'):
-            t = el.find(tag)
+            t = first.get(tag)
             if t and t.get_text(strip=True):
                 title = t.get_text(strip=True)
                 break
 
+        link = first.get('a')
         if not title:
-            a = el.find('a')
-            if a and a.get_text(strip=True):
-                title = a.get_text(strip=True)
+            if link and link.get_text(strip=True):
+                title = link.get_text(strip=True)
 
         text = el.get_text(separator=' ', strip=True)
 
         # date: look for time tag or date-like patterns
         date = None
-        time_tag = el.find('time')
+        time_tag = first.get('time')
         if time_tag and time_tag.get_text(strip=True):
             date = time_tag.get_text(strip=True)
         else:
-            m = re.search(r'\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\w*\s+\d{1,2}(?:,\s*\d{4})?', text)
+            m = DATE_RE.search(text)
             if m:
                 date = m.group(0)
 
         # description: first paragraph
         desc = None
-        p = el.find('p')
+        p = first.get('p')
         if p and p.get_text(strip=True):
             desc = p.get_text(strip=True)
         else:
@@ -87,7 +141,6 @@ def scrape_centennial(url: str, session: requests.Session = None, max_items: int
             desc = (text[:300] + '...') if len(text) > 300 else text
 
         # url: absolute link if present
-        link = el.find('a')
         link_url = None
         if link and link.get('href'):
             link_url = link.get('href')
@@ -100,16 +153,8 @@ def scrape_centennial(url: str, session: requests.Session = None, max_items: int
 
         results.append({'title': title or desc[:80], 'date': date, 'description': desc, 'url': link_url})
 
-    # Save output
-    parsed = urlparse(url)
-    host = parsed.netloc.replace(':', '_')
-    if not os.path.exists('DataSets'):
-        os.makedirs('DataSets')
-
-    out_file = os.path.join('DataSets', f'Centennial_{_sanitize_filename(host)}.json')
-    with open(out_file, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
-
+    if with_selector:
+        return selector, results
     return results
 
 
@@ -121,8 +166,8 @@ def main():
 
     print('Scraping', args.url)
     try:
-        data = scrape_centennial(args.url)
-        print(f'Found {len(data)} items. Saved to DataSets/')
+        selector, data = scrape_centennial(args.url, with_selector=True)
+        print(f'Found {len(data)} items (matched {selector or "nothing"}). Saved to DataSets/')
     except Exception as e:
         print('Error scraping:', e)
 
@@ -0,0 +1,141 @@
+"""Re-run the page parsers over archived pages, offline and in parallel.
+
+Usage: python archive_replay.py movies|search_page|centennial|centennial_items
+           [--archive DIR] [--url REGEX] [--workers N] [--output FILE]
+
+Pages are read from the ``page_archive`` (default ``ELK_ARCHIVE_DIR``) and
+parsed in a process pool, so a parser fix can be applied to months of
+captures without touching the network. One JSON line is written per page:
+its URL and fetch time, and the parsed result or the error it raised.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from _tester import parse_centennial_items
+from centennial_scraper import parse_centennial_page
+from movie_scraper import parse_search_page
+from movie_scraper_implementation import MovieScraper, _parse_in_worker
+from page_archive import ArchivedPage, PageArchive
+
+
+def replay_movies(page: ArchivedPage, parser: Optional[str] = None):
+    """IMDb search page -> movie dicts, via MovieScraper.parse_page/parse_movie_data."""
+    return _parse_in_worker(MovieScraper, parser, page.body, page.encoding)
+
+
+def replay_search_page(page: ArchivedPage, parser: Optional[str] = None):
+    """IMDb search page -> movie dicts, via get_movies' parse_search_page (every layout)."""
+    return parse_search_page(page.body, parser, encoding=page.encoding)
+
+
+def replay_centennial(page: ArchivedPage, parser: Optional[str] = None):
+    return parse_centennial_page(page.body, parser, page.encoding)
+
+
+def replay_centennial_items(page: ArchivedPage, parser: Optional[str] = None):
+    return parse_centennial_items(page.body, page.url, parser=parser, encoding=page.encoding)
+
+
+# Parse functions by name, with the URLs each one applies to by default
+REPLAYERS: Dict[str, Tuple[Callable[..., Any], str]] = {
+    "movies": (replay_movies, r"imdb\.com/search/title"),
+    "search_page": (replay_search_page, r"imdb\.com/search/title"),
+    "centennial": (replay_centennial, r"centennial"),
+    "centennial_items": (replay_centennial_items, r"centennial"),
+}
+
+
+def _run(parse: Callable[..., Any], page: ArchivedPage, parser: Optional[str]):
+    try:
+        return parse(page, parser)
+    except Exception as e:
+        return e
+
+
+def replay(
+    pages: Iterable[ArchivedPage],
+    parse: Callable[..., Any],
+    workers: Optional[int] = None,
+    parser: Optional[str] = None,
+    executor: Optional[Executor] = None,
+) -> Iterator[Tuple[ArchivedPage, Any]]:
+    """Yield ``(page, result)`` for each page, in archive order.
+
+    ``parse(page, parser)`` runs in a pool of ``workers`` processes (default:
+    one per CPU), or in ``executor`` when given. A page whose parse raised
+    yields the exception as its result. At most ``2 * workers`` pages are in
+    flight, so an archive of any size is replayed in bounded memory.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be at least 1.")
+    pool = executor if executor is not None else ProcessPoolExecutor(max_workers=workers)
+    in_flight = deque()
+    try:
+        for page in pages:
+            in_flight.append((page, pool.submit(_run, parse, page, parser)))
+            if len(in_flight) >= 2 * workers:
+                done, future = in_flight.popleft()
+                yield done, future.result()
+        while in_flight:
+            done, future = in_flight.popleft()
+            yield done, future.result()
+    finally:
+        if executor is None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+def replay_archive(
+    name: str,
+    archive: Optional[PageArchive] = None,
+    url_pattern: Optional[str] = None,
+    workers: Optional[int] = None,
+    parser: Optional[str] = None,
+) -> Iterator[Tuple[ArchivedPage, Any]]:
+    """Replay the ``REPLAYERS[name]`` parser over the matching pages of ``archive``."""
+    parse, default_pattern = REPLAYERS[name]
+    if archive is None:
+        archive = PageArchive()
+    pattern = re.compile(url_pattern if url_pattern is not None else default_pattern)
+    pages = (page for page in archive if pattern.search(page.url))
+    return replay(pages, parse, workers=workers, parser=parser)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Replay archived pages through a parser")
+    arg_parser.add_argument("name", choices=sorted(REPLAYERS), help="parser to run")
+    arg_parser.add_argument("--archive", help="archive directory (default: ELK_ARCHIVE_DIR)")
+    arg_parser.add_argument("--url", help="only pages whose URL matches this regex")
+    arg_parser.add_argument("--workers", type=int, help="parse processes (default: one per CPU)")
+    arg_parser.add_argument("--output", "-o", help="write JSON lines here instead of stdout")
+    args = arg_parser.parse_args()
+
+    archive = PageArchive(args.archive)
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    pages = failures = 0
+    try:
+        for page, result in replay_archive(args.name, archive, args.url, args.workers):
+            line = {"url": page.url, "fetched_at": page.fetched_at}
+            if isinstance(result, Exception):
+                line["error"] = f"{type(result).__name__}: {result}"
+                failures += 1
+            else:
+                line["result"] = result
+            out.write(json.dumps(line, ensure_ascii=False) + "\n")
+            pages += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"Replayed {pages} pages, {failures} failed.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
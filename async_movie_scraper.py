@@ -0,0 +1,136 @@
+"""Asyncio counterpart of MovieScraper built on aiohttp.
+
+Fetching is non-blocking, so an asyncio orchestrator can drive many years
+without tying up executor threads. Requests wait on the same per-host token
+buckets, retry policy and circuit breaker as the synchronous scrapers. Pages
+are parsed with the same code as MovieScraper, so results are identical to
+``parse_movie_data`` output.
+"""
+
+import asyncio
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+
+from movie_scraper_implementation import HEADERS, MovieScraper, SEARCH_URL
+from rate_limiter import HostRateLimiter, get_rate_limiter
+from retry_policy import CircuitBreaker, RetryPolicy, get_circuit_breaker, get_retry_policy
+
+
+class AsyncMovieScraper:
+
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        timeout: float = 15,
+        search_url: str = SEARCH_URL,
+        limiter: Optional[HostRateLimiter] = None,
+        retry: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        parser: Optional[str] = None,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+        # Parsing only: no blocking session or cache is set up for it
+        self._parser = MovieScraper.for_parsing(parser)
+        self.limiter = limiter if limiter is not None else get_rate_limiter()
+        self.retry = retry if retry is not None else get_retry_policy()
+        self.breaker = breaker if breaker is not None else get_circuit_breaker()
+        self.headers = dict(HEADERS)
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.search_url = search_url
+
+    def _open_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+        return aiohttp.ClientSession(
+            headers=self.headers,
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+
+    async def scrape_movies(self, year, session: Optional[aiohttp.ClientSession] = None) -> List[dict]:
+        """Fetch and parse one year of results."""
+        if session is None:
+            async with self._open_session() as own_session:
+                return await self._scrape_year(year, own_session)
+        return await self._scrape_year(year, session)
+
+    async def scrape_years(self, years: Iterable) -> Tuple[Dict, Dict]:
+        """Scrape several years with at most ``max_concurrency`` requests in flight.
+
+        Returns the same ``(results, errors)`` pair as ``MovieScraper.scrape_years``.
+        Cancelling the calling task cancels every outstanding request and
+        closes the session before the cancellation propagates.
+        """
+        years = list(dict.fromkeys(years))
+        results: Dict = {}
+        errors: Dict = {}
+        if not years:
+            return results, errors
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def bounded(year, session):
+            async with semaphore:
+                return await self._scrape_year(year, session)
+
+        async with self._open_session() as session:
+            tasks = [asyncio.ensure_future(bounded(year, session)) for year in years]
+            try:
+                outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+            except asyncio.CancelledError:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+
+        for year, outcome in zip(years, outcomes):
+            if isinstance(outcome, asyncio.CancelledError):
+                raise outcome
+            if isinstance(outcome, Exception):
+                errors[year] = outcome
+            else:
+                results[year] = outcome
+        return results, errors
+
+    async def _scrape_year(self, year, session: aiohttp.ClientSession) -> List[dict]:
+        url = self.search_url.format(year=year)
+        host = (urlparse(url).hostname or "").lower()
+
+        attempt = 0
+        while True:
+            attempt += 1
+            trial = self.breaker.before_request(host)
+            try:
+                await self.limiter.acquire_async(url)
+                async with session.get(url) as response:
+                    # 429 means the host is up but wants us to slow down
+                    if response.status >= 500:
+                        self.breaker.record_failure(host)
+                    else:
+                        self.breaker.record_success(host)
+                    if not self.retry.is_retryable_status(response.status):
+                        response.raise_for_status()
+                        # Raw bytes: aiohttp.text() would run charset detection when none is declared
+                        html = await response.read()
+                        encoding = response.charset
+                        break
+                    delay = self.retry.next_delay(attempt, response.headers.get("Retry-After"))
+                    if delay is None:
+                        response.raise_for_status()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                self.breaker.record_failure(host)
+                delay = self.retry.next_delay(attempt)
+                if delay is None:
+                    raise
+            finally:
+                # Cancellation or any other error must not leave the host stuck half-open
+                if trial:
+                    self.breaker.release_trial(host)
+            await asyncio.sleep(delay)
+
+        # Give other tasks (and pending cancellations) a turn before the CPU-bound parse
+        await asyncio.sleep(0)
+        return self._parser.parse_page(html, encoding=encoding)
@@ -0,0 +1,96 @@
+"""Compare the single-pass centennial extractor with the old multi-pass one.
+
+Usage: python benchmarks/centennial_walk.py [--sizes 50,200,800,3200] [--repeat N]
+
+Synthetic Divi-style pages are built with a growing number of content
+blocks, all nested inside the overlapping ``main``/``div#main-content``/
+``article`` containers, like the real XULA pages. The soup is built once per
+size, so only the extraction is timed.
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from centennial_scraper import extract_centennial  # noqa: E402
+from html_parsing import make_soup  # noqa: E402
+
+
+def multi_pass_extract(soup) -> Dict[str, List[str]]:
+    """The extraction parse_centennial_page used before the single-pass walk."""
+    containers = []
+    for sel in ("div.et_pb_text_inner", "main", "article", "div#main-content"):
+        containers.extend(soup.select(sel))
+    if not containers:
+        containers = [soup]
+
+    def collect_text(nodes, tag):
+        out = []
+        for n in nodes:
+            for t in n.find_all(tag):
+                text = t.get_text(" ", strip=True)
+                if text:
+                    out.append(text)
+        return out
+
+    def dedup(seq):
+        seen = set()
+        return [s for s in seq if not (s in seen or seen.add(s))]
+
+    headings = []
+    for htag in ("h1", "h2", "h3"):
+        headings.extend(collect_text(containers, htag))
+    return {
+        "headings": dedup(headings),
+        "paragraphs": dedup(collect_text(containers, "p")),
+        "links": dedup(collect_text(containers, "a")),
+    }
+
+
+def build_page(blocks: int) -> str:
+    body = "".join(
+        f'<div class="et_pb_section"><div class="et_pb_text_inner">'
+        f"<h2>Section {i}</h2><p>Paragraph {i} with <a href=\"/s/{i}\">link {i}</a>.</p>"
+        f"<h3>Highlights {i % 25}</h3><p>Shared closing line.</p></div></div>"
+        for i in range(blocks)
+    )
+    nav = "".join(f'<li><a href="/m/{i}">Menu {i}</a></li>' for i in range(100))
+    return (
+        f"<html><body><header><ul>{nav}</ul></header>"
+        f'<main><div id="main-content"><article><h1>Centennial</h1>{body}</article></div></main>'
+        f"</body></html>"
+    )
+
+
+def best_of(func, soup, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(soup)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark centennial page extraction")
+    parser.add_argument("--sizes", default="50,200,800,3200", help="comma-separated block counts")
+    parser.add_argument("--repeat", "-n", type=int, default=3, help="runs per size (best is kept)")
+    args = parser.parse_args()
+
+    print(f"{'blocks':>7} {'multi-pass':>12} {'single-pass':>12} {'speed-up':>9}  same data")
+    for blocks in (int(n) for n in args.sizes.split(",")):
+        soup = make_soup(build_page(blocks))
+        old_time, old = best_of(multi_pass_extract, soup, args.repeat)
+        new_time, new = best_of(extract_centennial, soup, args.repeat)
+        # The single pass lists headings in document order rather than grouped by level
+        same = all(sorted(old[k]) == sorted(new[k]) for k in old)
+        print(f"{blocks:>7} {old_time * 1000:>10.1f}ms {new_time * 1000:>10.1f}ms {old_time / new_time:>8.1f}x  {same}")
+
+
+if __name__ == "__main__":
+    main()
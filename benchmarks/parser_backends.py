@@ -0,0 +1,78 @@
+"""Time each installed BeautifulSoup backend on the saved fixture pages.
+
+Usage: python benchmarks/parser_backends.py [--repeat N]
+
+For every page type the scraper's own parse function runs with each backend.
+The output is checked against ``html.parser`` (the reference), and the
+fastest backend that gives the same result is reported. Set the winner with
+``ELK_PARSER_BACKEND``.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from centennial_scraper import parse_centennial_page  # noqa: E402
+from html_parsing import available_parsers  # noqa: E402
+from movie_scraper import NEXT_DATA_RE, parse_search_page  # noqa: E402
+
+FIXTURES = os.path.join(ROOT, "fixtures")
+
+
+def parse_search_page_dom(html, parser=None):
+    """parse_search_page without the embedded-JSON fast path, so the DOM parse is timed."""
+    return parse_search_page(NEXT_DATA_RE.sub("", html), parser=parser)
+
+
+# (label, fixture file, parse function taking (html, parser))
+PAGES = [
+    ("IMDb search (lister-item)", "imdb_search_old_layout.html", parse_search_page),
+    ("IMDb search (ipc-metadata-list)", "imdb_search_new_layout.html", parse_search_page_dom),
+    ("XULA centennial", "xula_centennial.html", parse_centennial_page),
+]
+
+
+def time_parse(parse, html, parser, repeat):
+    """Best wall-clock time of ``repeat`` runs, and the result of the last one."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = parse(html, parser=parser)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark HTML parser backends")
+    arg_parser.add_argument("--repeat", "-n", type=int, default=5, help="runs per backend and page (best is kept)")
+    args = arg_parser.parse_args()
+
+    backends = available_parsers()
+    print(f"Installed backends: {', '.join(backends)}")
+
+    for label, filename, parse in PAGES:
+        with open(os.path.join(FIXTURES, filename), "r", encoding="utf-8") as f:
+            html = f.read()
+        print(f"\n{label} ({len(html) / 1024:.0f} KiB)")
+
+        reference = parse(html, parser="html.parser")
+        timings = []
+        for backend in backends:
+            seconds, result = time_parse(parse, html, backend, args.repeat)
+            correct = result == reference
+            timings.append((seconds, backend, correct))
+            status = "ok" if correct else "DIFFERS from html.parser"
+            print(f"  {backend:<12} {seconds * 1000:8.1f} ms  {status}")
+
+        fastest = min((t for t in timings if t[2]), default=None)
+        if fastest is not None:
+            print(f"  fastest correct: {fastest[1]}")
+
+
+if __name__ == "__main__":
+    main()
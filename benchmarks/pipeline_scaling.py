@@ -0,0 +1,82 @@
+"""Measure how bulk scraping scales with parse processes.
+
+Usage: python benchmarks/pipeline_scaling.py [--pages 48] [--latency 0.05] [--workers 1,2,4,8]
+
+No network is used: a stand-in session serves the saved IMDb search page
+after ``--latency`` seconds, like a real fetch would. The thread-only
+``scrape_years`` is compared with ``scrape_years_pipelined`` at each
+parse-worker count (capped at the number of CPUs).
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from movie_scraper_implementation import MovieScraper  # noqa: E402
+
+
+class FixtureSession:
+    """Answers every GET with the saved search page after a fixed delay."""
+
+    def __init__(self, html, latency):
+        self.html = html
+        self.latency = latency
+
+    def get(self, url, headers=None, timeout=None):
+        time.sleep(self.latency)
+        return FixtureResponse(self.html)
+
+
+class FixtureResponse:
+
+    status_code = 200
+    headers = {"Content-Type": "text/html; charset=utf-8"}
+
+    def __init__(self, content):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+
+def run(label, scrape, pages):
+    start = time.perf_counter()
+    results, errors = scrape()
+    elapsed = time.perf_counter() - start
+    assert not errors and len(results) == pages, errors
+    print(f"  {label:<28} {elapsed:7.2f}s  {pages / elapsed:7.1f} pages/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fetch/parse pipeline")
+    parser.add_argument("--pages", type=int, default=48, help="years (pages) to scrape")
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated seconds per fetch")
+    parser.add_argument("--fetch-workers", type=int, default=8, help="network threads")
+    parser.add_argument("--workers", default="1,2,4,8", help="comma-separated parse process counts")
+    args = parser.parse_args()
+
+    with open(os.path.join(ROOT, "fixtures", "imdb_search_old_layout.html"), "rb") as f:
+        html = f.read()
+    scraper = MovieScraper(session=FixtureSession(html, args.latency))
+    years = range(1900, 1900 + args.pages)
+    cpus = os.cpu_count() or 1
+    print(f"{args.pages} pages, {args.latency * 1000:.0f} ms simulated latency, {cpus} CPUs")
+
+    baseline = run(f"threads only ({args.fetch_workers})",
+                   lambda: scraper.scrape_years(years, max_workers=args.fetch_workers), args.pages)
+    for workers in sorted({min(int(n), cpus) for n in args.workers.split(",")}):
+        elapsed = run(
+            f"pipeline, {workers} parse procs",
+            lambda: scraper.scrape_years_pipelined(years, fetch_workers=args.fetch_workers, parse_workers=workers),
+            args.pages,
+        )
+        print(f"  {'':<28} {baseline / elapsed:7.2f}x vs threads only")
+
+
+if __name__ == "__main__":
+    main()
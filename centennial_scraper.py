@@ -1,7 +1,17 @@
 # centennial_scrape.py
+import codecs
 import requests
-from bs4 import BeautifulSoup
-from typing import Dict, List, Tuple
+from collections import deque
+from bs4.builder import HTMLTreeBuilder
+from bs4.element import CData, NavigableString, Tag
+from contextlib import closing
+from html.parser import HTMLParser
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import settings
+from http_cache import HTTPCache, get_default_cache
+from html_parsing import declared_encoding, make_soup
+from http_client import fetch, get_session
 
 URL = "https://www.xula.edu/about/centennial.html"
 
@@ -13,74 +23,339 @@ HEADERS = {
     )
 }
 
-def fetch_html(url: str = URL, timeout: int = 15) -> str:
-    r = requests.get(url, headers=HEADERS, timeout=timeout)
+def fetch_html(
+    url: str = URL,
+    timeout: int = 15,
+    session: Optional[requests.Session] = None,
+    cache: Optional[HTTPCache] = None,
+) -> str:
+    """Download a page over the shared keep-alive session (or the one given).
+
+    With a cache (or ``ELK_CACHE_DIR`` set) an unchanged page is served from disk.
+    """
+    if cache is None:
+        cache = get_default_cache()
+    r = fetch(url, session=session, headers=HEADERS, timeout=timeout, cache=cache)
     r.raise_for_status()
     return r.text
 
-def parse_centennial_page(html: str) -> Dict[str, List[str]]:
+# Tags whose text parse_centennial_page collects, and the list each one goes to
+TEXT_TARGETS = {"h1": "headings", "h2": "headings", "h3": "headings", "p": "paragraphs", "a": "links"}
+# The string types get_text() keeps; comments, scripts and styles are skipped
+_TEXT_TYPES = (NavigableString, CData)
+# Tags bs4 treats as void, and tags whose text it stores as Script/Stylesheet/... strings
+_VOID_TAGS = frozenset(HTMLTreeBuilder.empty_element_tags)
+_STRING_CONTAINERS = frozenset(HTMLTreeBuilder.DEFAULT_STRING_CONTAINERS)
+# Bytes read per iter_content() step when streaming a page
+STREAM_CHUNK_SIZE = 16 * 1024
+
+
+def _is_content_container(tag: Tag) -> bool:
+    """Some XULA pages use Divi/ET Builder blocks; keep both generic + block-specific grabs."""
+    name = tag.name
+    if name == "div":
+        return "et_pb_text_inner" in tag.get("class", ()) or tag.get("id") == "main-content"
+    return name in ("main", "article")
+
+
+def parse_centennial_page(
+    html: Union[str, bytes], parser: Optional[str] = None, encoding: Optional[str] = None
+) -> Dict[str, List[str]]:
     """
     Return a dict with headings, paragraphs, and links (text only).
+    ``parser`` overrides the ``ELK_PARSER_BACKEND`` setting. ``html`` may be
+    the raw body, with ``encoding`` the charset the server declared.
+    """
+    return extract_centennial(make_soup(html, parser, encoding=encoding))
+
+
+def extract_centennial(soup: Tag) -> Dict[str, List[str]]:
+    """Collect heading, paragraph and link text from the content containers of ``soup``.
+
+    Content containers are ``div.et_pb_text_inner``, ``main``, ``article`` and
+    ``div#main-content``; when a page has none, the whole document is used.
+    The tree is walked once, so nodes inside overlapping containers are not
+    visited again, and each list is in document order with duplicates dropped
+    as they are found.
     """
-    soup = BeautifulSoup(html, "html.parser")
-
-    # Some XULA pages use Divi/ET Builder blocks; keep both generic + block-specific grabs.
-    container_selectors = [
-        "div.et_pb_text_inner",
-        "main",              # generic fallback
-        "article",           # generic fallback
-        "div#main-content",  # generic fallback
-    ]
-    containers = []
-    for sel in container_selectors:
-        containers.extend(soup.select(sel))
-    if not containers:
-        containers = [soup]  # fallback: parse whole doc
-
-    def collect_text(nodes, tag: str) -> List[str]:
-        out = []
-        for n in nodes:
-            for t in n.find_all(tag):
-                text = t.get_text(" ", strip=True)
+    kinds = ("headings", "paragraphs", "links")
+    found: Dict[str, List[Optional[str]]] = {k: [] for k in kinds}
+    seen: Dict[str, set] = {k: set() for k in kinds}
+    # Same collection over the whole document, only needed until a container turns up
+    fallback: Dict[str, List[Optional[str]]] = {k: [] for k in kinds}
+    fallback_seen: Dict[str, set] = {k: set() for k in kinds}
+    any_container = False
+
+    # Targets still open, innermost last: [kind, text parts, slot in found, slot in fallback]
+    open_targets: List[list] = []
+    depth = 0  # containers currently open
+    # Stack entries are nodes to enter, or (target, is_container) markers to close them
+    stack: list = [soup]
+    while stack:
+        node = stack.pop()
+        if type(node) is tuple:
+            target, container = node
+            if target is not None:
+                open_targets.pop()
+                kind, parts, slot, fallback_slot = target
+                text = " ".join(parts)
                 if text:
-                    out.append(text)
-        return out
-
-    headings = []
-    for htag in ("h1", "h2", "h3"):
-        headings.extend(collect_text(containers, htag))
-
-    # paragraphs
-    paragraphs = collect_text(containers, "p")
-
-    # links (text only here; add hrefs if you want)
-    links_text = []
-    for n in containers:
-        for a in n.find_all("a"):
-            txt = a.get_text(" ", strip=True)
-            if txt:
-                links_text.append(txt)
-
-    # de-dup while preserving order
-    def dedup(seq: List[str]) -> List[str]:
-        seen = set()
-        out = []
-        for s in seq:
-            if s not in seen:
-                seen.add(s)
-                out.append(s)
-        return out
-
-    return {
-        "headings": dedup(headings),
-        "paragraphs": dedup(paragraphs),
-        "links": dedup(links_text),
-    }
-
-def scrape_centennial_impact() -> Dict[str, List[str]]:
-    """High-level function your driver/tests can call."""
-    html = fetch_html(URL)
-    return parse_centennial_page(html)
+                    if slot is not None and text not in seen[kind]:
+                        seen[kind].add(text)
+                        found[kind][slot] = text
+                    if fallback_slot is not None and not any_container and text not in fallback_seen[kind]:
+                        fallback_seen[kind].add(text)
+                        fallback[kind][fallback_slot] = text
+            if container:
+                depth -= 1
+            continue
+
+        if isinstance(node, Tag):
+            container = node is not soup and _is_content_container(node)
+            if container:
+                depth += 1
+                any_container = True
+            target = None
+            kind = TEXT_TARGETS.get(node.name)
+            if kind is not None and (depth or not any_container):
+                # Reserve the slot now so nested targets keep start-tag order
+                slot = fallback_slot = None
+                if depth:
+                    slot = len(found[kind])
+                    found[kind].append(None)
+                if not any_container:
+                    fallback_slot = len(fallback[kind])
+                    fallback[kind].append(None)
+                target = [kind, [], slot, fallback_slot]
+                open_targets.append(target)
+            if target is not None or container:
+                stack.append((target, container))
+            stack.extend(reversed(node.contents))
+        elif open_targets and type(node) in _TEXT_TYPES:
+            text = node.strip()
+            if text:
+                for target in open_targets:
+                    target[1].append(text)
+
+    # Fall back to the whole document when the page has no content containers
+    result = found if any_container else fallback
+    return {k: [text for text in result[k] if text is not None] for k in kinds}
+
+class CentennialStreamParser(HTMLParser):
+    """Incremental counterpart of ``extract_centennial`` on ``html.parser`` events.
+
+    Feed it text in chunks of any size; every heading, paragraph or link
+    inside a content container is queued as ``(kind, text)`` when its end
+    tag arrives (or at ``close()`` for tags left open), already de-duplicated.
+    A target nested in another of the same kind waits for the outer one, so
+    each kind stays in document order.
+    Collect the queue with ``pop_items``. Only open tag names and pending
+    text are kept, so memory does not grow with the page. The exception is
+    a page with no content container at all: its items are held back until
+    ``close()``, because only then is the whole-document fallback known to
+    apply. Tags (void ones included) are nested and closed the way
+    BeautifulSoup's ``html.parser`` builder does, so the results match
+    ``parse_centennial_page`` with that backend.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self._items: List[Tuple[str, str]] = []
+        self._seen: Dict[str, set] = {k: set() for k in ("headings", "paragraphs", "links")}
+        # Items outside containers, kept only until the first container shows up
+        self._fallback: Optional[List[Tuple[str, str]]] = []
+        self._fallback_seen: Dict[str, set] = {k: set() for k in self._seen}
+        # One entry per open element: [name, is_container, target or None]
+        self._open: List[list] = []
+        self._targets: List[list] = []  # [kind, text parts, inside a container, closed]
+        # Targets per kind in start-tag order; a nested one waits for its outer one
+        self._pending: Dict[str, deque] = {k: deque() for k in self._seen}
+        self._depth = 0  # containers currently open
+        self._hidden = 0  # open script/style/template/... whose text get_text() skips
+        self._text: List[str] = []  # text since the last tag, like bs4 joins it
+        self._already_closed: List[str] = []  # void tags whose </tag> is still to come
+
+    def pop_items(self) -> List[Tuple[str, str]]:
+        items, self._items = self._items, []
+        return items
+
+    def close(self) -> None:
+        super().close()
+        self._flush_text()
+        # End of document closes everything still open, as the tree builder does
+        while self._open:
+            self._pop()
+        if self._fallback is not None:
+            self._items.extend(self._fallback)
+            self._fallback = None
+
+    # -- html.parser events -------------------------------------------------
+
+    def handle_starttag(self, tag: str, attrs, handle_empty_element: bool = True) -> None:
+        self._flush_text()
+        attributes = dict(attrs)
+        if tag == "div":
+            classes = (attributes.get("class") or "").split()
+            container = "et_pb_text_inner" in classes or attributes.get("id") == "main-content"
+        else:
+            container = tag in ("main", "article")
+        if container:
+            self._depth += 1
+            # From here on the whole-document fallback can no longer apply
+            self._fallback = None
+        target = None
+        kind = TEXT_TARGETS.get(tag)
+        if kind is not None and (self._depth or self._fallback is not None):
+            target = [kind, [], bool(self._depth), False]
+            self._targets.append(target)
+            self._pending[kind].append(target)
+        if tag in _STRING_CONTAINERS:
+            self._hidden += 1
+        self._open.append([tag, container, target])
+        if tag in _VOID_TAGS and handle_empty_element:
+            # Closed straight away; a later </tag> for it is then swallowed
+            self._close_to(tag)
+            self._already_closed.append(tag)
+
+    def handle_startendtag(self, tag: str, attrs) -> None:
+        self.handle_starttag(tag, attrs, handle_empty_element=False)
+        self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self._already_closed:
+            self._already_closed.remove(tag)
+        else:
+            self._close_to(tag)
+
+    def handle_data(self, data: str) -> None:
+        self._text.append(data)
+
+    def handle_comment(self, data: str) -> None:
+        self._flush_text()
+
+    def handle_decl(self, decl: str) -> None:
+        self._flush_text()
+
+    def handle_pi(self, data: str) -> None:
+        self._flush_text()
+
+    def unknown_decl(self, data: str) -> None:
+        self._flush_text()
+        # CDATA sections are text of their own; other declarations are not
+        if data.upper().startswith("CDATA["):
+            text = data[len("CDATA["):].strip()
+            if text:
+                for target in self._targets:
+                    target[1].append(text)
+
+    # -- helpers --------------------------------------------------------------
+
+    def _flush_text(self) -> None:
+        if not self._text:
+            return
+        text = "".join(self._text).strip()
+        self._text = []
+        if text and not self._hidden:
+            for target in self._targets:
+                target[1].append(text)
+
+    def _close_to(self, tag: str) -> None:
+        """Close back to the most recent open ``tag``; a stray end tag closes nothing."""
+        self._flush_text()
+        for i in range(len(self._open) - 1, -1, -1):
+            if self._open[i][0] == tag:
+                while len(self._open) > i:
+                    self._pop()
+                return
+
+    def _pop(self) -> None:
+        tag, container, target = self._open.pop()
+        if tag in _STRING_CONTAINERS:
+            self._hidden -= 1
+        if container:
+            self._depth -= 1
+        if target is None:
+            return
+        self._targets.pop()
+        target[3] = True
+        pending = self._pending[target[0]]
+        while pending and pending[0][3]:
+            self._release(pending.popleft())
+
+    def _release(self, target: list) -> None:
+        kind, parts, inside, _ = target
+        text = " ".join(parts)
+        if not text:
+            return
+        if inside:
+            if text not in self._seen[kind]:
+                self._seen[kind].add(text)
+                self._items.append((kind, text))
+        elif self._fallback is not None and text not in self._fallback_seen[kind]:
+            self._fallback_seen[kind].add(text)
+            self._fallback.append((kind, text))
+
+
+def iter_centennial_items(chunks: Iterable, encoding: str = "utf-8") -> Iterator[Tuple[str, str]]:
+    """Yield ``(kind, text)`` items from a page arriving as ``chunks`` of bytes or str."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    parser = CentennialStreamParser()
+    for chunk in chunks:
+        parser.feed(decoder.decode(chunk) if isinstance(chunk, bytes) else chunk)
+        yield from parser.pop_items()
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    yield from parser.pop_items()
+
+
+def stream_centennial_items(
+    url: str = URL,
+    timeout: int = 15,
+    session: Optional[requests.Session] = None,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> Iterator[Tuple[str, str]]:
+    """Download ``url`` and yield its items while the body is still arriving.
+
+    The response is never held in memory as a whole, so extraction overlaps
+    with the download. Streaming bypasses the HTTP cache.
+    """
+    if session is None:
+        session = get_session()
+    with closing(session.get(url, headers=HEADERS, timeout=timeout, stream=True)) as r:
+        r.raise_for_status()
+        yield from iter_centennial_items(r.iter_content(chunk_size=chunk_size), declared_encoding(r) or "utf-8")
+
+
+def collect_items(items: Iterable[Tuple[str, str]]) -> Dict[str, List[str]]:
+    """Group streamed ``(kind, text)`` items into the ``parse_centennial_page`` dict."""
+    data: Dict[str, List[str]] = {"headings": [], "paragraphs": [], "links": []}
+    for kind, text in items:
+        data[kind].append(text)
+    return data
+
+def scrape_centennial_impact(
+    cache: Optional[HTTPCache] = None, parser: Optional[str] = None
+) -> Dict[str, List[str]]:
+    """High-level function your driver/tests can call.
+
+    ``parser`` picks the BeautifulSoup backend (default ``ELK_CENTENNIAL_PARSER``,
+    then ``ELK_PARSER_BACKEND``).
+    """
+    if cache is None:
+        cache = get_default_cache()
+    r = fetch(URL, headers=HEADERS, cache=cache)
+    r.raise_for_status()
+    # Skip re-parsing when the page came back 304 Not Modified
+    if cache is not None and getattr(r, "from_cache", False):
+        data = cache.load_parsed(URL, "centennial")
+        if data is not None:
+            return data
+    # Raw bytes and the declared charset: no charset detection, no second decode
+    parser = parser or settings.CENTENNIAL_PARSER or None
+    data = parse_centennial_page(r.content, parser, encoding=declared_encoding(r))
+    if cache is not None:
+        cache.store_parsed(URL, "centennial", data)
+    return data
 
 if __name__ == "__main__":
     data = scrape_centennial_impact()
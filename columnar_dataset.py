@@ -0,0 +1,293 @@
+"""Columnar binary format for movie datasets, with typed numeric columns.
+
+A ``.elkc`` file stores each field as one contiguous column instead of one
+row after another. ``rating`` is a packed ``array('d')`` and ``year`` a
+packed ``array('i')``, so they are read back as numbers rather than
+re-parsed from strings. Every other field is a string column: a UTF-8 blob
+plus an array of where each value starts in it (32-bit while the blob is
+under 4 GiB, 64-bit beyond).
+
+``ColumnarDataset`` memory-maps the file. ``column('rating')`` is a
+``memoryview`` straight onto the mapped bytes, with no copy and no decoding,
+and scanning it never touches the title or plot bytes. Missing ratings are
+stored as NaN and missing years as ``MISSING_YEAR``; rows read back give
+None for both.
+
+Convert with ``python columnar_dataset.py SOURCE TARGET``, where either side
+can be ``.csv``, ``.json`` or ``.elkc``.
+
+File layout (native byte order, recorded in the header): the magic, the
+byte order, the row count and the length of a JSON column directory,
+followed by that directory and then the column sections, each 8-byte aligned.
+"""
+
+import csv
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from dataset_manager import FIELDNAMES
+
+SUFFIX = ".elkc"
+_MAGIC = b"ELKCOL1\0"
+# magic, byte order (b"l" or b"b"), row count, directory length
+_HEADER = struct.Struct("=8sc7xqq")
+_BYTEORDER = b"l" if sys.byteorder == "little" else b"b"
+_ALIGN = 8
+
+# Typed columns and their array type codes; every other field is a string column
+NUMERIC_COLUMNS = {"rating": "d", "year": "i"}
+# Stands in for a missing year in the packed int column
+MISSING_YEAR = -(2 ** 31)
+
+
+def _to_number(value: Any, typecode: str):
+    missing = math.nan if typecode == "d" else MISSING_YEAR
+    if value is None or value == "":
+        return missing
+    try:
+        return float(value) if typecode == "d" else int(value)
+    except (TypeError, ValueError):
+        # IMDb's "N/A" rating
+        return missing
+
+
+def _from_number(value, typecode: str):
+    if typecode == "d":
+        return None if math.isnan(value) else value
+    return None if value == MISSING_YEAR else value
+
+
+def _padding(size: int) -> bytes:
+    return b"\0" * (-size % _ALIGN)
+
+
+def write_columnar(path: str, records: Iterable[Dict[str, Any]], fields: Optional[Sequence[str]] = None) -> int:
+    """Write ``records`` to ``path`` in the columnar format; returns the row count.
+
+    ``fields`` defaults to the keys of the first record. Records are consumed
+    one at a time into packed columns, so the input may be a generator.
+    """
+    records = iter(records)
+    first = next(records, None)
+    if fields is None:
+        fields = list(first) if first is not None else list(FIELDNAMES)
+    numbers = {name: array(NUMERIC_COLUMNS[name]) for name in fields if name in NUMERIC_COLUMNS}
+    blobs = {name: bytearray() for name in fields if name not in NUMERIC_COLUMNS}
+    starts = {name: array("Q", [0]) for name in blobs}
+
+    count = 0
+    for row in chain([first] if first is not None else [], records):
+        if not isinstance(row, dict):
+            raise TypeError("Each movie should be a dictionary.")
+        for name, column in numbers.items():
+            column.append(_to_number(row.get(name), column.typecode))
+        for name, blob in blobs.items():
+            value = row.get(name)
+            blob += ("" if value is None else str(value)).encode("utf-8")
+            starts[name].append(len(blob))
+        count += 1
+
+    # Section offsets are relative to the end of the directory, so it can be sized first
+    directory: List[Dict[str, Any]] = []
+    sections: List[bytes] = []
+    position = 0
+
+    def add_section(data: bytes) -> Dict[str, int]:
+        nonlocal position
+        entry = {"offset": position, "length": len(data)}
+        sections.append(data + _padding(len(data)))
+        position += len(data) + len(_padding(len(data)))
+        return entry
+
+    for name in fields:
+        if name in numbers:
+            entry = {"name": name, "type": numbers[name].typecode, "values": add_section(numbers[name].tobytes())}
+        else:
+            offsets = starts[name]
+            if len(blobs[name]) < 2 ** 32:
+                offsets = array("I", offsets)
+            entry = {"name": name, "type": "str", "index": offsets.typecode,
+                     "starts": add_section(offsets.tobytes()), "values": add_section(bytes(blobs[name]))}
+        directory.append(entry)
+
+    encoded = json.dumps({"columns": directory}).encode("utf-8")
+    encoded += b" " * (-(_HEADER.size + len(encoded)) % _ALIGN)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _BYTEORDER, count, len(encoded)))
+        f.write(encoded)
+        for data in sections:
+            f.write(data)
+    os.replace(tmp, path)
+    return count
+
+
+class ColumnarDataset:
+    """Read-only, memory-mapped view of a ``.elkc`` file.
+
+    Views returned by ``column`` point into the mapping; release them
+    (or drop them) before calling ``close``.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, byteorder, self._count, directory_length = _HEADER.unpack_from(self._map, 0)
+            if magic != _MAGIC:
+                raise ValueError(f"{path} is not a columnar dataset.")
+            if byteorder != _BYTEORDER:
+                raise ValueError(f"{path} was written on a machine with the other byte order.")
+            start = _HEADER.size
+            directory = json.loads(self._map[start:start + directory_length].decode("utf-8"))
+        except Exception:
+            self._map.close()
+            raise
+        self._base = start + directory_length
+        self._columns = {entry["name"]: entry for entry in directory["columns"]}
+        self.fields = [entry["name"] for entry in directory["columns"]]
+        self._views: Dict[str, memoryview] = {}
+
+    def __enter__(self) -> "ColumnarDataset":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        for view in self._views.values():
+            view.release()
+        self._views.clear()
+        self._map.close()
+
+    def _section(self, section: Dict[str, int], typecode: Optional[str] = None) -> memoryview:
+        begin = self._base + section["offset"]
+        view = memoryview(self._map)[begin:begin + section["length"]]
+        return view.cast(typecode) if typecode else view
+
+    def column(self, name: str) -> memoryview:
+        """The packed values of a numeric column (``rating``: float, ``year``: int), without copying.
+
+        Missing values are NaN and ``MISSING_YEAR``.
+        """
+        entry = self._columns[name]
+        if entry["type"] == "str":
+            raise TypeError(f"{name!r} is a string column; use value() or rows().")
+        view = self._views.get(name)
+        if view is None:
+            view = self._views[name] = self._section(entry["values"], entry["type"])
+        return view
+
+    def _starts(self, name: str) -> memoryview:
+        key = name + "#starts"
+        view = self._views.get(key)
+        if view is None:
+            entry = self._columns[name]
+            view = self._views[key] = self._section(entry["starts"], entry["index"])
+        return view
+
+    def _blob(self, name: str) -> memoryview:
+        key = name + "#values"
+        view = self._views.get(key)
+        if view is None:
+            view = self._views[key] = self._section(self._columns[name]["values"])
+        return view
+
+    def value(self, name: str, i: int):
+        """Field ``name`` of row ``i``; only that value's bytes are read."""
+        if not 0 <= i < self._count:
+            raise IndexError("row index out of range")
+        entry = self._columns[name]
+        if entry["type"] != "str":
+            return _from_number(self.column(name)[i], entry["type"])
+        starts = self._starts(name)
+        return bytes(self._blob(name)[starts[i]:starts[i + 1]]).decode("utf-8")
+
+    def row(self, i: int) -> Dict[str, Any]:
+        if i < 0:
+            i += self._count
+        return {name: self.value(name, i) for name in self.fields}
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        for i in range(self._count):
+            yield self.row(i)
+
+
+# -- conversion ---------------------------------------------------------------
+
+def _read_records(path: str) -> Iterator[Dict[str, Any]]:
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, list):
+            raise ValueError(f"{path} does not hold a list of movies.")
+        yield from data
+    elif path.endswith(SUFFIX):
+        with ColumnarDataset(path) as dataset:
+            yield from dataset.rows()
+    else:
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            yield from csv.DictReader(f)
+
+
+def _fields_of(path: str) -> Optional[List[str]]:
+    """Field order of a CSV or columnar source; None for JSON (taken from the first record)."""
+    if path.endswith(SUFFIX):
+        with ColumnarDataset(path) as dataset:
+            return list(dataset.fields)
+    if path.endswith(".json"):
+        return None
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), None)
+
+
+def convert(source: str, target: str) -> int:
+    """Convert between ``.csv``, ``.json`` and ``.elkc`` by file extension; returns the row count."""
+    fields = _fields_of(source)
+    records = _read_records(source)
+    if target.endswith(SUFFIX):
+        return write_columnar(target, records, fields)
+
+    count = 0
+    if target.endswith(".json"):
+        rows = list(records)
+        with open(target, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=4, ensure_ascii=False)
+        return len(rows)
+    with open(target, "w", newline="", encoding="utf-8") as f:
+        writer = None
+        for row in records:
+            if writer is None:
+                writer = csv.DictWriter(f, fieldnames=fields or list(row))
+                writer.writeheader()
+            # Missing numbers go back to the empty cells they came from
+            writer.writerow({k: "" if v is None else v for k, v in row.items()})
+            count += 1
+        if writer is None:
+            csv.DictWriter(f, fieldnames=fields or list(FIELDNAMES)).writeheader()
+    return count
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Convert movie datasets between CSV, JSON and columnar")
+    parser.add_argument("source", help="input .csv, .json or .elkc file")
+    parser.add_argument("target", help="output .csv, .json or .elkc file")
+    args = parser.parse_args()
+    count = convert(args.source, args.target)
+    print(f"Wrote {count} movies to {args.target}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""Sidecar row-offset index for random access into CSV datasets.
+
+``<dataset>.idx`` holds the byte offset at which each data row of the CSV
+starts, as packed 64-bit integers behind a small header that records the
+size and modification time of the CSV it describes. The index file is
+memory-mapped, so finding row ``i`` is one read at a fixed position and
+reading it is one ``pread`` of just that row's bytes, however far into the
+file it is.
+
+The index is built on first use with a single scan. When the CSV changes it
+is refreshed: if the file strictly grew (``append_movies``) and a CRC of
+every byte it had before matches, only the new rows are scanned; otherwise
+the index is rebuilt. Checking the CRC reads the old bytes but parses none.
+
+Row boundaries follow CSV quoting, so quoted fields may contain newlines.
+Blank lines are skipped, as ``csv.DictReader`` skips them.
+"""
+
+import csv
+import io
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import zlib
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+INDEX_SUFFIX = ".idx"
+_MAGIC = b"ELKIDX2\0"
+# magic, CSV size, CSV mtime_ns, end of header row, row count, CRC of the whole indexed CSV.
+# Native byte order: the index is a local cache, and the offsets are written straight from an array
+_HEADER = struct.Struct("=8sqqqqI4x")
+_OFFSET = struct.Struct("=q")
+_CRC_CHUNK = 1 << 20
+
+
+class CSVOffsetIndex:
+    """Row offsets of one CSV file, kept in ``<csv_path>.idx``."""
+
+    def __init__(self, csv_path: str, index_path: Optional[str] = None) -> None:
+        self.csv_path = csv_path
+        self.index_path = index_path or csv_path + INDEX_SUFFIX
+        self._map: Optional[mmap.mmap] = None
+        self._header: Optional[Tuple] = None
+        self._fieldnames: Optional[List[str]] = None
+        # Guards the mapping, which a refresh replaces
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self.refresh()
+            return self._header[4]
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+    def _close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        self._map = None
+        self._header = None
+
+    # -- reading -----------------------------------------------------------
+
+    def read_row(self, i: int) -> Dict[str, str]:
+        """Row ``i`` (negative counts from the end) as a dict, like ``load_movies()[i]``."""
+        with self._lock:
+            count = len(self)
+            if i < 0:
+                i += count
+            if not 0 <= i < count:
+                raise IndexError("row index out of range")
+            return self.read_rows(i, 1)[0]
+
+    def read_rows(self, offset: int, limit: int) -> List[Dict[str, str]]:
+        """Up to ``limit`` rows starting at row ``offset``."""
+        if offset < 0 or limit < 0:
+            raise ValueError("offset and limit must not be negative.")
+        with self._lock:
+            stop = min(offset + limit, len(self))
+            if offset >= stop:
+                return []
+            begin, end = self._offset(offset), self._offset(stop)
+            fieldnames = self._fieldnames
+        with open(self.csv_path, "rb") as f:
+            data = os.pread(f.fileno(), end - begin, begin) if hasattr(os, "pread") else _seek_read(f, begin, end)
+        reader = csv.DictReader(io.StringIO(data.decode("utf-8"), newline=""), fieldnames=fieldnames)
+        return list(reader)
+
+    def _offset(self, i: int) -> int:
+        return _OFFSET.unpack_from(self._map, _HEADER.size + i * _OFFSET.size)[0]
+
+    # -- building ----------------------------------------------------------
+
+    def refresh(self) -> None:
+        """Make sure the index describes the CSV as it is now."""
+        with self._lock:
+            self._refresh()
+
+    def _refresh(self) -> None:
+        st = os.stat(self.csv_path)
+        if self._header is None:
+            self._open()
+        header = self._header
+        if header is not None and header[1] == st.st_size and header[2] == st.st_mtime_ns:
+            return
+        offsets, header_end, fieldnames, crc = self._extend(header, st.st_size)
+        if offsets is None:
+            offsets, header_end, fieldnames = self._scan(0, None, st.st_size)
+            crc = _crc(self.csv_path, 0, st.st_size)
+        self._write(offsets, header_end, st, crc)
+        self._fieldnames = fieldnames
+        self._open()
+        if self._header is None:
+            # The index just written was replaced by one this process can't read
+            raise OSError(f"Could not read the row index {self.index_path}")
+
+    def _open(self) -> None:
+        """Map the index file, if there is a valid one."""
+        self._close()
+        try:
+            with open(self.index_path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return
+        if len(mapped) < _HEADER.size or mapped[:len(_MAGIC)] != _MAGIC:
+            mapped.close()
+            return
+        header = _HEADER.unpack_from(mapped, 0)
+        if len(mapped) < _HEADER.size + (header[4] + 1) * _OFFSET.size:
+            mapped.close()
+            return
+        self._map, self._header = mapped, header
+        if self._fieldnames is None:
+            self._fieldnames = self._read_fieldnames(header[3])
+
+    def _read_fieldnames(self, header_end: int) -> List[str]:
+        with open(self.csv_path, "rb") as f:
+            first = f.read(header_end)
+        return next(csv.reader(io.StringIO(first.decode("utf-8"), newline="")), [])
+
+    def _extend(self, header: Optional[Tuple], size: int):
+        """Offsets for a CSV that only had rows appended since ``header``; None when it changed otherwise."""
+        rebuild = None, None, None, None
+        if header is None:
+            return rebuild
+        old_size, header_end, count, old_crc = header[1], header[3], header[4], header[5]
+        # A rewrite of the same size (rows reordered by save_movies) is not an append
+        if size <= old_size or header_end == 0:
+            return rebuild
+        old_end = self._offset(count)
+        # Resuming is only safe at a row boundary. A row still being written was left
+        # out of the index, so old_end may fall short of old_size
+        if old_end > old_size or not _ends_with_newline(self.csv_path, old_end):
+            return rebuild
+        # Every indexed byte must be as it was, not just the ones near the end
+        crc = _crc(self.csv_path, 0, old_size)
+        if crc != old_crc:
+            return rebuild
+        offsets = array("q", self._map[_HEADER.size:_HEADER.size + count * _OFFSET.size])
+        new_offsets, _, _ = self._scan(old_end, header_end, size)
+        offsets.extend(new_offsets)
+        return offsets, header_end, self._fieldnames, _crc(self.csv_path, old_size, size, crc)
+
+    def _scan(self, start: int, header_end: Optional[int], limit: int):
+        """Row start offsets from ``start`` up to byte ``limit``, with the end of the last row appended.
+
+        With ``header_end`` None the first record is the header row. Bytes
+        past ``limit`` (rows appended while scanning) are left for the next refresh,
+        and so is a last row without its newline, which is still being written.
+        """
+        offsets = array("q")
+        fieldnames = self._fieldnames
+        pos = record_start = start
+        quotes = 0
+        complete = True
+        with open(self.csv_path, "rb") as f:
+            f.seek(start)
+            for line in f:
+                if pos + len(line) > limit:
+                    line = line[:limit - pos]
+                if not line:
+                    break
+                if quotes == 0:
+                    record_start = pos
+                quotes += line.count(b'"')
+                pos += len(line)
+                if not line.endswith(b"\n"):
+                    complete = False
+                    break
+                # A newline inside a quoted field leaves an odd number of quotes open
+                if quotes % 2:
+                    continue
+                quotes = 0
+                if header_end is None:
+                    header_end = pos
+                    fieldnames = self._read_fieldnames(pos) if start == 0 else fieldnames
+                elif line.strip():
+                    offsets.append(record_start)
+        # A quoted field still open at the limit, or an unterminated last line, is a row
+        # not fully written yet
+        offsets.append(record_start if quotes % 2 or not complete else pos)
+        return offsets, header_end or 0, fieldnames
+
+    def _write(self, offsets: array, header_end: int, st: os.stat_result, crc: int) -> None:
+        # offsets holds every row start plus the end of the last row
+        header = _HEADER.pack(_MAGIC, st.st_size, st.st_mtime_ns, header_end, len(offsets) - 1, crc)
+        # A temp file of our own: other managers or processes may be building the same index
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.index_path)),
+                                   prefix=os.path.basename(self.index_path) + ".")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(header)
+                f.write(offsets.tobytes())
+            self._close()
+            os.replace(tmp, self.index_path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+
+def _crc(path: str, start: int, end: int, crc: int = 0) -> int:
+    """CRC-32 of bytes ``start`` to ``end`` of ``path``, continuing from ``crc``."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            chunk = f.read(min(remaining, _CRC_CHUNK))
+            if not chunk:
+                break
+            crc = zlib.crc32(chunk, crc)
+            remaining -= len(chunk)
+    return crc
+
+
+def _seek_read(f, begin: int, end: int) -> bytes:
+    f.seek(begin)
+    return f.read(end - begin)
+
+
+def _ends_with_newline(path: str, end: int) -> bool:
+    with open(path, "rb") as f:
+        f.seek(end - 1)
+        return f.read(1) == b"\n"
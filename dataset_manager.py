@@ -2,17 +2,47 @@
 #Base_dir: str
 #save_movies(movies, filename)
 #load_movies(filename)
+#iter_movies(filename, batch_size)
+#append_movies(movies, filename)
+#load_movie(filename, i)
+#load_range(filename, offset, limit)
 #movies: IMDB_Top_50_2016.json
 
 
 import os
 import csv
+import io
+import threading
+from itertools import islice
+
+from dataset_index import INDEX_SUFFIX, CSVOffsetIndex
+
+try:
+   import fcntl
+except ImportError:  # Windows: appends are still serialized between threads
+   fcntl = None
+
+FIELDNAMES = ['title', 'year', 'rating', 'genre']
+# Rows formatted in memory before each write to the file
+APPEND_BATCH_ROWS = 1000
+
+# One lock per dataset path, shared by every manager in the process
+_append_locks = {}
+_append_locks_guard = threading.Lock()
+
+
+def _append_lock(filepath):
+   with _append_locks_guard:
+       return _append_locks.setdefault(os.path.abspath(filepath), threading.Lock())
 
 
 class DataSetManager:
    def __init__(self, base_dir):
        self.base_dir = base_dir
        os.makedirs(base_dir, exist_ok=True)
+       # Row-offset indexes of the files read with load_movie/load_range, by path
+       self._indexes = {}
+       self._indexes_lock = threading.Lock()
       
 
 
@@ -21,10 +51,11 @@ class DataSetManager:
            raise TypeError("Movies should be a list of dictionaries.")
        
        filepath = os.path.join(self.base_dir, filename)
-       fieldnames = ['title', 'year', 'rating', 'genre']
+       # The rows are about to move, so offsets indexed from the old file are wrong
+       self._drop_index(filepath)
 
        with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES)
             writer.writeheader()
             for movie in movies:
                 if not isinstance(movie, dict):
@@ -32,11 +63,100 @@ class DataSetManager:
                 writer.writerow(movie)
 
 
+   def append_movies(self, movies, filename):
+       # Adds rows to the end of the file, writing the header only if the file is new or empty.
+       # Rows are formatted in batches of APPEND_BATCH_ROWS and each batch is one write; the
+       # whole append holds a per-file lock (and an flock where available), so appends from
+       # several threads or processes never interleave.
+       if isinstance(movies, (str, bytes, dict)) or not hasattr(movies, '__iter__'):
+           raise TypeError("Movies should be an iterable of dictionaries.")
+
+       filepath = os.path.join(self.base_dir, filename)
+       rows = iter(movies)
+       appended = 0
+       with _append_lock(filepath), open(filepath, 'a', newline='', encoding='utf-8') as csvfile:
+           if fcntl is not None:
+               fcntl.flock(csvfile.fileno(), fcntl.LOCK_EX)
+           try:
+               # Checked under the lock, so only the first writer adds a header
+               write_header = csvfile.seek(0, os.SEEK_END) == 0
+               while True:
+                   batch = list(islice(rows, APPEND_BATCH_ROWS))
+                   if not batch and not write_header:
+                       break
+                   buffer = io.StringIO()
+                   writer = csv.DictWriter(buffer, fieldnames=FIELDNAMES)
+                   if write_header:
+                       writer.writeheader()
+                       write_header = False
+                   for movie in batch:
+                       if not isinstance(movie, dict):
+                           raise TypeError("Each movie should be a dictionary.")
+                       writer.writerow(movie)
+                   csvfile.write(buffer.getvalue())
+                   # Flush per batch: the flock is released before the file is closed
+                   csvfile.flush()
+                   appended += len(batch)
+           finally:
+               if fcntl is not None:
+                   fcntl.flock(csvfile.fileno(), fcntl.LOCK_UN)
+       return appended
+
+
    def load_movies(self, filename):
+       return list(self.iter_movies(filename))
+
+
+   def load_movie(self, filename, i):
+       # Row i (negative counts from the end) through the file's .idx sidecar, built on first use
+       return self._index(filename).read_row(i)
+
+
+   def load_range(self, filename, offset, limit):
+       # Up to limit rows from row offset on, e.g. one page of an API listing
+       return self._index(filename).read_rows(offset, limit)
+
+
+   def _index(self, filename):
        filepath = os.path.join(self.base_dir, filename)
-       movies = []
-       with open(filepath, 'r', newline='', encoding='utf-8') as csvfile:
+       with self._indexes_lock:
+           index = self._indexes.get(filepath)
+           if index is None:
+               index = self._indexes[filepath] = CSVOffsetIndex(filepath)
+       return index
+
+
+   def _drop_index(self, filepath):
+       with self._indexes_lock:
+           index = self._indexes.pop(filepath, None)
+       if index is not None:
+           index.close()
+       try:
+           os.remove(filepath + INDEX_SUFFIX)
+       except FileNotFoundError:
+           pass
+
+
+   def iter_movies(self, filename, batch_size=None):
+       # Rows come straight from the reader, so memory stays flat however big the file is;
+       # with batch_size, lists of up to that many rows are yielded instead.
+       # Arguments are checked and the file opened here, so errors surface at the call
+       if batch_size is not None and batch_size < 1:
+           raise ValueError("batch_size must be at least 1.")
+
+       filepath = os.path.join(self.base_dir, filename)
+       csvfile = open(filepath, 'r', newline='', encoding='utf-8')
+       return self._iter_rows(csvfile, batch_size)
+
+   @staticmethod
+   def _iter_rows(csvfile, batch_size):
+       with csvfile:
            reader = csv.DictReader(csvfile)
-           for row in reader:
-               movies.append(row)
-       return movies
+           if batch_size is None:
+               yield from reader
+               return
+           while True:
+               batch = list(islice(reader, batch_size))
+               if not batch:
+                   return
+               yield batch
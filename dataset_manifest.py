@@ -0,0 +1,87 @@
+"""Remember which page body each dataset file was built from.
+
+The manifest is a small JSON file next to the datasets mapping each output
+file name to the SHA-256 of the response body it was parsed from. When a
+fresh fetch hashes the same and the file is still there, the scraper can
+skip parsing and rewriting it.
+
+Several scrapers (threads or processes) may record into one manifest: each
+``record`` re-reads the file under a lock and writes it back through a temp
+file of its own, so no writer drops another's entries.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: records are still serialized between threads
+    fcntl = None
+
+MANIFEST_NAME = "manifest.json"
+
+# One lock per manifest path, shared by every DatasetManifest in the process
+_path_locks: Dict[str, threading.Lock] = {}
+_path_locks_guard = threading.Lock()
+
+
+def _path_lock(path: str) -> threading.Lock:
+    with _path_locks_guard:
+        return _path_locks.setdefault(os.path.abspath(path), threading.Lock())
+
+
+def content_digest(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+class DatasetManifest:
+
+    def __init__(self, directory: str = "DataSets", name: str = MANIFEST_NAME) -> None:
+        self.directory = directory
+        self.path = os.path.join(directory, name)
+        self._lock = _path_lock(self.path)
+        self._entries: Dict[str, Dict] = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def digest(self, filename: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(filename)
+        return entry.get("sha256") if isinstance(entry, dict) else None
+
+    def is_unchanged(self, filename: str, digest: str) -> bool:
+        """True when ``filename`` exists and was built from a body hashing to ``digest``."""
+        return self.digest(filename) == digest and os.path.exists(os.path.join(self.directory, filename))
+
+    def record(self, filename: str, digest: str, url: Optional[str] = None) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock, open(f"{self.path}.lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            # Merge into what is on disk now, which other writers may have added to
+            entries = self._load()
+            entries[filename] = {"sha256": digest, "url": url, "updated_at": time.time()}
+            self._save(entries)
+            self._entries = entries
+
+    def _save(self, entries: Dict[str, Dict]) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=os.path.basename(self.path) + ".")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entries, f, indent=2, sort_keys=True)
+            os.replace(tmp, self.path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
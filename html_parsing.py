@@ -0,0 +1,253 @@
+"""Choose which BeautifulSoup tree builder the scrapers parse with.
+
+``html.parser`` ships with Python but is the slowest backend; ``lxml`` is
+several times faster and ``html5lib`` is the most lenient. Any of them can be
+selected with ``ELK_PARSER_BACKEND`` (or per call). ``auto`` picks the
+fastest one installed, and a backend that is not installed falls back the
+same way instead of failing, so the scrapers always run on a bare install.
+Run ``python benchmarks/parser_backends.py`` to compare them on real pages.
+
+Scrapers hand the parser the raw response bytes and the charset the server
+declared (see ``declared_encoding``) rather than ``response.text``: without a
+declared charset, ``requests`` runs charset detection over the whole body,
+and bs4 would then decode the result a second time.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import soupsieve
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.builder import builder_registry
+from bs4.element import Tag
+
+import settings
+
+_CHARSET_RE = re.compile(r'charset\s*=\s*["\']?([^"\';\s]+)', re.IGNORECASE)
+
+# Fastest first; html.parser is always available so the search never comes up empty
+FALLBACK_ORDER = ("lxml", "html.parser", "html5lib")
+
+
+def is_available(backend: str) -> bool:
+    """Whether bs4 has a tree builder for ``backend`` in this environment."""
+    return builder_registry.lookup(backend) is not None
+
+
+def available_parsers() -> List[str]:
+    """Installed backends, fastest first."""
+    return [name for name in FALLBACK_ORDER if is_available(name)]
+
+
+def resolve_parser(backend: Optional[str] = None) -> str:
+    """Return the backend to use for ``backend`` (default: ``settings.PARSER_BACKEND``).
+
+    ``auto`` or an uninstalled backend resolves to the fastest installed one.
+    """
+    backend = (backend or settings.PARSER_BACKEND or "auto").strip().lower()
+    if backend != "auto" and is_available(backend):
+        return backend
+    if backend not in ("auto",) + FALLBACK_ORDER:
+        raise ValueError(f"Unknown parser backend {backend!r}; expected one of auto, {', '.join(FALLBACK_ORDER)}.")
+    return available_parsers()[0]
+
+
+def class_strainer(name: Union[str, List[str]], classes: Iterable[str]) -> SoupStrainer:
+    """SoupStrainer for ``name`` tags (or any of a list of names) carrying any of ``classes``.
+
+    A plain ``SoupStrainer(name, class_=...)`` compares the raw ``class``
+    attribute while parsing, so ``<div class="a extra">`` would not match
+    ``a``; this one checks the individual class names like ``find_all`` does.
+    """
+    wanted = frozenset(classes)
+
+    def has_class(value: Union[str, List[str], None]) -> bool:
+        if not value:
+            return False
+        names = value.split() if isinstance(value, str) else value
+        return not wanted.isdisjoint(names)
+
+    return SoupStrainer(name, class_=has_class)
+
+
+def declared_encoding(response) -> Optional[str]:
+    """The charset named in a response's ``Content-Type`` header, or None.
+
+    Unlike ``response.encoding`` this never falls back to ISO-8859-1 for
+    ``text/*`` and never triggers detection; with None the parser reads the
+    byte-order mark or ``<meta charset>`` itself.
+    """
+    headers = getattr(response, "headers", None)
+    content_type = headers.get("Content-Type") if hasattr(headers, "get") else None
+    if not isinstance(content_type, str):
+        return None
+    match = _CHARSET_RE.search(content_type)
+    return match.group(1).lower() if match else None
+
+
+def decode_markup(markup: Union[str, bytes], encoding: Optional[str] = None) -> str:
+    """Decode ``markup`` with ``encoding`` (UTF-8 when missing or unknown); text passes through."""
+    if isinstance(markup, str):
+        return markup
+    try:
+        return markup.decode(encoding or "utf-8", errors="replace")
+    except LookupError:
+        return markup.decode("utf-8", errors="replace")
+
+
+def make_soup(markup, parser: Optional[str] = None, encoding: Optional[str] = None, **kwargs) -> BeautifulSoup:
+    """Build a BeautifulSoup tree with the resolved backend.
+
+    ``markup`` may be text or raw bytes; for bytes, ``encoding`` is the
+    declared charset to try first. Extra keyword arguments are passed
+    through to ``BeautifulSoup``.
+    """
+    backend = resolve_parser(parser)
+    if encoding and isinstance(markup, bytes):
+        kwargs.setdefault("from_encoding", encoding)
+    if backend == "html5lib":
+        # html5lib always builds the full tree and warns about parse_only
+        kwargs.pop("parse_only", None)
+    return BeautifulSoup(markup, backend, **kwargs)
+
+
+_IDENT = r"-?[_a-zA-Z\u00a0-\uffff][-\w\u00a0-\uffff]*"
+_TAG_RE = re.compile(_IDENT)
+_CLASS_RE = re.compile(rf"\.({_IDENT})")
+_ID_RE = re.compile(rf"#({_IDENT})")
+
+
+def _top_level(selector: str):
+    """Yield ``(char, depth)`` for ``selector``, with depth > 0 inside brackets, parentheses or quotes."""
+    depth = 0
+    quote = None
+    for char in selector:
+        if quote:
+            if char == quote:
+                quote = None
+            yield char, 1
+            continue
+        if char in "\"'":
+            quote = char
+            yield char, 1
+        elif char in "([":
+            depth += 1
+            yield char, depth
+        elif char in ")]":
+            yield char, depth
+            depth -= 1
+        else:
+            yield char, depth
+
+
+def _index_keys(selector: str) -> List[Tuple[Optional[str], Optional[str]]]:
+    """One (index, key) per comma-separated alternative: something its subject must have.
+
+    Only the top level of the last compound selector is read (what lies inside
+    ``:not(...)`` or ``[...]`` is not required of the subject). Anything this
+    does not understand, such as escapes or namespaces, is indexed as
+    ``(None, None)``, meaning "try on every tag".
+    """
+    alternatives = [[]]
+    for char, depth in _top_level(selector):
+        if char == "," and depth == 0:
+            alternatives.append([])
+        else:
+            alternatives[-1].append((char, depth))
+
+    keys = []
+    for alternative in alternatives:
+        compound = []
+        combinator = False
+        for char, depth in alternative:
+            if depth == 0 and (char.isspace() or char in ">+~"):
+                combinator = True
+                continue
+            # Trailing whitespace is not a combinator; only what follows one starts a new compound
+            if combinator:
+                compound, combinator = [], False
+            if depth == 0:
+                compound.append(char)
+        subject = "".join(compound)
+        if not subject or "\\" in subject or "|" in subject:
+            keys.append((None, None))
+            continue
+        # Keys are lower-cased so quirks-mode (case-insensitive) matches are still candidates
+        classes = _CLASS_RE.findall(subject)
+        ids = _ID_RE.findall(subject)
+        tag = _TAG_RE.match(subject)
+        if classes:
+            keys.append(("_by_class", classes[0].lower()))
+        elif ids:
+            keys.append(("_by_id", ids[0].lower()))
+        elif tag:
+            keys.append(("_by_name", tag.group().lower()))
+        else:
+            keys.append((None, None))
+    return keys
+
+
+class SelectorSet:
+    """A priority list of CSS selectors, compiled once and matched in one walk.
+
+    ``first_match`` returns what the first selector (in list order) with any
+    match would return from ``select``, without scanning the tree once per
+    selector. Each selector is indexed by something its subject must have,
+    a class, an id or a tag name, so a tag is only tested against the few
+    selectors that could match it. Work per tag therefore does not grow
+    with the number of selectors.
+    """
+
+    def __init__(self, selectors: Sequence[str]) -> None:
+        self.selectors = tuple(selectors)
+        # Only soupsieve's public compile()/match() are used; index keys come from the selector text
+        self._compiled = [soupsieve.compile(selector) for selector in self.selectors]
+        self._by_class: Dict[str, List[int]] = {}
+        self._by_id: Dict[str, List[int]] = {}
+        self._by_name: Dict[str, List[int]] = {}
+        self._always: List[int] = []
+        for index, selector in enumerate(self.selectors):
+            for key_map, key in _index_keys(selector):
+                if key_map is None:
+                    self._always.append(index)
+                else:
+                    getattr(self, key_map).setdefault(key, []).append(index)
+
+    def _candidates(self, tag: Tag) -> List[int]:
+        found = list(self._always)
+        found.extend(self._by_name.get(tag.name.lower(), ()))
+        classes = tag.get("class")
+        if classes:
+            for class_ in (classes.split() if isinstance(classes, str) else classes):
+                found.extend(self._by_class.get(class_.lower(), ()))
+        tag_id = tag.get("id")
+        if tag_id:
+            found.extend(self._by_id.get(tag_id.lower(), ()))
+        return found
+
+    def first_match(self, root: Tag, limit: Optional[int] = None) -> Tuple[Optional[str], List[Tag]]:
+        """Return ``(selector, matches)`` for the highest-priority selector matching under ``root``.
+
+        ``matches`` is in document order and holds at most ``limit`` tags.
+        Returns ``(None, [])`` when no selector matches anything.
+        """
+        best = len(self._compiled)
+        matches: List[Tag] = []
+        for tag in root.descendants:
+            if not isinstance(tag, Tag):
+                continue
+            for index in sorted(set(self._candidates(tag))):
+                if index > best:
+                    break
+                if self._compiled[index].match(tag):
+                    if index < best:
+                        best, matches = index, []
+                    if limit is None or len(matches) < limit:
+                        matches.append(tag)
+                    break
+            # Nothing can outrank the first selector once it has enough matches
+            if best == 0 and limit is not None and len(matches) >= limit:
+                break
+        if best == len(self._compiled):
+            return None, []
+        return self.selectors[best], matches
@@ -0,0 +1,235 @@
+"""Disk-backed HTTP response cache with conditional revalidation.
+
+Bodies are stored alongside their ``ETag``/``Last-Modified`` validators. On
+the next fetch the validators are sent as ``If-None-Match``/``If-Modified-Since``;
+a ``304 Not Modified`` is answered from disk. Callers can also keep the parsed
+result of a body next to it, so an unchanged page is not parsed again.
+
+The cache is capped at ``max_bytes`` and evicts least recently used entries.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+import settings
+
+_INDEX_FILE = "index.json"
+# Response headers worth keeping with a cached body
+_KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+class HTTPCache:
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None) -> None:
+        self.directory = directory or settings.CACHE_DIR
+        if not self.directory:
+            raise ValueError("A cache directory is required (set ELK_CACHE_DIR).")
+        self.max_bytes = max_bytes if max_bytes is not None else settings.CACHE_MAX_BYTES
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.RLock()
+        self._index: "OrderedDict[str, Dict[str, Any]]" = self._read_index()
+        self._counters = {"hits": 0, "misses": 0, "revalidations": 0, "stores": 0, "evictions": 0}
+
+    # -- lookups -----------------------------------------------------------
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Validator headers for a refresh of ``url`` (empty if not cached)."""
+        with self._lock:
+            entry = self._index.get(self._key(url))
+            if entry is None:
+                return {}
+            headers = {}
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+            if headers:
+                self._counters["revalidations"] += 1
+            return headers
+
+    def cached_response(self, url: str) -> Optional[requests.Response]:
+        """Rebuild the stored response for ``url`` after a 304, counting a hit."""
+        with self._lock:
+            key = self._key(url)
+            entry = self._index.get(key)
+            body = self._read_file(key + ".body") if entry is not None else None
+            if body is None:
+                self._forget(key)
+                return None
+            self._index.move_to_end(key)
+            self._write_index()
+            self._counters["hits"] += 1
+
+        response = requests.Response()
+        response.status_code = 200
+        response._content = body
+        response.url = url
+        response.encoding = entry.get("encoding")
+        response.headers = CaseInsensitiveDict(entry.get("headers", {}))
+        response.from_cache = True
+        return response
+
+    def load_parsed(self, url: str, kind: str) -> Optional[Any]:
+        """Return the parsed result stored for the cached body of ``url``."""
+        with self._lock:
+            key = self._key(url)
+            if key not in self._index:
+                return None
+            data = self._read_file(f"{key}.{kind}.json")
+        return json.loads(data.decode("utf-8")) if data is not None else None
+
+    # -- updates -----------------------------------------------------------
+
+    def store(self, url: str, response: requests.Response) -> None:
+        """Save a full 200 response for ``url``, replacing older body and parsed results."""
+        with self._lock:
+            self._counters["misses"] += 1
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            key = self._key(url)
+            # Whatever was cached is outdated now, even if this response can't replace it
+            self._forget(key)
+            if not etag and not last_modified:
+                # Nothing to revalidate with, so the body could never be reused
+                self._write_index()
+                return
+            body = response.content
+            self._write_file(key + ".body", body)
+            self._index[key] = {
+                "url": url,
+                "etag": etag,
+                "last_modified": last_modified,
+                "encoding": response.encoding,
+                "headers": {h: response.headers[h] for h in _KEPT_HEADERS if h in response.headers},
+                "size": len(body),
+                "parsed": [],
+            }
+            self._counters["stores"] += 1
+            self._evict()
+            self._write_index()
+
+    def store_parsed(self, url: str, kind: str, data: Any) -> None:
+        """Keep the parsed form of the cached body of ``url`` under ``kind``."""
+        with self._lock:
+            key = self._key(url)
+            entry = self._index.get(key)
+            if entry is None:
+                return
+            payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
+            self._write_file(f"{key}.{kind}.json", payload)
+            if kind not in entry["parsed"]:
+                entry["parsed"].append(kind)
+            entry["size"] += len(payload)
+            self._evict()
+            self._write_index()
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._index):
+                self._forget(key)
+            self._write_index()
+
+    # -- metrics -----------------------------------------------------------
+
+    def stats(self) -> Dict[str, int]:
+        """Counters since this cache object was created, plus current size."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self._index)
+            stats["bytes"] = sum(e["size"] for e in self._index.values())
+            return stats
+
+    def metrics_text(self, prefix: str = "elk_http_cache") -> str:
+        """Render ``stats()`` in the Prometheus text exposition format."""
+        lines = []
+        for name, value in self.stats().items():
+            if name in ("entries", "bytes"):
+                lines.append(f"{prefix}_{name} {value}")
+            else:
+                lines.append(f"{prefix}_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    # -- internals ---------------------------------------------------------
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _read_file(self, name: str) -> Optional[bytes]:
+        try:
+            with open(self._path(name), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write_file(self, name: str, data: bytes) -> None:
+        # A temp file of our own: other processes may share ELK_CACHE_DIR and write the same entry
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=name + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self._path(name))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def _remove_file(self, name: str) -> None:
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            pass
+
+    def _forget(self, key: str) -> None:
+        entry = self._index.pop(key, None)
+        self._remove_file(key + ".body")
+        for kind in (entry or {}).get("parsed", []):
+            self._remove_file(f"{key}.{kind}.json")
+
+    def _evict(self) -> None:
+        total = sum(e["size"] for e in self._index.values())
+        # OrderedDict order is the LRU order: oldest access first
+        while total > self.max_bytes and self._index:
+            key = next(iter(self._index))
+            total -= self._index[key]["size"]
+            self._forget(key)
+            self._counters["evictions"] += 1
+
+    def _read_index(self) -> "OrderedDict[str, Dict[str, Any]]":
+        data = self._read_file(_INDEX_FILE)
+        if data is None:
+            return OrderedDict()
+        try:
+            return OrderedDict(json.loads(data.decode("utf-8")))
+        except ValueError:
+            # A corrupt index only costs us the cached bodies
+            return OrderedDict()
+
+    def _write_index(self) -> None:
+        self._write_file(_INDEX_FILE, json.dumps(self._index).encode("utf-8"))
+
+
+_default_cache: Optional[HTTPCache] = None
+_default_lock = threading.Lock()
+
+
+def get_default_cache() -> Optional[HTTPCache]:
+    """Return the process-wide cache, or None when ``ELK_CACHE_DIR`` is unset."""
+    global _default_cache
+    if not settings.CACHE_DIR:
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = HTTPCache(settings.CACHE_DIR)
+        return _default_cache
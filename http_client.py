@@ -0,0 +1,181 @@
+"""Shared HTTP transport for the scrapers.
+
+All scrapers go through one keep-alive ``requests.Session`` so repeated page
+loads reuse pooled TCP/TLS connections instead of paying a new handshake on
+every request. Callers may inject their own session instead.
+
+Sessions built here mount a ``ScraperAdapter``, so every request they send
+waits on the shared per-host token bucket (see ``rate_limiter``), is retried
+on 429/5xx/connection errors and is refused outright while the host's
+circuit breaker is open (see ``retry_policy``).
+
+``fetch`` is the single GET path used by the scrapers; it layers the optional
+on-disk cache (see ``http_cache``) over the session, and appends fresh pages
+to the optional raw page archive (see ``page_archive``).
+"""
+
+import threading
+from typing import Mapping, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import settings
+from page_archive import get_default_archive
+from rate_limiter import HostRateLimiter, get_rate_limiter
+from retry_policy import CircuitBreaker, RetryPolicy, get_circuit_breaker, get_retry_policy
+
+_default_session: Optional[requests.Session] = None
+_default_lock = threading.Lock()
+
+
+class ScraperAdapter(HTTPAdapter):
+    """HTTPAdapter that rate-limits, retries and circuit-breaks every request.
+
+    Each attempt takes a token from the per-host limiter first. Retryable
+    statuses and connection errors are repeated per the retry policy; once
+    attempts run out the last response is returned (or the error raised) as
+    usual. Any of the collaborators left as None uses the process-wide one.
+    """
+
+    def __init__(
+        self,
+        limiter: Optional[HostRateLimiter] = None,
+        retry: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        **kwargs,
+    ) -> None:
+        self.limiter = limiter
+        self.retry = retry
+        self.breaker = breaker
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        limiter = self.limiter if self.limiter is not None else get_rate_limiter()
+        retry = self.retry if self.retry is not None else get_retry_policy()
+        breaker = self.breaker if self.breaker is not None else get_circuit_breaker()
+        host = (urlparse(request.url).hostname or "").lower()
+        can_retry = request.method in retry.retry_methods
+
+        attempt = 0
+        while True:
+            attempt += 1
+            trial = breaker.before_request(host)
+            # Every outcome is recorded inside the try; the finally only frees a
+            # trial left unresolved by any other exception, so the host can't stay half-open
+            try:
+                limiter.acquire(request.url)
+                try:
+                    response = super().send(request, **kwargs)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    breaker.record_failure(host)
+                    response, error = None, e
+                else:
+                    # 429 means the host is up but wants us to slow down
+                    if response.status_code >= 500:
+                        breaker.record_failure(host)
+                    else:
+                        breaker.record_success(host)
+            finally:
+                if trial:
+                    breaker.release_trial(host)
+
+            if response is None:
+                delay = retry.next_delay(attempt) if can_retry else None
+                if delay is None:
+                    raise error
+                retry.sleep(delay)
+                continue
+            if not retry.is_retryable_status(response.status_code):
+                return response
+
+            delay = retry.next_delay(attempt, response.headers.get("Retry-After")) if can_retry else None
+            if delay is None:
+                return response
+            response.close()
+            retry.sleep(delay)
+
+def create_session(
+    pool_connections: Optional[int] = None,
+    pool_maxsize: Optional[int] = None,
+    headers: Optional[Mapping[str, str]] = None,
+    limiter: Optional[HostRateLimiter] = None,
+    retry: Optional[RetryPolicy] = None,
+    breaker: Optional[CircuitBreaker] = None,
+) -> requests.Session:
+    """Build a keep-alive, rate-limited, retrying session with a tuned connection pool.
+
+    Limiter, retry policy and breaker default to the process-wide instances.
+    """
+    session = requests.Session()
+    adapter = ScraperAdapter(
+        limiter=limiter,
+        retry=retry,
+        breaker=breaker,
+        pool_connections=pool_connections or settings.POOL_CONNECTIONS,
+        pool_maxsize=pool_maxsize or settings.POOL_MAXSIZE,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide session, creating it on first use."""
+    global _default_session
+    with _default_lock:
+        if _default_session is None:
+            _default_session = create_session()
+        return _default_session
+
+
+def reset_session() -> None:
+    """Close the process-wide session; the next get_session() builds a new one."""
+    global _default_session
+    with _default_lock:
+        if _default_session is not None:
+            _default_session.close()
+        _default_session = None
+
+
+def fetch(
+    url: str,
+    session: Optional[requests.Session] = None,
+    headers: Optional[Mapping[str, str]] = None,
+    timeout: Optional[float] = 15,
+    cache=None,
+    archive=None,
+) -> requests.Response:
+    """GET ``url`` over the shared (or given) session.
+
+    With a cache, a stored copy is revalidated with its ETag/Last-Modified and
+    served from disk on ``304 Not Modified``; such responses carry
+    ``from_cache = True``. Fresh 200 responses are written to the cache, and
+    to ``archive`` (by default the ``ELK_ARCHIVE_DIR`` one, if set).
+    """
+    if session is None:
+        session = get_session()
+    request_headers = dict(headers or {})
+    if cache is not None:
+        request_headers.update(cache.conditional_headers(url))
+
+    response = session.get(url, headers=request_headers, timeout=timeout)
+
+    if cache is not None:
+        if response.status_code == 304:
+            cached = cache.cached_response(url)
+            if cached is not None:
+                return cached
+            # The stored body is gone; ask again without validators
+            response = session.get(url, headers=dict(headers or {}), timeout=timeout)
+        if response.status_code == 200:
+            cache.store(url, response)
+
+    if archive is None:
+        archive = get_default_archive()
+    if archive is not None and response.status_code == 200:
+        archive.append(url, response)
+    return response
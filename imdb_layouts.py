@@ -0,0 +1,177 @@
+"""Extraction plans for the IMDb search result layouts.
+
+Each layout IMDb has served is described by a ``LayoutPlan``: the tag and
+class of its result containers, plus a ``Field`` per movie key saying where
+the value lives inside a container. Plans are compiled into plain ``find``
+calls once, at import. A page's layout is detected once, from its
+containers, and then only that plan runs over every container, so no
+per-movie guessing between layouts is needed.
+
+To support a new layout, add a plan to ``LAYOUTS``.
+"""
+
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from bs4 import SoupStrainer
+from bs4.element import Tag
+
+from html_parsing import class_strainer
+
+# (tag name, class or None) — one find() step
+Step = Tuple[str, Optional[str]]
+
+
+def _find(tag: Tag, step: Step) -> Optional[Tag]:
+    name, class_ = step
+    # Passing class_=None would only match tags without a class attribute
+    return tag.find(name, class_=class_) if class_ else tag.find(name)
+
+
+class Field:
+    """Where one value lives inside a result container.
+
+    ``path`` is a chain of ``(tag, class)`` steps, each searched inside the
+    previous match; ``index`` picks the n-th match of the last step instead
+    of the first. The value is the ``attr`` attribute, or the stripped text.
+    ``prefer`` names a child whose text is used instead when it exists.
+    A field with ``default=None`` is required: containers missing it are skipped.
+    """
+
+    def __init__(
+        self,
+        *path: Step,
+        attr: Optional[str] = None,
+        index: int = 0,
+        prefer: Optional[Step] = None,
+        default: Optional[str] = None,
+        strip_index_prefix: bool = False,
+    ) -> None:
+        if not path:
+            raise ValueError("Field needs at least one (tag, class) step.")
+        self.path = path
+        self.attr = attr
+        self.index = index
+        self.prefer = prefer
+        self.default = default
+        self.strip_index_prefix = strip_index_prefix
+
+    def compile(self) -> Callable[[Tag, int], Optional[str]]:
+        """Return ``extract(container, position)`` for this field."""
+        head, (last_name, last_class) = self.path[:-1], self.path[-1]
+        last_kwargs = {"class_": last_class} if last_class else {}
+        attr, index, prefer, default = self.attr, self.index, self.prefer, self.default
+        strip_index_prefix = self.strip_index_prefix
+
+        def extract(container: Tag, position: int) -> Optional[str]:
+            element = container
+            for step in head:
+                element = _find(element, step)
+                if element is None:
+                    return default
+            if index:
+                matches = element.find_all(last_name, limit=index + 1, **last_kwargs)
+                element = matches[index] if len(matches) > index else None
+            else:
+                element = element.find(last_name, **last_kwargs)
+            if element is None:
+                return default
+
+            if attr is not None:
+                return element.get(attr, default)
+            if prefer is not None:
+                element = _find(element, prefer) or element
+            text = element.text.strip()
+            if strip_index_prefix:
+                # New-layout titles are numbered: "3. Title"
+                prefix = f"{position}. "
+                if text.startswith(prefix):
+                    text = text[len(prefix):]
+            return text
+
+        return extract
+
+
+class LayoutPlan:
+    """How to pull title, rating and plot out of one IMDb result layout."""
+
+    def __init__(self, name: str, container: Step, fields: Dict[str, Field]) -> None:
+        self.name = name
+        self.container = container
+        self.fields = dict(fields)
+        self._extractors = [(key, field.compile(), field.default is None) for key, field in self.fields.items()]
+
+    def containers(self, soup: Tag) -> List[Tag]:
+        name, class_ = self.container
+        return soup.find_all(name, class_=class_)
+
+    def extract(self, containers: Sequence[Tag]) -> List[Dict[str, str]]:
+        movies = []
+        for position, container in enumerate(containers, 1):
+            movie = {}
+            for key, extract, required in self._extractors:
+                value = extract(container, position)
+                if value is None and required:
+                    break
+                movie[key] = value
+            else:
+                movies.append(movie)
+        return movies
+
+
+LAYOUTS = [
+    LayoutPlan(
+        "lister",
+        container=("div", "lister-item-content"),
+        fields={
+            "title": Field(("h3", "lister-item-header"), ("a", None)),
+            "rating": Field(("div", "ratings-imdb-rating"), attr="data-value", default="N/A"),
+            "plot": Field(("p", "text-muted"), index=1, default="No description available"),
+        },
+    ),
+    LayoutPlan(
+        "ipc",
+        container=("div", "ipc-metadata-list-summary-item__tc"),
+        fields={
+            "title": Field(("h3", "ipc-title__text"), strip_index_prefix=True),
+            # The star also holds the vote count, e.g. "7.5 (1.2M)"; keep just the score
+            "rating": Field(("span", "ipc-rating-star"), prefer=("span", "ipc-rating-star--rating"), default="N/A"),
+            "plot": Field(("div", "ipc-html-content-inner-div"), default="No description available"),
+        },
+    ),
+]
+
+_strainers: Dict[Tuple[Step, ...], SoupStrainer] = {}
+
+
+def results_strainer() -> SoupStrainer:
+    """Strains a parse down to the result containers of every plan in ``LAYOUTS``.
+
+    Built from each plan's own container tag and class, so a plan added to
+    ``LAYOUTS`` is strained in whatever tag it uses. Cached per set of plans.
+    """
+    key = tuple(plan.container for plan in LAYOUTS)
+    strainer = _strainers.get(key)
+    if strainer is None:
+        names = sorted({name for name, _ in key})
+        classes = [class_ for _, class_ in key]
+        # A plan matching on the tag alone needs every tag of that name
+        strainer = SoupStrainer(names) if None in classes else class_strainer(names, classes)
+        _strainers[key] = strainer
+    return strainer
+
+
+def detect_layout(soup: Tag) -> Tuple[Optional[LayoutPlan], List[Tag]]:
+    """Return the first plan whose containers appear on the page, with those containers."""
+    for plan in LAYOUTS:
+        containers = plan.containers(soup)
+        if containers:
+            return plan, containers
+    return None, []
+
+
+def extract_movies(soup: Tag) -> List[Dict[str, str]]:
+    """Title, rating and plot for every result on a parsed search page."""
+    plan, containers = detect_layout(soup)
+    if plan is None:
+        return []
+    return plan.extract(containers)
@@ -1,121 +1,198 @@
 import requests
-from bs4 import BeautifulSoup
 import json
 import os
-from time import sleep
-
-def get_movies(year):
-    # Updated headers to look more like a real browser
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.9',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1',
-        'Sec-Fetch-Dest': 'document',
-        'Sec-Fetch-Mode': 'navigate',
-        'Sec-Fetch-Site': 'none',
-        'Sec-Fetch-User': '?1',
-        'DNT': '1'
-    }
-    
-    # First visit IMDB homepage
-    session = requests.Session()
-    print("Initializing session...")
-    session.get('https://www.imdb.com/', headers=headers)
-    sleep(2)  # Wait a bit
-    
-    # Then visit the search page
-    print("Navigating to search...")
-    session.get('https://www.imdb.com/search/title/', headers=headers)
-    sleep(2)  # Wait a bit
-    
+import re
+import threading
+import time
+import weakref
+
+import settings
+from dataset_manifest import DatasetManifest, content_digest
+from http_cache import get_default_cache
+from html_parsing import declared_encoding, decode_markup, make_soup
+from http_client import fetch, get_session
+from imdb_layouts import extract_movies, results_strainer
+
+# Updated headers to look more like a real browser
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Sec-Fetch-User': '?1',
+    'DNT': '1'
+}
+
+# The Next.js payload modern search pages embed, holding the whole result set as JSON
+NEXT_DATA_RE = re.compile(
+    r'<script[^>]*\bid=["\']__NEXT_DATA__["\'][^>]*>(.*?)</script>', re.DOTALL | re.IGNORECASE)
+# The same pattern for raw response bodies, so finding it needs no decode of the page
+NEXT_DATA_BYTES_RE = re.compile(NEXT_DATA_RE.pattern.encode('ascii'), re.DOTALL | re.IGNORECASE)
+
+# Sessions that already went through warm_up in this process
+_warmed_sessions = weakref.WeakSet()
+_warm_lock = threading.Lock()
+
+def warm_up(session, headers=HEADERS, cookie_file=None, force=False):
+    """Visit the IMDb homepage and search page so the session holds IMDb cookies.
+
+    This runs at most once per session per process. Cookies are saved to
+    ``cookie_file`` (``ELK_COOKIE_FILE``) and reloaded by later runs while
+    they are unexpired and younger than ``ELK_COOKIE_MAX_AGE`` seconds, in
+    which case no warm-up requests are made at all. Spacing between the
+    requests comes from the session's rate limiter, not fixed sleeps.
+    Returns True when the warm-up requests were actually sent.
+    """
+    if cookie_file is None:
+        cookie_file = settings.COOKIE_FILE
+
+    with _warm_lock:
+        if not force:
+            if session in _warmed_sessions:
+                return False
+            if _load_cookies(session, cookie_file):
+                _warmed_sessions.add(session)
+                return False
+
+        # First visit IMDB homepage, then the search page; the session's
+        # rate limiter spaces these out instead of fixed sleeps
+        print("Initializing session...")
+        session.get('https://www.imdb.com/', headers=headers)
+
+        print("Navigating to search...")
+        session.get('https://www.imdb.com/search/title/', headers=headers)
+
+        _save_cookies(session, cookie_file)
+        _warmed_sessions.add(session)
+        return True
+
+def _save_cookies(session, cookie_file):
+    cookies = [
+        {
+            'name': c.name,
+            'value': c.value,
+            'domain': c.domain,
+            'path': c.path,
+            'expires': c.expires,
+            'secure': c.secure,
+        }
+        for c in session.cookies
+    ]
+    if not cookie_file or not cookies:
+        return
+    tmp = cookie_file + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'saved_at': time.time(), 'cookies': cookies}, f)
+    os.replace(tmp, cookie_file)
+
+def _load_cookies(session, cookie_file):
+    """Load saved cookies into the session; False if there are none still valid."""
+    if not cookie_file:
+        return False
+    try:
+        with open(cookie_file, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    now = time.time()
+    if now - saved.get('saved_at', 0) > settings.COOKIE_MAX_AGE:
+        return False
+    cookies = [c for c in saved.get('cookies', []) if c.get('expires') is None or c['expires'] > now]
+    if not cookies:
+        return False
+
+    for c in cookies:
+        session.cookies.set(
+            c['name'], c['value'],
+            domain=c['domain'], path=c['path'], expires=c['expires'], secure=c['secure'],
+        )
+    return True
+
+def get_movies(year, session=None, cache=None, manifest=None, force=False, parser=None):
+    """Fetch one year's top 50, print it and save it to DataSets/IMDB_Top_50_{year}.json.
+
+    The SHA-256 of each fetched body is kept in ``manifest`` (by default
+    ``DataSets/manifest.json``). When the body hashes the same as the one the
+    saved file was built from, parsing and all file writes are skipped, unless
+    ``force`` is set. ``parser`` picks the BeautifulSoup backend (default
+    ``ELK_SEARCH_PARSER``, then ``ELK_PARSER_BACKEND``). Returns True on
+    success, False otherwise.
+    """
+    headers = HEADERS
+
+    # Reuse the shared keep-alive session instead of opening a new one per call
+    if session is None:
+        session = get_session()
+
+    # Pick up IMDb cookies once per process, or straight from the cookie file
+    warm_up(session, headers)
+
     # Finally make the actual search request
     url = f"https://www.imdb.com/search/title/?title_type=feature&release_date={year}&sort=num_votes,desc&count=50"
     print(f"\nFetching movies for {year}...")
-    
+
+    if cache is None:
+        cache = get_default_cache()
+
     try:
-        response = session.get(url, headers=headers)
+        response = fetch(url, session=session, headers=headers, cache=cache)
         response.raise_for_status()  # Check for HTTP errors
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Save the HTML for debugging
-        with open('debug.html', 'w', encoding='utf-8') as f:
-            f.write(response.text)
-            
-        # Try both old and new IMDB layouts
-        movie_containers = soup.find_all('div', class_='lister-item-content')
-        if not movie_containers:
-            movie_containers = soup.find_all('div', class_='ipc-metadata-list-summary-item__tc')
-            
-        if not movie_containers:
+
+        # Same body as the one the saved dataset came from: nothing to parse or write
+        output_name = f'IMDB_Top_50_{year}.json'
+        output_file = os.path.join('DataSets', output_name)
+        if manifest is None:
+            manifest = DatasetManifest('DataSets')
+        digest = content_digest(response.content)
+        if not force and manifest.is_unchanged(output_name, digest):
+            print(f"Page unchanged since the last run; keeping {output_file}")
+            return True
+
+        # Save the HTML for debugging, as the bytes the server sent
+        with open('debug.html', 'wb') as f:
+            f.write(response.content)
+
+        # An unchanged page (304) can reuse the movies parsed last time
+        movies = None
+        if cache is not None and getattr(response, 'from_cache', False):
+            movies = cache.load_parsed(url, 'movies')
+        if movies is None:
+            movies = parse_search_page(
+                response.content, parser=parser or settings.SEARCH_PARSER or None,
+                encoding=declared_encoding(response))
+            if movies and cache is not None:
+                cache.store_parsed(url, 'movies', movies)
+
+        if not movies:
             print("No movies found. IMDB might be blocking our request.")
             print("Try again in a few minutes or use a different year.")
             return False
-            
+
         print(f"\nTop Movies from {year}:")
         print("-" * 50)
-        
-        movies = []
-        for i, container in enumerate(movie_containers, 1):
-            movie = {}
-            
-            # Try to get title (multiple possible layouts)
-            title_element = container.find('h3', class_='lister-item-header')
-            if title_element and title_element.find('a'):
-                title = title_element.find('a').text.strip()
-            else:
-                title_element = container.find('h3', class_='ipc-title__text')
-                if title_element:
-                    title = title_element.text.strip()
-                    if title.startswith(f"{i}. "):
-                        title = title[len(f"{i}. "):]
-                else:
-                    continue
-                    
-            movie['title'] = title
-                
-            # Get rating
-            rating_element = container.find('div', class_='ratings-imdb-rating')
-            if rating_element:
-                rating = rating_element.get('data-value', 'N/A')
-            else:
-                rating_element = container.find('span', class_='ipc-rating-star')
-                rating = rating_element.text.strip() if rating_element else 'N/A'
-            movie['rating'] = rating
-            
-            # Get description
-            desc_element = container.find('div', class_='ipc-html-content-inner-div')
-            if desc_element:
-                plot = desc_element.text.strip()
-            else:
-                description = container.find_all('p', class_='text-muted')
-                if len(description) > 1:
-                    plot = description[1].text.strip()
-                else:
-                    plot = "No description available"
-            movie['plot'] = plot
-            
-            print(f"\n{i}. {title}")
-            print(f"   Rating: {rating}")
-            print(f"   Plot: {plot[:150]}...")  # Show first 150 characters of plot
-            
-            movies.append(movie)
-            sleep(0.1)  # Small delay between processing movies
-        
+
+        for i, movie in enumerate(movies, 1):
+            print(f"\n{i}. {movie['title']}")
+            print(f"   Rating: {movie['rating']}")
+            print(f"   Plot: {movie['plot'][:150]}...")  # Show first 150 characters of plot
+
         # Save to file
         if not os.path.exists('DataSets'):
             os.makedirs('DataSets')
-            
-        output_file = os.path.join('DataSets', f'IMDB_Top_50_{year}.json')
+
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(movies, f, indent=4, ensure_ascii=False)
-            
+        manifest.record(output_name, digest, url)
+
         print(f"\nSaved {len(movies)} movies to {output_file}")
         return True
-        
+
     except requests.RequestException as e:
         print(f"Error accessing IMDB: {str(e)}")
         return False
@@ -123,6 +200,70 @@ def get_movies(year):
         print(f"Unexpected error: {str(e)}")
         return False
 
+def parse_search_page(html, parser=None, strained=None, encoding=None):
+    """Extract title, rating and plot for each movie on an IMDb search page.
+
+    Handles every layout in ``imdb_layouts.LAYOUTS`` (the old ``lister-item``
+    and the new ``ipc-metadata-list``). Returns an empty list when no result
+    containers are found.
+    ``parser`` overrides the ``ELK_PARSER_BACKEND`` setting. With
+    ``strained`` (default ``ELK_STRAINED_PARSE``) only the result containers
+    are built, skipping the nav, ads and scripts around them.
+    ``html`` is the page text or its raw bytes; for bytes, ``encoding`` is
+    the charset the server declared, if any.
+    """
+    # Modern pages carry the results as JSON; reading that skips building a DOM at all
+    movies = parse_next_data(html, encoding)
+    if movies:
+        return movies
+
+    if strained is None:
+        strained = settings.STRAINED_PARSE
+    soup = make_soup(html, parser, encoding=encoding, parse_only=results_strainer() if strained else None)
+
+    # Detect the layout once, then run only that layout's extraction plan
+    return extract_movies(soup)
+
+def parse_next_data(html, encoding=None):
+    """Read title, rating and plot from the ``__NEXT_DATA__`` JSON of a search page.
+
+    Gives the same dicts as the DOM extraction plans in ``imdb_layouts``. Returns
+    None when the page has no such payload or it is not in the expected shape.
+    For raw bytes only the payload is decoded, with ``encoding`` (default UTF-8).
+    """
+    pattern = NEXT_DATA_BYTES_RE if isinstance(html, bytes) else NEXT_DATA_RE
+    match = pattern.search(html)
+    if not match:
+        return None
+    try:
+        data = json.loads(decode_markup(match.group(1), encoding))
+        items = data['props']['pageProps']['searchResults']['titleResults']['titleListItems']
+    except (ValueError, KeyError, TypeError):
+        return None
+    if not isinstance(items, list):
+        return None
+
+    movies = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        title = _json_text(item.get('titleText'))
+        if not title:
+            continue
+        # The page shows one decimal place, so 7 becomes "7.0" like the DOM text
+        summary = item.get('ratingSummary')
+        score = summary.get('aggregateRating') if isinstance(summary, dict) else None
+        rating = f"{score:.1f}" if isinstance(score, (int, float)) else 'N/A'
+        plot = _json_text(item.get('plot')) or "No description available"
+        movies.append({'title': title, 'rating': rating, 'plot': plot})
+    return movies
+
+def _json_text(value):
+    """Stripped text of a ``__NEXT_DATA__`` field, given as a string or as ``{"text": ...}``; None otherwise."""
+    if isinstance(value, dict):
+        value = value.get('text')
+    return value.strip() if isinstance(value, str) else None
+
 def main():
     year = input("Enter the year to fetch movies from (e.g., 2019): ")
     try:
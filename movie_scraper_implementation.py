@@ -1,47 +1,366 @@
 import requests
-from bs4 import BeautifulSoup
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 import json
+import multiprocessing
 import os
+import queue
+import threading
+
+import settings
+from http_cache import get_default_cache
+from html_parsing import class_strainer, declared_encoding, make_soup
+from http_client import fetch, get_session
+from movie_implementation import Movie
+
+
+SEARCH_URL = "https://www.imdb.com/search/title/?title_type=feature&release_date={year}&sort=num_votes,desc&count=50"
+# Same search, one page at a time; IMDb's start offset is 1-based
+PAGED_SEARCH_URL = "https://www.imdb.com/search/title/?title_type=feature&release_date={year}&sort=num_votes,desc&count={count}&start={start}"
+# The only part of a search page parse_page reads
+RESULTS_STRAINER = class_strainer('div', ['lister-item-content'])
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+# One parser-only scraper per pool worker, keyed by (class, parser backend)
+_worker_scrapers = {}
+# Parse workers are started while fetch threads run; forking a threaded process can copy a
+# held lock into the child, so they come from a fresh interpreter instead
+_POOL_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def movie_from_dict(data):
+    """Build a ``Movie`` from a parsed movie dict; an 'N/A' (or unparsable) rating becomes None."""
+    try:
+        rating = float(data['rating'])
+    except (TypeError, ValueError):
+        rating = None
+    return Movie(data['title'], rating, data['plot'])
+
+
+def _parse_in_worker(scraper_cls, parser, html, encoding=None):
+    """Parse one search page inside a pipeline parse worker."""
+    key = (scraper_cls, parser)
+    scraper = _worker_scrapers.get(key)
+    if scraper is None:
+        scraper = _worker_scrapers[key] = scraper_cls.for_parsing(parser)
+    return scraper.parse_page(html, encoding=encoding)
 
 
 class MovieScraper:
-    
-    def __init__(self):
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-    
+
+    def __init__(self, session=None, cache=None, parser=None):
+        self.headers = dict(HEADERS)
+        # Shared keep-alive session unless the caller injects one
+        self.session = session if session is not None else get_session()
+        # On-disk response cache; None when ELK_CACHE_DIR is not configured
+        self.cache = cache if cache is not None else get_default_cache()
+        # BeautifulSoup backend; None follows ELK_SEARCH_PARSER, then ELK_PARSER_BACKEND
+        self.parser = parser
+
+    @classmethod
+    def for_parsing(cls, parser=None):
+        """A scraper that can only parse pages: no session is created and no cache is looked up."""
+        scraper = cls.__new__(cls)
+        scraper.headers = {}
+        scraper.session = None
+        scraper.cache = None
+        scraper.parser = parser
+        return scraper
+
     def scrape_movies(self, year):
-        url = f"https://www.imdb.com/search/title/?title_type=feature&release_date={year}&sort=num_votes,desc&count=50"
-        
-        response = requests.get(url, headers=self.headers)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
+        url = SEARCH_URL.format(year=year)
+
+        response = fetch(url, session=self.session, headers=self.headers, cache=self.cache)
+        response.raise_for_status()
+
+        # An unchanged page (304) can reuse the movies parsed last time
+        if self.cache is not None and getattr(response, 'from_cache', False):
+            movies = self.cache.load_parsed(url, 'movies')
+            if movies is not None:
+                return movies
+
+        movies = self.parse_page(response.content, encoding=declared_encoding(response))
+        if self.cache is not None:
+            self.cache.store_parsed(url, 'movies', movies)
+        return movies
+
+    def iter_movies(self, year):
+        """Yield the year's movies as ``Movie`` objects, each as soon as its container is parsed.
+
+        Nothing but the current movie is held, unless there is a cache to
+        store the parsed page in.
+        """
+        yield from self._iter_response_movies(*self._fetch_year(year))
+
+    def iter_movies_for_years(self, years):
+        """Yield ``(year, Movie)`` for each year in turn, like ``iter_movies``.
+
+        The next year's page downloads on a background thread while the
+        current one is parsed. A failed fetch raises when its year is reached.
+        """
+        years = list(dict.fromkeys(years))
+        prefetch = ThreadPoolExecutor(max_workers=1)
+        pending = prefetch.submit(self._fetch_year, years[0]) if years else None
+        try:
+            for position, year in enumerate(years):
+                url, response = pending.result()
+                next_position = position + 1
+                pending = prefetch.submit(self._fetch_year, years[next_position]) if next_position < len(years) else None
+                for movie in self._iter_response_movies(url, response):
+                    yield year, movie
+                del response
+        finally:
+            if pending is not None:
+                pending.cancel()
+            prefetch.shutdown(wait=False)
+
+    def _fetch_year(self, year):
+        url = SEARCH_URL.format(year=year)
+        response = fetch(url, session=self.session, headers=self.headers, cache=self.cache)
+        response.raise_for_status()
+        return url, response
+
+    def _iter_response_movies(self, url, response):
+        # An unchanged page (304) can reuse the movies parsed last time
+        if self.cache is not None and getattr(response, 'from_cache', False):
+            movies = self.cache.load_parsed(url, 'movies')
+            if movies is not None:
+                for data in movies:
+                    yield movie_from_dict(data)
+                return
+
+        # The dicts are only kept when there is a cache to store them in
+        parsed = [] if self.cache is not None else None
+        for data in self.iter_page(response.content, encoding=declared_encoding(response)):
+            if parsed is not None:
+                parsed.append(data)
+            yield movie_from_dict(data)
+        if parsed is not None:
+            self.cache.store_parsed(url, 'movies', parsed)
+
+    def scrape_years(self, years, max_workers=4):
+        """Scrape several years at once using a bounded thread pool.
+
+        All workers share the scraper's pooled session, so size its pool
+        (``ELK_POOL_MAXSIZE``) to at least ``max_workers``. Returns a
+        ``(results, errors)`` pair of dicts keyed by year: ``results`` holds
+        the movie lists and ``errors`` the exception raised for each year
+        that failed, so one bad year never stops the rest of the batch.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1.")
+        years = list(dict.fromkeys(years))
+        done = {}
+        errors = {}
+        if not years:
+            return {}, errors
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(years))) as pool:
+            futures = {pool.submit(self.scrape_movies, year): year for year in years}
+            for future in as_completed(futures):
+                year = futures[future]
+                try:
+                    done[year] = future.result()
+                except Exception as e:
+                    errors[year] = e
+
+        # Keep the caller's year order rather than completion order
+        results = {year: done[year] for year in years if year in done}
+        return results, errors
+
+    def scrape_years_pipelined(self, years, fetch_workers=4, parse_workers=None, queue_size=None,
+                               parse_executor=None):
+        """Scrape several years with fetching and parsing on separate workers.
+
+        ``fetch_workers`` threads download pages into a queue holding at most
+        ``queue_size`` pages (default twice ``parse_workers``); when it is
+        full they wait, so a fast network cannot run ahead of the parsers.
+        Pages are parsed by a ``ProcessPoolExecutor`` of ``parse_workers``
+        processes (default: one per CPU), so parsing uses every core instead
+        of contending for the GIL. At most ``parse_workers`` pages are handed
+        to the pool at a time. Pass ``parse_executor`` to use an existing pool.
+        Returns the same ``(results, errors)`` pair as ``scrape_years``.
+        """
+        if fetch_workers < 1:
+            raise ValueError("fetch_workers must be at least 1.")
+        if parse_workers is None:
+            parse_workers = os.cpu_count() or 1
+        if parse_workers < 1:
+            raise ValueError("parse_workers must be at least 1.")
+        if queue_size is None:
+            queue_size = 2 * parse_workers
+        years = list(dict.fromkeys(years))
+        done = {}
+        errors = {}
+        if not years:
+            return {}, errors
+
+        # (year, url, html, encoding, outcome): raw bytes to parse, or the movies / exception already known
+        pages = queue.Queue(maxsize=queue_size)
+        stop = threading.Event()
+
+        def fetch_year(year):
+            url = SEARCH_URL.format(year=year)
+            # Stands in for the page if this worker dies some other way, so the consumer never waits forever
+            item = (year, url, None, None, RuntimeError(f"Fetching {url} stopped without a result"))
+            try:
+                response = None
+                try:
+                    response = fetch(url, session=self.session, headers=self.headers, cache=self.cache)
+                    response.raise_for_status()
+                    item = (year, url, response.content, declared_encoding(response), None)
+                    # An unchanged page (304) can reuse the movies parsed last time
+                    if self.cache is not None and getattr(response, 'from_cache', False):
+                        movies = self.cache.load_parsed(url, 'movies')
+                        if movies is not None:
+                            item = (year, url, None, None, movies)
+                except Exception as e:
+                    item = (year, url, None, None, e)
+                # Only the queued body should stay alive while waiting for room
+                del response
+            finally:
+                # Backpressure: wait here while the queue is full, unless the run was abandoned
+                while not stop.is_set():
+                    try:
+                        pages.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+
+        slots = threading.Semaphore(parse_workers)
+        pool = parse_executor if parse_executor is not None else ProcessPoolExecutor(
+            max_workers=parse_workers, mp_context=multiprocessing.get_context(_POOL_START_METHOD))
+        fetchers = ThreadPoolExecutor(max_workers=min(fetch_workers, len(years)))
+        parsing = {}
+        try:
+            for year in years:
+                fetchers.submit(fetch_year, year)
+
+            for _ in years:
+                # Wait for a free parser before taking a page, so none piles up here
+                slots.acquire()
+                year, url, html, encoding, outcome = pages.get()
+                if html is None:
+                    slots.release()
+                    if isinstance(outcome, Exception):
+                        errors[year] = outcome
+                    else:
+                        done[year] = outcome
+                    continue
+                future = pool.submit(_parse_in_worker, type(self), self.parser, html, encoding)
+                future.add_done_callback(lambda _: slots.release())
+                parsing[future] = (year, url)
+                del html
+
+            for future in as_completed(parsing):
+                year, url = parsing[future]
+                try:
+                    movies = future.result()
+                except Exception as e:
+                    errors[year] = e
+                    continue
+                done[year] = movies
+                if self.cache is not None:
+                    self.cache.store_parsed(url, 'movies', movies)
+        finally:
+            stop.set()
+            fetchers.shutdown(wait=True, cancel_futures=True)
+            if parse_executor is None:
+                pool.shutdown(wait=True, cancel_futures=True)
+
+        # Keep the caller's year order rather than completion order
+        results = {year: done[year] for year in years if year in done}
+        return results, errors
+
+    def stream_movies(self, year, page_size=50, max_results=None):
+        """Yield every movie for a year, walking the result pages by offset.
+
+        Once a page is parsed and found full, the next one starts downloading
+        on a background thread while the caller works through this one. At
+        most two pages are held at a time, so deep crawls stream with flat
+        memory. Stops at the first short or repeated page, or after
+        ``max_results`` movies, without requesting a page past it.
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1.")
+
+        def page_url(page):
+            return PAGED_SEARCH_URL.format(year=year, count=page_size, start=1 + page * page_size)
+
+        yielded = 0
+        previous = None
+        prefetch = ThreadPoolExecutor(max_workers=1)
+        try:
+            pending = prefetch.submit(self._fetch_page, page_url(0))
+            page = 0
+            while pending is not None:
+                html, encoding = pending.result()
+                page += 1
+                pending = None
+                movies = self.parse_page(html, encoding=encoding)
+                del html
+                # IMDb serves the last page again for offsets past the end
+                if not movies or movies == previous:
+                    break
+                # A short page is the last one, and max_results may already be in reach
+                if len(movies) == page_size and (max_results is None or yielded + page_size < max_results):
+                    pending = prefetch.submit(self._fetch_page, page_url(page))
+
+                for movie in movies:
+                    if max_results is not None and yielded >= max_results:
+                        return
+                    yield movie
+                    yielded += 1
+                previous = movies
+        finally:
+            if pending is not None:
+                pending.cancel()
+            prefetch.shutdown(wait=False)
+
+    def _fetch_page(self, url):
+        response = fetch(url, session=self.session, headers=self.headers, cache=self.cache)
+        response.raise_for_status()
+        return response.content, declared_encoding(response)
+
+    def parse_page(self, html, strained=None, encoding=None):
+        return list(self.iter_page(html, strained, encoding))
+
+    def iter_page(self, html, strained=None, encoding=None):
+        """Yield the movie dict of each result container, in page order."""
+        if strained is None:
+            strained = settings.STRAINED_PARSE
+        # A strained parse builds just the result containers, not the whole page;
+        # raw bytes are decoded by the parser, with the declared charset tried first
+        parser = self.parser or settings.SEARCH_PARSER or None
+        soup = make_soup(html, parser, encoding=encoding, parse_only=RESULTS_STRAINER if strained else None)
+
         movie_containers = soup.find_all('div', class_='lister-item-content')
-        
-        movies = []
+
         for i, container in enumerate(movie_containers, 1):
-            movie_data = self.parse_movie_data(container, i)
-            movies.append(movie_data)
-        
-        return movies
-    
+            try:
+                movie_data = self.parse_movie_data(container, i)
+            except AttributeError:
+                # Container without a title link; skip it like get_movies does
+                continue
+            yield movie_data
+
     def parse_movie_data(self, container, index):
         movie = {}
-        
+
         # Get title
         title_element = container.find('h3', class_='lister-item-header')
         title = title_element.find('a').text.strip()
         movie['title'] = title
-        
+
         # Get rating
         rating_element = container.find('div', class_='ratings-imdb-rating')
         rating = rating_element.get('data-value', 'N/A') if rating_element else 'N/A'
         movie['rating'] = rating
-        
+
         # Get plot
         description = container.find_all('p', class_='text-muted')
         plot = description[1].text.strip() if len(description) > 1 else "No description available"
         movie['plot'] = plot
-        
+
         return movie
@@ -0,0 +1,151 @@
+"""Append-only, compressed archive of the raw pages the scrapers fetch.
+
+With ``ELK_ARCHIVE_DIR`` set, every fresh 200 response that goes through
+``http_client.fetch`` is appended here: its URL, fetch time, status, headers
+and body bytes. Nothing is ever overwritten, so old captures can be parsed
+again offline (see ``archive_replay``) after a parser fix.
+
+The archive is a directory of daily segments, ``pages-YYYYMMDD.arc``. Each
+record is a marker, the length of what follows, and a gzip member holding one
+JSON header line followed by the body, so appending never rewrites earlier
+data. A record cut short by a crash is skipped: the reader resumes at the next
+marker, so pages archived after the crash that day are still read.
+"""
+
+import glob
+import gzip
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, List, Mapping, Optional
+
+import settings
+from html_parsing import declared_encoding
+
+SEGMENT_PATTERN = "pages-*.arc"
+# Starts every record; a reader that hits a torn record scans ahead for the next one
+_RECORD_MARK = b"\x00ELKPAGE"
+_RECORD_LENGTH = struct.Struct(">Q")
+
+
+class ArchivedPage:
+    """One archived response."""
+
+    def __init__(self, url: str, fetched_at: float, status: int, headers: Dict[str, str], body: bytes) -> None:
+        self.url = url
+        self.fetched_at = fetched_at
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    @property
+    def encoding(self) -> Optional[str]:
+        """Charset declared in the archived ``Content-Type`` header, if any."""
+        return declared_encoding(self)
+
+    def __repr__(self) -> str:
+        return f"ArchivedPage({self.url!r}, fetched_at={self.fetched_at!r}, {len(self.body)} bytes)"
+
+
+class PageArchive:
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        self.directory = directory or settings.ARCHIVE_DIR
+        if not self.directory:
+            raise ValueError("An archive directory is required (set ELK_ARCHIVE_DIR).")
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def append(self, url: str, response) -> None:
+        """Archive a ``requests`` response fetched from ``url``."""
+        self.add(url, response.content, headers=response.headers, status=response.status_code)
+
+    def add(
+        self,
+        url: str,
+        body: bytes,
+        headers: Optional[Mapping[str, str]] = None,
+        status: int = 200,
+        fetched_at: Optional[float] = None,
+    ) -> None:
+        """Append one page to today's segment."""
+        if fetched_at is None:
+            fetched_at = time.time()
+        header = {
+            "url": url,
+            "fetched_at": fetched_at,
+            "status": status,
+            "headers": dict(headers or {}),
+            "length": len(body),
+        }
+        member = gzip.compress(json.dumps(header).encode("utf-8") + b"\n" + body)
+        record = _RECORD_MARK + _RECORD_LENGTH.pack(len(member)) + member
+        path = os.path.join(self.directory, time.strftime("pages-%Y%m%d.arc", time.gmtime(fetched_at)))
+        # One unbuffered append per record, so concurrent writers never interleave a member
+        with self._lock, open(path, "ab", buffering=0) as f:
+            f.write(record)
+
+    def segments(self) -> List[str]:
+        """Segment files, oldest first."""
+        return sorted(glob.glob(os.path.join(self.directory, SEGMENT_PATTERN)))
+
+    def __iter__(self) -> Iterator[ArchivedPage]:
+        for path in self.segments():
+            yield from read_segment(path)
+
+
+def read_segment(path: str) -> Iterator[ArchivedPage]:
+    """Yield the pages of one segment in the order they were archived, skipping torn records."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            pos = data.find(_RECORD_MARK)
+            while pos != -1:
+                record = _read_record(data, pos)
+                if record is None:
+                    # A torn or corrupt record; whatever follows it is intact
+                    pos = data.find(_RECORD_MARK, pos + 1)
+                    continue
+                page, end = record
+                yield page
+                pos = data.find(_RECORD_MARK, end)
+
+
+def _read_record(data: mmap.mmap, pos: int):
+    """The page at ``pos`` and the offset just past it, or None if the record is damaged."""
+    start = pos + len(_RECORD_MARK) + _RECORD_LENGTH.size
+    if start > len(data):
+        return None
+    length, = _RECORD_LENGTH.unpack_from(data, pos + len(_RECORD_MARK))
+    end = start + length
+    if end > len(data):
+        return None
+    try:
+        line, _, body = gzip.decompress(data[start:end]).partition(b"\n")
+        header = json.loads(line)
+        if len(body) != header["length"]:
+            return None
+        page = ArchivedPage(header["url"], header["fetched_at"], header["status"], header["headers"], body)
+    except (EOFError, gzip.BadGzipFile, zlib.error, ValueError, KeyError, TypeError):
+        return None
+    return page, end
+
+
+_default_archive: Optional[PageArchive] = None
+_default_lock = threading.Lock()
+
+
+def get_default_archive() -> Optional[PageArchive]:
+    """Return the process-wide archive, or None when ``ELK_ARCHIVE_DIR`` is unset."""
+    global _default_archive
+    if not settings.ARCHIVE_DIR:
+        return None
+    with _default_lock:
+        if _default_archive is None:
+            _default_archive = PageArchive(settings.ARCHIVE_DIR)
+        return _default_archive
@@ -0,0 +1,117 @@
+"""Per-host token-bucket rate limiting shared by every scraper.
+
+A ``TokenBucket`` refills at ``rate`` tokens per second up to ``capacity``.
+Callers reserve a token under a short lock and then wait outside it, so the
+same bucket can be shared by worker threads (``acquire``) and asyncio tasks
+(``acquire_async``) without either blocking the other while it sleeps.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+
+import settings
+
+
+class TokenBucket:
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive; use no bucket for unlimited.")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token and return how many seconds to wait before using it.
+
+        The balance may go negative, which queues later callers behind
+        earlier ones in arrival order.
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            self._sleep(wait)
+
+    async def acquire_async(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class HostRateLimiter:
+    """One token bucket per host; a rate of 0 or less disables limiting."""
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        per_host: Optional[Dict[str, float]] = None,
+    ) -> None:
+        self.rate = settings.REQUESTS_PER_SECOND if rate is None else rate
+        self.burst = settings.RATE_LIMIT_BURST if burst is None else burst
+        self.per_host = dict(per_host or {})
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url_or_host: str) -> Optional[TokenBucket]:
+        host = urlparse(url_or_host).hostname if "//" in url_or_host else url_or_host
+        host = (host or "").lower()
+        with self._lock:
+            if host not in self._buckets:
+                rate = self.per_host.get(host, self.rate)
+                self._buckets[host] = TokenBucket(rate, self.burst) if rate > 0 else None
+            return self._buckets[host]
+
+    def acquire(self, url_or_host: str) -> None:
+        """Block the calling thread until a request to this host may be sent."""
+        bucket = self.bucket(url_or_host)
+        if bucket is not None:
+            bucket.acquire()
+
+    async def acquire_async(self, url_or_host: str) -> None:
+        """Suspend the calling task until a request to this host may be sent."""
+        bucket = self.bucket(url_or_host)
+        if bucket is not None:
+            await bucket.acquire_async()
+
+
+_default_limiter: Optional[HostRateLimiter] = None
+_default_lock = threading.Lock()
+
+
+def get_rate_limiter() -> HostRateLimiter:
+    """Return the process-wide limiter configured from ``settings``."""
+    global _default_limiter
+    with _default_lock:
+        if _default_limiter is None:
+            _default_limiter = HostRateLimiter()
+        return _default_limiter
+
+
+def set_rate_limiter(limiter: Optional[HostRateLimiter]) -> None:
+    """Replace the process-wide limiter; None rebuilds it from ``settings``."""
+    global _default_limiter
+    with _default_lock:
+        _default_limiter = limiter
@@ -0,0 +1,167 @@
+"""Retry with exponential backoff and a per-host circuit breaker.
+
+``RetryPolicy`` decides whether a failed attempt (429/5xx or a connection
+error) is worth repeating and how long to wait first: exponential backoff
+with jitter, or the server's ``Retry-After`` when it sends one.
+
+``CircuitBreaker`` counts consecutive failures per host. Once a host crosses
+the threshold it is considered down and requests fail fast with
+``CircuitOpenError`` until ``reset_timeout`` has passed; then a single trial
+request is let through to probe whether the host is back.
+"""
+
+import email.utils
+import random
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+import requests
+
+import settings
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+
+class RetryPolicy:
+
+    def __init__(
+        self,
+        max_attempts: Optional[int] = None,
+        backoff_base: Optional[float] = None,
+        backoff_max: Optional[float] = None,
+        retry_statuses: Iterable[int] = RETRY_STATUSES,
+        retry_methods: Iterable[str] = ("GET", "HEAD"),
+        sleep: Callable[[float], None] = time.sleep,
+        rand: Callable[[], float] = random.random,
+    ) -> None:
+        self.max_attempts = max_attempts if max_attempts is not None else settings.RETRY_MAX_ATTEMPTS
+        self.backoff_base = backoff_base if backoff_base is not None else settings.RETRY_BACKOFF_BASE
+        self.backoff_max = backoff_max if backoff_max is not None else settings.RETRY_BACKOFF_MAX
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_methods = frozenset(m.upper() for m in retry_methods)
+        self.sleep = sleep
+        self._rand = rand
+
+    def is_retryable_status(self, status: int) -> bool:
+        return status in self.retry_statuses
+
+    def next_delay(self, attempt: int, retry_after: Optional[str] = None) -> Optional[float]:
+        """Seconds to wait before attempt ``attempt + 1``, or None to give up.
+
+        A ``Retry-After`` value is honoured as is; if it asks for longer than
+        ``backoff_max`` we stop retrying rather than stall a worker.
+        """
+        if attempt >= self.max_attempts:
+            return None
+        if retry_after is not None:
+            delay = _parse_retry_after(retry_after)
+            if delay is not None:
+                return delay if delay <= self.backoff_max else None
+        # Equal jitter: at least half the exponential step, plus a random share
+        step = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return step / 2 + self._rand() * step / 2
+
+
+class CircuitBreaker:
+
+    def __init__(
+        self,
+        failure_threshold: Optional[int] = None,
+        reset_timeout: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = (
+            failure_threshold if failure_threshold is not None else settings.BREAKER_FAILURE_THRESHOLD
+        )
+        self.reset_timeout = reset_timeout if reset_timeout is not None else settings.BREAKER_RESET_TIMEOUT
+        self._clock = clock
+        self._hosts: Dict[str, Dict[str, object]] = {}
+        self._lock = threading.Lock()
+
+    def _state(self, host: str) -> Dict[str, object]:
+        return self._hosts.setdefault(host, {"failures": 0, "opened_at": None, "trial": False})
+
+    def is_open(self, host: str) -> bool:
+        with self._lock:
+            return self._state(host)["opened_at"] is not None
+
+    def before_request(self, host: str) -> bool:
+        """Raise CircuitOpenError unless a request to ``host`` may go ahead.
+
+        Returns True when the caller is the half-open trial request; it must
+        then call ``release_trial`` once the attempt is over, whatever its outcome.
+        """
+        with self._lock:
+            state = self._state(host)
+            opened_at = state["opened_at"]
+            if opened_at is None:
+                return False
+            if self._clock() - opened_at < self.reset_timeout or state["trial"]:
+                raise CircuitOpenError(f"Circuit open for {host}; not sending request.")
+            # Half-open: this caller is the single trial request
+            state["trial"] = True
+            return True
+
+    def release_trial(self, host: str) -> None:
+        """End a trial that recorded neither success nor failure, so the next request can probe."""
+        with self._lock:
+            self._state(host)["trial"] = False
+
+    def record_success(self, host: str) -> None:
+        with self._lock:
+            self._hosts[host] = {"failures": 0, "opened_at": None, "trial": False}
+
+    def record_failure(self, host: str) -> None:
+        with self._lock:
+            state = self._state(host)
+            state["failures"] += 1
+            if state["trial"] or state["failures"] >= self.failure_threshold:
+                state["opened_at"] = self._clock()
+                state["trial"] = False
+
+
+def _parse_retry_after(value: str) -> Optional[float]:
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+_default_policy: Optional[RetryPolicy] = None
+_default_breaker: Optional[CircuitBreaker] = None
+_default_lock = threading.Lock()
+
+
+def get_retry_policy() -> RetryPolicy:
+    global _default_policy
+    with _default_lock:
+        if _default_policy is None:
+            _default_policy = RetryPolicy()
+        return _default_policy
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """Return the process-wide breaker, so all scrapers agree on which hosts are down."""
+    global _default_breaker
+    with _default_lock:
+        if _default_breaker is None:
+            _default_breaker = CircuitBreaker()
+        return _default_breaker
+
+
+def reset_circuit_breaker() -> None:
+    """Forget every host's state; the next get_circuit_breaker() builds a new breaker."""
+    global _default_breaker
+    with _default_lock:
+        _default_breaker = None
@@ -0,0 +1,67 @@
+"""Runtime settings shared by the scrapers.
+
+Every value can be overridden with an environment variable of the same name
+prefixed with ``ELK_``, e.g. ``ELK_POOL_MAXSIZE=20``.
+"""
+
+import os
+
+
+def _env(name: str, default: str) -> str:
+    return os.environ.get(f"ELK_{name}", default)
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(_env(name, str(default)))
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(_env(name, str(default)))
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return _env(name, "1" if default else "0").strip().lower() in ("1", "true", "yes", "on")
+
+
+# Number of per-host connection pools the shared session keeps
+POOL_CONNECTIONS = _env_int("POOL_CONNECTIONS", 10)
+# Keep-alive connections kept open per host; size this to the worker count
+POOL_MAXSIZE = _env_int("POOL_MAXSIZE", 10)
+
+# Directory of the on-disk HTTP cache; leave empty to disable caching
+CACHE_DIR = _env("CACHE_DIR", "")
+# Size cap of the HTTP cache before least recently used entries are evicted
+CACHE_MAX_BYTES = _env_int("CACHE_MAX_BYTES", 256 * 1024 * 1024)
+
+# Directory of the append-only raw page archive; leave empty to disable archiving
+ARCHIVE_DIR = _env("ARCHIVE_DIR", "")
+
+# Where get_movies keeps the IMDb session cookies between runs
+COOKIE_FILE = _env("COOKIE_FILE", ".imdb_cookies.json")
+# Saved cookies older than this many seconds trigger a fresh warm-up
+COOKIE_MAX_AGE = _env_int("COOKIE_MAX_AGE", 12 * 60 * 60)
+
+# Requests per second allowed to any one host; 0 disables rate limiting
+REQUESTS_PER_SECOND = _env_float("REQUESTS_PER_SECOND", 0.5)
+# Requests a host may receive back-to-back before the rate applies
+RATE_LIMIT_BURST = _env_float("RATE_LIMIT_BURST", 1)
+
+# Attempts per request (first try included) for 429/5xx/connection errors
+RETRY_MAX_ATTEMPTS = _env_int("RETRY_MAX_ATTEMPTS", 4)
+# First backoff step in seconds; doubles on every further attempt
+RETRY_BACKOFF_BASE = _env_float("RETRY_BACKOFF_BASE", 1.0)
+# Longest single wait, including server-requested Retry-After delays
+RETRY_BACKOFF_MAX = _env_float("RETRY_BACKOFF_MAX", 30.0)
+# Consecutive failures after which a host's circuit opens
+BREAKER_FAILURE_THRESHOLD = _env_int("BREAKER_FAILURE_THRESHOLD", 5)
+# Seconds an open circuit waits before letting a trial request through
+BREAKER_RESET_TIMEOUT = _env_float("BREAKER_RESET_TIMEOUT", 60.0)
+
+# BeautifulSoup backend: auto, lxml, html.parser or html5lib (falls back if not installed)
+PARSER_BACKEND = _env("PARSER_BACKEND", "auto")
+# Backend for IMDb search pages only; empty follows PARSER_BACKEND
+SEARCH_PARSER = _env("SEARCH_PARSER", "")
+# Backend for the Centennial Impact page only; empty follows PARSER_BACKEND
+CENTENNIAL_PARSER = _env("CENTENNIAL_PARSER", "")
+# Parse only the result containers of IMDb listing pages instead of the whole DOM
+STRAINED_PARSE = _env_bool("STRAINED_PARSE", True)
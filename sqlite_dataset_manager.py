@@ -0,0 +1,188 @@
+"""SQLite storage for movie datasets, with the DataSetManager API.
+
+All datasets live in one database file under ``base_dir``; ``filename`` names
+a dataset inside it rather than a file. Writes are bulk ``executemany``
+inserts in one transaction, the database runs in WAL mode so readers never
+block the writer, and title, year and rating are indexed per dataset. The
+query methods are answered from those indexes instead of scanning rows in
+Python.
+
+Unlike the CSV manager, ``year`` comes back as an int and ``rating`` as a
+float; values that are missing or not numbers (IMDb's ``N/A``) are None.
+"""
+
+import os
+import sqlite3
+import threading
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from dataset_manager import FIELDNAMES
+
+DATABASE_NAME = "datasets.db"
+# Rows sent to SQLite per executemany call
+INSERT_BATCH_ROWS = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS datasets (name TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS movies (
+    id INTEGER PRIMARY KEY,
+    dataset TEXT NOT NULL REFERENCES datasets(name),
+    title TEXT,
+    year INTEGER,
+    rating REAL,
+    genre TEXT
+);
+-- Rows of one dataset in rowid order, for iter_movies and replacing a dataset
+CREATE INDEX IF NOT EXISTS movies_dataset ON movies (dataset);
+CREATE INDEX IF NOT EXISTS movies_title ON movies (dataset, title);
+CREATE INDEX IF NOT EXISTS movies_year ON movies (dataset, year);
+CREATE INDEX IF NOT EXISTS movies_rating ON movies (dataset, rating);
+"""
+_COLUMNS = ", ".join(FIELDNAMES)
+_INSERT = f"INSERT INTO movies (dataset, {_COLUMNS}) VALUES (?, ?, ?, ?, ?)"
+
+
+def _number(value: Any, kind: type) -> Optional[Any]:
+    if value is None or value == "":
+        return None
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class SQLiteDataSetManager:
+
+    def __init__(self, base_dir: str, database: str = DATABASE_NAME) -> None:
+        self.base_dir = base_dir
+        os.makedirs(base_dir, exist_ok=True)
+        self.path = os.path.join(base_dir, database)
+        # sqlite3 connections may not be shared between threads, so each thread opens its own
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Safe with WAL: a crash can only lose the last commits, never corrupt the file
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        """Close this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # -- writes ------------------------------------------------------------
+
+    def save_movies(self, movies: List[Dict[str, Any]], filename: str) -> None:
+        """Replace the dataset ``filename`` with ``movies``."""
+        if not isinstance(movies, list):
+            raise TypeError("Movies should be a list of dictionaries.")
+        self._write(movies, filename, replace=True)
+
+    def append_movies(self, movies: Iterable[Dict[str, Any]], filename: str) -> int:
+        """Add ``movies`` to the dataset ``filename`` (created if new); returns the rows added."""
+        if isinstance(movies, (str, bytes, dict)) or not hasattr(movies, "__iter__"):
+            raise TypeError("Movies should be an iterable of dictionaries.")
+        return self._write(movies, filename, replace=False)
+
+    def _write(self, movies: Iterable[Dict[str, Any]], filename: str, replace: bool) -> int:
+        conn = self._connection()
+        rows = iter(movies)
+        written = 0
+        # One transaction: readers see the old dataset or the new one, never half of it
+        with conn:
+            conn.execute("INSERT OR IGNORE INTO datasets (name) VALUES (?)", (filename,))
+            if replace:
+                conn.execute("DELETE FROM movies WHERE dataset = ?", (filename,))
+            while True:
+                batch = [self._row(filename, movie) for movie in islice(rows, INSERT_BATCH_ROWS)]
+                if not batch:
+                    break
+                conn.executemany(_INSERT, batch)
+                written += len(batch)
+        return written
+
+    @staticmethod
+    def _row(filename: str, movie: Dict[str, Any]) -> tuple:
+        if not isinstance(movie, dict):
+            raise TypeError("Each movie should be a dictionary.")
+        unknown = set(movie) - set(FIELDNAMES)
+        if unknown:
+            raise ValueError(f"Unknown movie fields: {', '.join(sorted(unknown))}")
+        return (
+            filename,
+            movie.get("title"),
+            _number(movie.get("year"), int),
+            _number(movie.get("rating"), float),
+            movie.get("genre"),
+        )
+
+    # -- reads -------------------------------------------------------------
+
+    def load_movies(self, filename: str) -> List[Dict[str, Any]]:
+        return list(self.iter_movies(filename))
+
+    def iter_movies(self, filename: str, batch_size: Optional[int] = None) -> Iterator[Any]:
+        """Yield the rows of ``filename`` in insertion order, or lists of up to ``batch_size`` rows.
+
+        Arguments and the dataset are checked when this is called, not on the first ``next()``.
+        """
+        if batch_size is not None and batch_size < 1:
+            raise ValueError("batch_size must be at least 1.")
+        self._require(filename)
+        cursor = self._connection().execute(
+            f"SELECT {_COLUMNS} FROM movies WHERE dataset = ? ORDER BY id", (filename,))
+        return self._iter_rows(cursor, batch_size)
+
+    @staticmethod
+    def _iter_rows(cursor: sqlite3.Cursor, batch_size: Optional[int]) -> Iterator[Any]:
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size or INSERT_BATCH_ROWS)
+                if not rows:
+                    return
+                if batch_size is None:
+                    yield from map(dict, rows)
+                else:
+                    yield [dict(row) for row in rows]
+        finally:
+            cursor.close()
+
+    def find_by_title(self, filename: str, title: str) -> List[Dict[str, Any]]:
+        """Movies whose title is exactly ``title``."""
+        return self._query(filename, "title = ?", (title,), "id")
+
+    def find_by_year_range(self, filename: str, start: int, end: int) -> List[Dict[str, Any]]:
+        """Movies released from ``start`` to ``end``, inclusive, oldest first."""
+        return self._query(filename, "year BETWEEN ? AND ?", (start, end), "year, id")
+
+    def top_rated(self, filename: str, n: int = 10) -> List[Dict[str, Any]]:
+        """The ``n`` highest-rated movies, ties most recently added first; unrated ones are left out."""
+        # Both keys descending, so walking the (dataset, rating) index backwards gives the order unsorted
+        return self._query(filename, "rating IS NOT NULL", (), "rating DESC, id DESC", n)
+
+    def datasets(self) -> List[str]:
+        return [row[0] for row in self._connection().execute("SELECT name FROM datasets ORDER BY name")]
+
+    def _query(self, filename: str, where: str, params: tuple, order: str, limit: Optional[int] = None):
+        self._require(filename)
+        sql = f"SELECT {_COLUMNS} FROM movies WHERE dataset = ? AND {where} ORDER BY {order}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return [dict(row) for row in self._connection().execute(sql, (filename,) + params)]
+
+    def _require(self, filename: str) -> None:
+        # Mirrors DataSetManager, whose loads raise for a file that was never saved
+        found = self._connection().execute("SELECT 1 FROM datasets WHERE name = ?", (filename,)).fetchone()
+        if found is None:
+            raise FileNotFoundError(f"No dataset named {filename!r} in {self.path}")
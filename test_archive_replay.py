@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from archive_replay import replay, replay_archive
+from centennial_scraper import parse_centennial_page
+from movie_scraper_implementation import MovieScraper
+from page_archive import PageArchive
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+SEARCH_URL = 'https://www.imdb.com/search/title/?release_date={year}'
+CENTENNIAL_URL = 'https://www.xula.edu/about/centennial.html'
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return f.read()
+
+
+class TestReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.archive = PageArchive(self.temp_dir.name)
+        self.search = read_fixture('imdb_search_old_layout.html')
+        self.centennial = read_fixture('xula_centennial.html')
+        for year in (2019, 2020):
+            self.archive.add(SEARCH_URL.format(year=year), self.search, {'Content-Type': 'text/html; charset=utf-8'})
+        self.archive.add(CENTENNIAL_URL, self.centennial)
+
+    def test_replays_movie_pages_in_processes(self):
+        results = list(replay_archive('movies', self.archive, workers=1))
+        expected = MovieScraper(session=object()).parse_page(self.search.decode('utf-8'))
+        self.assertEqual([page.url for page, _ in results], [SEARCH_URL.format(year=y) for y in (2019, 2020)])
+        self.assertEqual([movies for _, movies in results], [expected, expected])
+        self.assertEqual(len(expected), 50)
+
+    def test_search_page_replayer_reads_every_layout(self):
+        self.archive.add(SEARCH_URL.format(year=2021), read_fixture('imdb_search_new_layout.html'))
+        results = list(replay_archive('search_page', self.archive, url_pattern='2021', workers=1))
+        self.assertEqual(len(results[0][1]), 50)
+
+    def test_replays_centennial_parsers(self):
+        (page, data), = replay_archive('centennial', self.archive, workers=1)
+        self.assertEqual(data, parse_centennial_page(self.centennial.decode('utf-8')))
+        (page, items), = replay_archive('centennial_items', self.archive, workers=1)
+        self.assertEqual(len(items), 8)
+
+    def test_keeps_archive_order_and_reports_errors(self):
+        def parse(page, parser=None):
+            if page.url == CENTENNIAL_URL:
+                raise ValueError('not a search page')
+            return page.url
+
+        with ThreadPoolExecutor(2) as pool:
+            results = list(replay(iter(self.archive), parse, workers=1, executor=pool))
+        self.assertEqual([page.url for page, _ in results][:2], [result for _, result in results][:2])
+        self.assertIsInstance(results[2][1], ValueError)
+
+    def test_url_pattern_overrides_default(self):
+        results = list(replay_archive('movies', self.archive, url_pattern='2020', workers=1))
+        self.assertEqual([page.url for page, _ in results], [SEARCH_URL.format(year=2020)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from async_movie_scraper import AsyncMovieScraper
+from movie_scraper_implementation import MovieScraper
+from rate_limiter import HostRateLimiter
+from retry_policy import CircuitBreaker, CircuitOpenError, RetryPolicy
+
+
+def year_page(year):
+    return f'''
+    <div class="lister-item-content">
+        <h3 class="lister-item-header"><a>Movie of {year}</a></h3>
+        <div class="ratings-imdb-rating" data-value="8.1"></div>
+        <p class="text-muted">Genre info</p>
+        <p class="text-muted">Plot for {year}.</p>
+    </div>
+    '''
+
+
+class TestAsyncMovieScraper(unittest.IsolatedAsyncioTestCase):
+    """Runs AsyncMovieScraper against a local stand-in for the IMDb search page."""
+
+    async def asyncSetUp(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.delay = 0.01
+        self.flaky = {}
+
+        async def search(request):
+            year = request.query['release_date']
+            if self.flaky.get(year):
+                self.flaky[year] -= 1
+                return web.Response(status=503, headers={'Retry-After': '0'})
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                await asyncio.sleep(self.delay)
+            finally:
+                self.in_flight -= 1
+            if year == '1999':
+                return web.Response(status=503, text='Service Unavailable')
+            return web.Response(text=year_page(year), content_type='text/html')
+
+        app = web.Application()
+        app.router.add_get('/search/title/', search)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        url = str(self.server.make_url('/search/title/'))
+        self.scraper = AsyncMovieScraper(
+            max_concurrency=2,
+            search_url=url + '?title_type=feature&release_date={year}&sort=num_votes,desc&count=50',
+            limiter=HostRateLimiter(rate=0),
+            retry=RetryPolicy(max_attempts=1),
+            breaker=CircuitBreaker(failure_threshold=100),
+        )
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def test_scrape_movies_matches_sync_parser(self):
+        """Test that async results equal MovieScraper.parse_page output."""
+        result = await self.scraper.scrape_movies(2020)
+        self.assertEqual(result, MovieScraper().parse_page(year_page('2020')))
+        self.assertEqual(result[0]['rating'], '8.1')
+
+    async def test_scrape_years_keyed_by_year(self):
+        """Test that results are keyed by year in the order requested."""
+        results, errors = await self.scraper.scrape_years([2018, 2019, 2020])
+        self.assertEqual(errors, {})
+        self.assertEqual(list(results), [2018, 2019, 2020])
+        self.assertEqual(results[2019][0]['title'], 'Movie of 2019')
+
+    async def test_scrape_years_reports_failures(self):
+        """Test that a failing year is reported without stopping the batch."""
+        results, errors = await self.scraper.scrape_years([1999, 2000])
+        self.assertEqual(list(results), [2000])
+        self.assertEqual(list(errors), [1999])
+
+    async def test_concurrency_is_bounded(self):
+        """Test that no more than max_concurrency requests are in flight."""
+        self.delay = 0.05
+        await self.scraper.scrape_years(range(2000, 2010))
+        self.assertLessEqual(self.max_in_flight, 2)
+        self.assertGreater(self.max_in_flight, 1)
+
+    async def test_cancellation_stops_outstanding_requests(self):
+        """Test that cancelling scrape_years cancels in-flight work promptly."""
+        self.delay = 30
+        task = asyncio.ensure_future(self.scraper.scrape_years(range(2000, 2010)))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await asyncio.wait_for(task, timeout=5)
+
+    async def test_requests_wait_on_rate_limiter(self):
+        """Test that every request takes a token from the shared limiter."""
+        limiter = MagicMock()
+        limiter.acquire_async = AsyncMock()
+        self.scraper.limiter = limiter
+        await self.scraper.scrape_years([2001, 2002, 2003])
+        self.assertEqual(limiter.acquire_async.await_count, 3)
+
+    async def test_transient_errors_are_retried(self):
+        """Test that a 503 with Retry-After is retried until it succeeds."""
+        self.flaky['2005'] = 2
+        self.scraper.retry = RetryPolicy(max_attempts=3)
+        result = await self.scraper.scrape_movies(2005)
+        self.assertEqual(result[0]['title'], 'Movie of 2005')
+        self.assertEqual(self.flaky['2005'], 0)
+
+    async def test_open_circuit_fails_fast(self):
+        """Test that once the breaker opens, remaining years are not requested."""
+        self.scraper.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        self.scraper.max_concurrency = 1
+        results, errors = await self.scraper.scrape_years([1999, 2000])
+        self.assertEqual(results, {})
+        self.assertIsInstance(errors[2000], CircuitOpenError)
+
+    def test_invalid_concurrency(self):
+        with self.assertRaises(ValueError):
+            AsyncMovieScraper(max_concurrency=0)
+
+    def test_parser_needs_no_session_or_cache(self):
+        with patch('movie_scraper_implementation.get_session') as get_session, \
+                patch('movie_scraper_implementation.get_default_cache') as get_cache:
+            scraper = AsyncMovieScraper(parser='html.parser')
+        get_session.assert_not_called()
+        get_cache.assert_not_called()
+        self.assertEqual(scraper._parser.parser, 'html.parser')
+        self.assertEqual(scraper.headers, MovieScraper().headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
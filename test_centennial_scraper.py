@@ -1,7 +1,10 @@
+import os
 import unittest
-from unittest.mock import patch, Mock
+from unittest.mock import patch, Mock, MagicMock
 from bs4 import BeautifulSoup
 from centennial_scraper import scrape_centennial_impact, parse_centennial_page, fetch_html
+from centennial_scraper import collect_items, iter_centennial_items, stream_centennial_items
+from retry_policy import reset_circuit_breaker
 
 
 SAMPLE_HTML = """<html>
@@ -19,8 +22,17 @@ SAMPLE_HTML = """<html>
 </html>"""
 
 
+# What fetch() returns for SAMPLE_HTML: the raw body and the declared charset
+SAMPLE_RESPONSE = Mock(content=SAMPLE_HTML.encode("utf-8"), headers={"Content-Type": "text/html; charset=utf-8"},
+                       from_cache=False)
+
+
 class TestCentennialScraper(unittest.TestCase):
 
+    def setUp(self):
+        # The breaker is process-wide; failures from other tests must not open this host
+        reset_circuit_breaker()
+
     def test_returns_dict(self):
         """Test that the scraper returns a dictionary."""
         result = scrape_centennial_impact()
@@ -55,8 +67,9 @@ class TestCentennialScraper(unittest.TestCase):
 class TestEricScraperFunctions(unittest.TestCase):
     """Additional comprehensive tests for centennial scraper functions."""
 
-    @patch('centennial_scraper.requests.get')
-    def test_fetch_html_returns_text(self, mock_get):
+    @patch('http_client.get_session')
+    def test_fetch_html_returns_text(self, mock_get_session):
+        mock_get = mock_get_session.return_value.get
         mock_response = Mock()
         mock_response.text = "Hello, World!"
         mock_response.raise_for_status = Mock()
@@ -66,8 +79,9 @@ class TestEricScraperFunctions(unittest.TestCase):
         self.assertEqual(result, "Hello, World!")
         mock_response.raise_for_status.assert_called_once()
 
-    @patch('centennial_scraper.requests.get')
-    def test_fetch_html_raises_http_error(self, mock_get):
+    @patch('http_client.get_session')
+    def test_fetch_html_raises_http_error(self, mock_get_session):
+        mock_get = mock_get_session.return_value.get
         mock_response = Mock()
         mock_response.raise_for_status.side_effect = Exception("HTTP Error")
         mock_get.return_value = mock_response
@@ -75,6 +89,14 @@ class TestEricScraperFunctions(unittest.TestCase):
         with self.assertRaises(Exception):
             fetch_html("http://fakeurl.com")
 
+    def test_fetch_html_uses_injected_session(self):
+        session = Mock()
+        session.get.return_value.text = "Injected"
+
+        result = fetch_html("http://fakeurl.com", session=session)
+        self.assertEqual(result, "Injected")
+        session.get.assert_called_once()
+
     def test_parse_centennial_page_headings(self):
         result = parse_centennial_page(SAMPLE_HTML)
         self.assertIn("Main Heading", result["headings"])
@@ -105,7 +127,7 @@ class TestEricScraperFunctions(unittest.TestCase):
         self.assertEqual(result["paragraphs"], ["Paragraph"])
         self.assertEqual(result["links"], ["Link"])
 
-    @patch('centennial_scraper.fetch_html', return_value=SAMPLE_HTML)
+    @patch('centennial_scraper.fetch', return_value=SAMPLE_RESPONSE)
     def test_scrape_centennial_impact_dict(self, mock_fetch):
         result = scrape_centennial_impact()
         self.assertIsInstance(result, dict)
@@ -113,22 +135,133 @@ class TestEricScraperFunctions(unittest.TestCase):
         self.assertIn("paragraphs", result)
         self.assertIn("links", result)
 
-    @patch('centennial_scraper.fetch_html', return_value=SAMPLE_HTML)
+    @patch('centennial_scraper.fetch', return_value=SAMPLE_RESPONSE)
     def test_scrape_centennial_impact_headings_content(self, mock_fetch):
         result = scrape_centennial_impact()
         self.assertIn("Main Heading", result["headings"])
     
-    @patch('centennial_scraper.fetch_html', return_value=SAMPLE_HTML)
+    @patch('centennial_scraper.fetch', return_value=SAMPLE_RESPONSE)
     def test_scrape_centennial_impact_links_content(self, mock_fetch):
         result = scrape_centennial_impact()
         self.assertIn("Example Link", result["links"])
 
+    @patch('centennial_scraper.fetch')
+    def test_scrape_centennial_impact_parses_raw_bytes(self, mock_fetch):
+        mock_fetch.return_value = Mock(content="<h1>Caf\u00e9</h1>".encode("cp1252"),
+                                       headers={"Content-Type": "text/html; charset=windows-1252"})
+        with patch('centennial_scraper.get_default_cache', return_value=None):
+            result = scrape_centennial_impact()
+        self.assertEqual(result["headings"], ["Caf\u00e9"])
+        self.assertIsNone(mock_fetch.call_args.kwargs["cache"])
+
+    @patch('centennial_scraper.fetch', return_value=SAMPLE_RESPONSE)
+    def test_scrape_centennial_impact_parser_setting(self, mock_fetch):
+        with patch('centennial_scraper.get_default_cache', return_value=None), \
+                patch('centennial_scraper.parse_centennial_page', return_value={}) as parse:
+            with patch('settings.CENTENNIAL_PARSER', 'html5lib'):
+                scrape_centennial_impact()
+                scrape_centennial_impact(parser='html.parser')
+            scrape_centennial_impact()
+        self.assertEqual([c.args[1] for c in parse.call_args_list], ['html5lib', 'html.parser', None])
+
     def test_parse_empty_html(self):
         result = parse_centennial_page("<html></html>")
         self.assertEqual(result["headings"], [])
         self.assertEqual(result["paragraphs"], [])
         self.assertEqual(result["links"], [])
 
+    def test_parse_centennial_page_document_order(self):
+        html = """<html><body><main>
+        <h2>Second level first</h2><p>Intro</p>
+        <h1>Top level later</h1><h3>Detail</h3>
+        </main></body></html>"""
+        result = parse_centennial_page(html)
+        self.assertEqual(result["headings"], ["Second level first", "Top level later", "Detail"])
+
+    def test_parse_centennial_page_overlapping_containers(self):
+        html = """<html><body>
+        <nav><a href="/">Outside link</a><p>Outside paragraph</p></nav>
+        <div id="main-content"><article>
+            <div class="et_pb_text_inner"><h2>Block</h2><p>Inner <a href="/x">link</a></p></div>
+            <p>Article only</p>
+        </article></div>
+        </body></html>"""
+        result = parse_centennial_page(html)
+        self.assertEqual(result["headings"], ["Block"])
+        self.assertEqual(result["paragraphs"], ["Inner link", "Article only"])
+        self.assertEqual(result["links"], ["link"])
+
+    def test_parse_centennial_page_skips_comments_and_scripts(self):
+        html = """<main><p>Visible <!-- hidden --><script>var x = 1;</script> text</p></main>"""
+        result = parse_centennial_page(html)
+        self.assertEqual(result["paragraphs"], ["Visible text"])
+
+
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class TestCentennialStreaming(unittest.TestCase):
+    """The streaming extractor must agree with parse_centennial_page on html.parser."""
+
+    def setUp(self):
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "xula_centennial.html")
+        with open(path, "r", encoding="utf-8") as f:
+            self.html = f.read()
+
+    def test_matches_soup_parse_for_any_chunk_size(self):
+        expected = parse_centennial_page(self.html, parser="html.parser")
+        for size in (1, 13, 4096, len(self.html)):
+            with self.subTest(chunk_size=size):
+                items = iter_centennial_items(chunked(self.html.encode("utf-8"), size))
+                self.assertEqual(collect_items(items), expected)
+
+    def test_matches_soup_parse_on_messy_markup(self):
+        pages = [
+            SAMPLE_HTML,
+            "<main><p>a <!-- c --> <b>b</b><script>s</script></p><p>a b</p></main><div id='main-content'><a>a</a></div>",
+            "<article><p>1<p>2</p></p></article>",
+            "<main><p>Caf&eacute; &amp; <br>bar <img>baz</img> qux</p><p>unclosed <a href=x>link",
+            "<p>before</p><main><h2>In</h2></main><p>after</p>",
+            "<div class='x et_pb_text_inner'><h1>A</h1><h3>B<h2>C</h3></div></span><p>out</p>",
+            "<main><template><p>t</p></template><p>ok <style>x</style>y <![CDATA[raw]]></p></main>",
+        ]
+        for html in pages:
+            with self.subTest(html=html):
+                self.assertEqual(collect_items(iter_centennial_items(chunked(html, 5))),
+                                 parse_centennial_page(html, parser="html.parser"))
+
+    def test_multibyte_characters_split_across_chunks(self):
+        html = "<main><h1>Caf\u00e9 \u2014 na\u00efve</h1></main>".encode("utf-8")
+        self.assertEqual(collect_items(iter_centennial_items(chunked(html, 1)))["headings"],
+                         ["Caf\u00e9 \u2014 na\u00efve"])
+
+    def test_items_are_emitted_before_the_download_ends(self):
+        consumed = []
+
+        def chunks():
+            for chunk in chunked(self.html.encode("utf-8"), 1024):
+                consumed.append(chunk)
+                yield chunk
+
+        first = next(iter_centennial_items(chunks()))
+        self.assertEqual(first, ("headings", "Xavier University of Louisiana Centennial"))
+        self.assertLess(sum(map(len, consumed)), len(self.html.encode("utf-8")))
+
+    def test_stream_centennial_items_reads_response_incrementally(self):
+        session = MagicMock()
+        response = session.get.return_value
+        response.encoding = "utf-8"
+        response.iter_content.return_value = iter(chunked(self.html.encode("utf-8"), 2048))
+
+        data = collect_items(stream_centennial_items("https://example.edu/c.html", session=session, chunk_size=2048))
+
+        self.assertEqual(data, parse_centennial_page(self.html, parser="html.parser"))
+        self.assertTrue(session.get.call_args.kwargs["stream"])
+        response.iter_content.assert_called_once_with(chunk_size=2048)
+        response.close.assert_called_once()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,90 @@
+import json
+import math
+import mmap
+import os
+import tempfile
+import unittest
+
+from columnar_dataset import ColumnarDataset, MISSING_YEAR, convert, write_columnar
+from dataset_manager import DataSetManager
+
+
+class TestColumnarDataset(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.movies = [
+            {'title': 'Movie A', 'year': '2020', 'rating': '8.5', 'genre': 'Drama'},
+            {'title': 'Amélie, "quoted"', 'year': '2001', 'rating': 'N/A', 'genre': 'Comedy\nRomance'},
+            {'title': 'Movie C', 'year': '', 'rating': '7', 'genre': ''},
+        ]
+
+    def path(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
+    def test_typed_rows(self):
+        self.assertEqual(write_columnar(self.path('m.elkc'), iter(self.movies)), 3)
+        with ColumnarDataset(self.path('m.elkc')) as dataset:
+            self.assertEqual(len(dataset), 3)
+            self.assertEqual(dataset.fields, ['title', 'year', 'rating', 'genre'])
+            self.assertEqual(dataset.row(0), {'title': 'Movie A', 'year': 2020, 'rating': 8.5, 'genre': 'Drama'})
+            self.assertEqual(dataset.row(1)['title'], 'Amélie, "quoted"')
+            self.assertIsNone(dataset.row(1)['rating'])
+            self.assertIsNone(dataset.row(-1)['year'])
+            self.assertEqual(dataset.value('genre', 1), 'Comedy\nRomance')
+            with self.assertRaises(IndexError):
+                dataset.value('title', 3)
+
+    def test_numeric_columns_are_zero_copy_views(self):
+        write_columnar(self.path('m.elkc'), self.movies)
+        with ColumnarDataset(self.path('m.elkc')) as dataset:
+            ratings = dataset.column('rating')
+            years = dataset.column('year')
+            self.assertIsInstance(ratings.obj, mmap.mmap)
+            self.assertEqual((ratings.format, years.format), ('d', 'i'))
+            self.assertEqual(ratings[0], 8.5)
+            self.assertTrue(math.isnan(ratings[1]))
+            self.assertEqual(list(years), [2020, 2001, MISSING_YEAR])
+            with self.assertRaises(TypeError):
+                dataset.column('title')
+
+    def test_csv_round_trip(self):
+        manager = DataSetManager(self.temp_dir.name)
+        manager.save_movies(self.movies, 'm.csv')
+        self.assertEqual(convert(self.path('m.csv'), self.path('m.elkc')), 3)
+        self.assertEqual(convert(self.path('m.elkc'), self.path('back.csv')), 3)
+        back = manager.load_movies('back.csv')
+        self.assertEqual(back[0], {'title': 'Movie A', 'year': '2020', 'rating': '8.5', 'genre': 'Drama'})
+        # Ratings come back as numbers; N/A and missing cells stay empty
+        self.assertEqual([m['rating'] for m in back], ['8.5', '', '7.0'])
+        self.assertEqual([m['genre'] for m in back], [m['genre'] for m in self.movies])
+
+    def test_json_round_trip_keeps_scraper_fields(self):
+        scraped = [{'title': 'Heat', 'rating': '8.3', 'plot': 'A heist.'}, {'title': 'X', 'rating': 'N/A', 'plot': ''}]
+        with open(self.path('top.json'), 'w', encoding='utf-8') as f:
+            json.dump(scraped, f)
+        convert(self.path('top.json'), self.path('top.elkc'))
+        convert(self.path('top.elkc'), self.path('back.json'))
+        with open(self.path('back.json'), encoding='utf-8') as f:
+            self.assertEqual(json.load(f), [{'title': 'Heat', 'rating': 8.3, 'plot': 'A heist.'},
+                                            {'title': 'X', 'rating': None, 'plot': ''}])
+
+    def test_empty_dataset(self):
+        write_columnar(self.path('empty.elkc'), [])
+        with ColumnarDataset(self.path('empty.elkc')) as dataset:
+            self.assertEqual(len(dataset), 0)
+            self.assertEqual(list(dataset.rows()), [])
+            self.assertEqual(len(dataset.column('rating')), 0)
+
+    def test_rejects_other_files(self):
+        with open(self.path('m.csv'), 'w', encoding='utf-8') as f:
+            f.write('title,year,rating,genre\n' * 10)
+        with self.assertRaises(ValueError):
+            ColumnarDataset(self.path('m.csv'))
+        with self.assertRaises(TypeError):
+            write_columnar(self.path('bad.elkc'), [self.movies[0], 'not a dict'])
+
+
+if __name__ == '__main__':
+    unittest.main()
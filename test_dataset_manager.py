@@ -3,8 +3,9 @@ import unittest
 import os
 import csv  
 import tempfile
+import threading
 
-#10 unit tests for dataset_manager.py
+#25 unit tests for dataset_manager.py
 
 class TestDataSetManager(unittest.TestCase):
 
@@ -87,5 +88,191 @@ class TestDataSetManager(unittest.TestCase):
             reader = csv.DictReader(f)
             self.assertEqual(reader.fieldnames, ['title', 'year', 'rating', 'genre'])
 
+    def test_iter_movies_yields_rows_lazily(self):
+        filename = 'test_movies.csv'
+        self.manager.save_movies(self.sample_movies, filename)
+        rows = self.manager.iter_movies(filename)
+        self.assertEqual(next(rows), self.sample_movies[0])
+        self.assertEqual(list(rows), self.sample_movies[1:])
+
+    def test_iter_movies_in_batches(self):
+        filename = 'many_movies.csv'
+        movies = [dict(self.sample_movies[0], title=f'Movie {i}') for i in range(5)]
+        self.manager.save_movies(movies, filename)
+        batches = list(self.manager.iter_movies(filename, batch_size=2))
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+        self.assertEqual([row for batch in batches for row in batch], movies)
+        with self.assertRaises(ValueError):
+            self.manager.iter_movies(filename, batch_size=0)
+
+    def test_append_writes_header_once(self):
+        filename = 'catalog.csv'
+        self.assertEqual(self.manager.append_movies(self.sample_movies[:1], filename), 1)
+        self.assertEqual(self.manager.append_movies(self.sample_movies[1:], filename), 1)
+        filepath = os.path.join(self.temp_dir.name, filename)
+        with open(filepath, 'r', encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], ['title', 'year', 'rating', 'genre'])
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(self.manager.load_movies(filename), self.sample_movies)
+
+    def test_append_to_saved_file(self):
+        filename = 'catalog.csv'
+        self.manager.save_movies(self.sample_movies, filename)
+        self.manager.append_movies(iter(self.sample_movies), filename)
+        self.assertEqual(self.manager.load_movies(filename), self.sample_movies * 2)
+
+    def test_append_in_batches(self):
+        filename = 'catalog.csv'
+        movies = [dict(self.sample_movies[0], title=f'Movie {i}') for i in range(2500)]
+        self.assertEqual(self.manager.append_movies(movies, filename), 2500)
+        self.assertEqual(self.manager.load_movies(filename), movies)
+
+    def test_append_invalid_data(self):
+        filename = 'catalog.csv'
+        with self.assertRaises(TypeError):
+            self.manager.append_movies("This is not a list", filename)
+        with self.assertRaises(TypeError):
+            self.manager.append_movies([self.sample_movies[0], 'not a dict'], filename)
+        # A bad batch is rejected before any of it is written
+        self.assertEqual(self.manager.load_movies(filename), [])
+
+    def test_concurrent_appends_do_not_interleave(self):
+        filename = 'catalog.csv'
+
+        def worker(n):
+            movies = [dict(self.sample_movies[0], title=f'Worker {n} movie {i}') for i in range(300)]
+            DataSetManager(self.temp_dir.name).append_movies(movies, filename)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        filepath = os.path.join(self.temp_dir.name, filename)
+        with open(filepath, 'r', encoding='utf-8') as f:
+            self.assertEqual(sum(1 for line in f if line.startswith('title,')), 1)
+        titles = [row['title'] for row in self.manager.load_movies(filename)]
+        self.assertEqual(len(titles), 2400)
+        for n in range(8):
+            own = [t for t in titles if t.startswith(f'Worker {n} ')]
+            self.assertEqual(own, [f'Worker {n} movie {i}' for i in range(300)])
+
+    def _catalog(self, count=50):
+        movies = [
+            {'title': f'Movie "{i}"', 'year': str(2000 + i), 'rating': '7.0',
+             'genre': 'Drama,\nComedy' if i % 3 == 0 else 'Horror'}
+            for i in range(count)
+        ]
+        self.manager.save_movies(movies, 'catalog.csv')
+        return movies
+
+    def test_load_movie_by_index(self):
+        movies = self._catalog()
+        for i in (0, 1, 25, 49, -1):
+            self.assertEqual(self.manager.load_movie('catalog.csv', i), movies[i])
+        with self.assertRaises(IndexError):
+            self.manager.load_movie('catalog.csv', 50)
+        self.assertTrue(os.path.isfile(os.path.join(self.temp_dir.name, 'catalog.csv.idx')))
+
+    def test_load_range(self):
+        movies = self._catalog()
+        self.assertEqual(self.manager.load_range('catalog.csv', 10, 5), movies[10:15])
+        self.assertEqual(self.manager.load_range('catalog.csv', 45, 10), movies[45:])
+        self.assertEqual(self.manager.load_range('catalog.csv', 60, 10), [])
+        with self.assertRaises(ValueError):
+            self.manager.load_range('catalog.csv', -1, 10)
+
+    def test_index_follows_appends_and_rewrites(self):
+        movies = self._catalog()
+        self.manager.load_movie('catalog.csv', 0)
+        self.manager.append_movies(self.sample_movies, 'catalog.csv')
+        self.assertEqual(self.manager.load_range('catalog.csv', 49, 10), movies[49:] + self.sample_movies)
+        self.manager.save_movies(self.sample_movies[::-1], 'catalog.csv')
+        self.assertEqual(self.manager.load_range('catalog.csv', 0, 10), self.sample_movies[::-1])
+        # A fresh manager reuses the sidecar built by this one
+        self.assertEqual(DataSetManager(self.temp_dir.name).load_movie('catalog.csv', 1), self.sample_movies[0])
+
+    def test_index_skips_blank_lines_and_unfinished_rows(self):
+        filepath = os.path.join(self.temp_dir.name, 'catalog.csv')
+        with open(filepath, 'w', encoding='utf-8', newline='') as f:
+            f.write('title,year,rating,genre\r\nA,2001,7.0,Drama\r\n\r\nB,2002,6.0,"Half')
+        self.assertEqual(self.manager.load_range('catalog.csv', 0, 10),
+                         [{'title': 'A', 'year': '2001', 'rating': '7.0', 'genre': 'Drama'}])
+        with open(filepath, 'a', encoding='utf-8', newline='') as f:
+            f.write(' done"\r\n')
+        self.assertEqual(self.manager.load_range('catalog.csv', 0, 10), self.manager.load_movies('catalog.csv'))
+        self.assertEqual(self.manager.load_movie('catalog.csv', 1)['genre'], 'Half done')
+
+    def test_index_after_same_size_rewrite(self):
+        # Rows of different lengths, so swapping them moves the boundary between them
+        a = {'title': 'A', 'year': '2001', 'rating': '7.0', 'genre': 'Drama'}
+        b = {'title': 'B' * 21, 'year': '2002', 'rating': '6.0', 'genre': 'Horror'}
+        c = {'title': 'C', 'year': '2003', 'rating': '5.0', 'genre': 'X'}
+        # Enough rows after the two swapped ones that they sit well before the file's last 4 KiB
+        tail = [dict(c, title=f'Tail {i}') for i in range(500)]
+        self.manager.save_movies([a, b] + tail, 'catalog.csv')
+        self.assertEqual(self.manager.load_movie('catalog.csv', 0), a)
+        filepath = os.path.join(self.temp_dir.name, 'catalog.csv')
+        size = os.path.getsize(filepath)
+
+        self.manager.save_movies([b, a] + tail, 'catalog.csv')
+        self.assertEqual(os.path.getsize(filepath), size)
+        self.assertEqual(self.manager.load_movie('catalog.csv', 0), b)
+
+        # Rewritten behind the manager's back: same size, then reordered and grown
+        other = DataSetManager(self.temp_dir.name)
+        self.assertEqual(other.load_movie('catalog.csv', 0), b)
+        for rows in ([a, b] + tail, [b, a] + tail + [c]):
+            with open(filepath, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=['title', 'year', 'rating', 'genre'])
+                writer.writeheader()
+                writer.writerows(rows)
+            st = os.stat(filepath)
+            os.utime(filepath, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+            self.assertEqual(other.load_range('catalog.csv', 0, len(rows)), rows)
+
+    def test_index_leaves_out_unterminated_last_row(self):
+        self.manager.save_movies(self.sample_movies, 'catalog.csv')
+        filepath = os.path.join(self.temp_dir.name, 'catalog.csv')
+        with open(filepath, 'a', encoding='utf-8', newline='') as f:
+            f.write('Partial Ti')
+        self.assertEqual(self.manager.load_range('catalog.csv', 0, 10), self.sample_movies)
+        with open(filepath, 'a', encoding='utf-8', newline='') as f:
+            f.write('tle,2003,5.0,Horror\r\n')
+        self.assertEqual(self.manager.load_movie('catalog.csv', -1),
+                         {'title': 'Partial Title', 'year': '2003', 'rating': '5.0', 'genre': 'Horror'})
+
+    def test_concurrent_index_builds(self):
+        movies = self._catalog(20000)
+        idx = os.path.join(self.temp_dir.name, 'catalog.csv.idx')
+        for _ in range(5):
+            if os.path.exists(idx):
+                os.remove(idx)
+            barrier = threading.Barrier(8)
+            results, errors = [], []
+
+            def load():
+                barrier.wait()
+                try:
+                    # Separate managers do not share an index object, only the sidecar file
+                    results.append(DataSetManager(self.temp_dir.name).load_movie('catalog.csv', 5))
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=load) for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            self.assertEqual(errors, [])
+            self.assertEqual(results, [movies[5]] * 8)
+        self.assertEqual(sorted(os.listdir(self.temp_dir.name)), ['catalog.csv', 'catalog.csv.idx'])
+
+    def test_iter_movies_missing_file(self):
+        with self.assertRaises(FileNotFoundError):
+            self.manager.iter_movies('non_existent_file.csv')
+
 if __name__ == '__main__':
     unittest.main()       
@@ -0,0 +1,75 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from dataset_manifest import DatasetManifest, content_digest
+
+
+class TestDatasetManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.directory = os.path.join(self.temp_dir.name, 'DataSets')
+
+    def touch(self, name):
+        os.makedirs(self.directory, exist_ok=True)
+        open(os.path.join(self.directory, name), 'w').close()
+
+    def test_content_digest_is_sha256(self):
+        self.assertEqual(content_digest(b''), 'e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855')
+
+    def test_record_survives_reload(self):
+        DatasetManifest(self.directory).record('a.json', 'abc', 'https://example.com/a')
+        self.touch('a.json')
+        manifest = DatasetManifest(self.directory)
+        self.assertEqual(manifest.digest('a.json'), 'abc')
+        self.assertTrue(manifest.is_unchanged('a.json', 'abc'))
+        self.assertFalse(manifest.is_unchanged('a.json', 'def'))
+
+    def test_missing_output_file_is_not_unchanged(self):
+        manifest = DatasetManifest(self.directory)
+        manifest.record('a.json', 'abc')
+        self.assertFalse(manifest.is_unchanged('a.json', 'abc'))
+
+    def test_corrupt_manifest_starts_empty(self):
+        os.makedirs(self.directory)
+        with open(os.path.join(self.directory, 'manifest.json'), 'w') as f:
+            f.write('{not json')
+        self.assertIsNone(DatasetManifest(self.directory).digest('a.json'))
+
+    def test_stale_instance_keeps_other_entries(self):
+        first, second = DatasetManifest(self.directory), DatasetManifest(self.directory)
+        first.record('a.json', 'abc')
+        second.record('b.json', 'def')
+        reloaded = DatasetManifest(self.directory)
+        self.assertEqual((reloaded.digest('a.json'), reloaded.digest('b.json')), ('abc', 'def'))
+
+    def test_concurrent_records_from_separate_instances(self):
+        barrier = threading.Barrier(8)
+        errors = []
+
+        def record(n):
+            barrier.wait()
+            try:
+                # get_movies builds a manifest per call, so writers share only the file
+                for i in range(10):
+                    DatasetManifest(self.directory).record(f'{n}-{i}.json', f'{n}{i}')
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=record, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+        manifest = DatasetManifest(self.directory)
+        self.assertEqual([manifest.digest(f'{n}-{i}.json') for n in range(8) for i in range(10)],
+                         [f'{n}{i}' for n in range(8) for i in range(10)])
+        self.assertEqual(sorted(os.listdir(self.directory)), ['manifest.json', 'manifest.json.lock'])
+
+
+if __name__ == '__main__':
+    unittest.main()
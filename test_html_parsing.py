@@ -0,0 +1,178 @@
+import os
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import html_parsing
+from centennial_scraper import parse_centennial_page
+from movie_scraper import parse_search_page
+from movie_scraper_implementation import MovieScraper
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+class TestResolveParser(unittest.TestCase):
+
+    def test_html_parser_is_always_available(self):
+        self.assertIn('html.parser', html_parsing.available_parsers())
+        self.assertEqual(html_parsing.resolve_parser('html.parser'), 'html.parser')
+
+    def test_auto_picks_fastest_installed(self):
+        with patch.object(html_parsing, 'is_available', lambda name: name != 'lxml'):
+            self.assertEqual(html_parsing.resolve_parser('auto'), 'html.parser')
+        with patch.object(html_parsing, 'is_available', lambda name: True):
+            self.assertEqual(html_parsing.resolve_parser('auto'), 'lxml')
+
+    def test_missing_backend_falls_back(self):
+        with patch.object(html_parsing, 'is_available', lambda name: name == 'html.parser'):
+            self.assertEqual(html_parsing.resolve_parser('html5lib'), 'html.parser')
+
+    def test_default_comes_from_settings(self):
+        with patch.object(html_parsing.settings, 'PARSER_BACKEND', 'html.parser'):
+            self.assertEqual(html_parsing.resolve_parser(), 'html.parser')
+            self.assertEqual(html_parsing.make_soup('<p>x</p>').builder.NAME, 'html.parser')
+
+    def test_unknown_backend_raises(self):
+        with self.assertRaises(ValueError):
+            html_parsing.resolve_parser('regex')
+
+
+class TestClassStrainer(unittest.TestCase):
+
+    def test_matches_individual_class_names(self):
+        strainer = html_parsing.class_strainer('div', ['hit'])
+        soup = html_parsing.make_soup(
+            '<div class="hit">a</div><div class="x hit y">b</div><div class="hitx">c</div><p class="hit">d</p>',
+            'html.parser', parse_only=strainer)
+        self.assertEqual([d.text for d in soup.find_all('div')], ['a', 'b'])
+        self.assertIsNone(soup.find('p'))
+
+
+class TestRawMarkup(unittest.TestCase):
+
+    def response(self, content_type):
+        return SimpleNamespace(headers={'Content-Type': content_type} if content_type else {})
+
+    def test_declared_encoding(self):
+        self.assertEqual(html_parsing.declared_encoding(self.response('text/html; charset=UTF-8')), 'utf-8')
+        self.assertEqual(html_parsing.declared_encoding(self.response('text/html;charset="Shift_JIS"')), 'shift_jis')
+        # requests would report ISO-8859-1 here; nothing was actually declared
+        self.assertIsNone(html_parsing.declared_encoding(self.response('text/html')))
+        self.assertIsNone(html_parsing.declared_encoding(self.response(None)))
+
+    def test_make_soup_from_bytes(self):
+        markup = '<p>Café</p>'
+        self.assertEqual(html_parsing.make_soup(markup.encode('cp1252'), 'html.parser', encoding='cp1252').p.text, 'Café')
+        # Without a declared charset the parser reads <meta charset> itself
+        sniffed = '<meta charset="utf-8"><p>Café</p>'.encode('utf-8')
+        self.assertEqual(html_parsing.make_soup(sniffed, 'html.parser').p.text, 'Café')
+        # A declared encoding is ignored for text, which is already decoded
+        self.assertEqual(html_parsing.make_soup(markup, 'html.parser', encoding='cp1252').p.text, 'Café')
+
+    def test_decode_markup(self):
+        self.assertEqual(html_parsing.decode_markup('Café'.encode('cp1252'), 'cp1252'), 'Café')
+        self.assertEqual(html_parsing.decode_markup('Café'.encode('utf-8'), 'no-such-codec'), 'Café')
+        self.assertEqual(html_parsing.decode_markup('Café'), 'Café')
+
+
+class TestSelectorSet(unittest.TestCase):
+
+    SELECTORS = ['.event', '.event-item', '.event-list li', 'article.event', '#news li']
+
+    def select_in_order(self, soup):
+        """What trying each selector with soup.select in turn returns."""
+        for selector in self.SELECTORS:
+            found = soup.select(selector)
+            if found:
+                return selector, found
+        return None, []
+
+    def first_match(self, markup, limit=None):
+        soup = html_parsing.make_soup(markup, 'html.parser')
+        selectors = html_parsing.SelectorSet(self.SELECTORS)
+        result = selectors.first_match(soup, limit=limit)
+        if limit is None:
+            self.assertEqual(result, self.select_in_order(soup))
+        return result
+
+    def test_earlier_selector_wins_even_when_later_in_document(self):
+        selector, found = self.first_match(
+            '<ul class="event-list"><li>a</li><li>b</li></ul><div class="x event-item">c</div>')
+        self.assertEqual(selector, '.event-item')
+        self.assertEqual([tag.text for tag in found], ['c'])
+
+    def test_matches_in_document_order(self):
+        selector, found = self.first_match(
+            '<article class="event">1</article><div><span class="event">2</span></div><p class="event">3</p>')
+        self.assertEqual(selector, '.event')
+        self.assertEqual([tag.text for tag in found], ['1', '2', '3'])
+
+    def test_descendant_and_id_selectors(self):
+        self.assertEqual(self.first_match('<div id="news"><ul><li>x</li></ul></div><li>y</li>')[0], '#news li')
+        self.assertEqual(self.first_match('<ul class="list"><li>x</li></ul>'), (None, []))
+
+    def test_limit(self):
+        selector, found = self.first_match(''.join(f'<div class="event">{i}</div>' for i in range(10)), limit=3)
+        self.assertEqual(selector, '.event')
+        self.assertEqual([tag.text for tag in found], ['0', '1', '2'])
+
+    def test_agrees_with_select_on_fixture(self):
+        soup = html_parsing.make_soup(read_fixture('xula_centennial.html'), 'html.parser')
+        selector, found = html_parsing.SelectorSet(self.SELECTORS).first_match(soup)
+        self.assertEqual((selector, found), self.select_in_order(soup))
+        self.assertEqual(len(found), 8)
+
+    def test_index_keys_come_from_the_subject(self):
+        self.assertEqual(html_parsing._index_keys('div > p.a:not(.b), ul li, #k'),
+                         [('_by_class', 'a'), ('_by_name', 'li'), ('_by_id', 'k')])
+        # Unsure cases are tried on every tag rather than risk a missed match
+        for selector in ('*', ':is(.a, .b)', 'div [data-x]', 'ns|a', 'a\\.b'):
+            with self.subTest(selector=selector):
+                self.assertEqual(html_parsing._index_keys(selector), [(None, None)])
+
+    def test_agrees_with_select_for_any_selector_shape(self):
+        soup = html_parsing.make_soup(
+            '<div class="a b" id="k"><p class="c">1</p><p>2</p><span data-x="y z">3</span></div>'
+            '<ul><li class="c">4</li><li>5</li></ul><a href="#k">6</a>', 'html.parser')
+        for selector in ('p:not(.c)', 'div [data-x="y z"]', 'ul li:nth-child(2)', 'li.c, p.c',
+                         'div.b > p + p', ':is(li, a)', 'a[href^="#"]', '#k span', 'p ~ span'):
+            with self.subTest(selector=selector):
+                self.assertEqual(html_parsing.SelectorSet([selector]).first_match(soup),
+                                 (selector, soup.select(selector)))
+
+
+class TestBackendsAgree(unittest.TestCase):
+    """Every installed backend must extract the same data from the fixture pages."""
+
+    def test_imdb_search_pages(self):
+        for name in ('imdb_search_old_layout.html', 'imdb_search_new_layout.html'):
+            html = read_fixture(name)
+            reference = parse_search_page(html, parser='html.parser')
+            self.assertEqual(len(reference), 50)
+            for backend in html_parsing.available_parsers():
+                with self.subTest(page=name, backend=backend):
+                    self.assertEqual(parse_search_page(html, parser=backend), reference)
+
+    def test_movie_scraper_parse_page(self):
+        html = read_fixture('imdb_search_old_layout.html')
+        reference = MovieScraper(session=object(), parser='html.parser').parse_page(html)
+        for backend in html_parsing.available_parsers():
+            with self.subTest(backend=backend):
+                self.assertEqual(MovieScraper(session=object(), parser=backend).parse_page(html), reference)
+
+    def test_centennial_page(self):
+        html = read_fixture('xula_centennial.html')
+        reference = parse_centennial_page(html, parser='html.parser')
+        self.assertTrue(reference['headings'])
+        for backend in html_parsing.available_parsers():
+            with self.subTest(backend=backend):
+                self.assertEqual(parse_centennial_page(html, parser=backend), reference)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,191 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from http_cache import HTTPCache
+from http_client import fetch
+from movie_scraper_implementation import MovieScraper
+
+URL = "https://www.imdb.com/search/title/?release_date=2020"
+
+PAGE = b'''
+<div class="lister-item-content">
+    <h3 class="lister-item-header"><a>Cached Movie</a></h3>
+    <div class="ratings-imdb-rating" data-value="7.7"></div>
+    <p class="text-muted">Genre info</p>
+    <p class="text-muted">A plot worth caching.</p>
+</div>
+'''
+
+
+def make_response(status, body=b"", headers=None, url=URL):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.headers = CaseInsensitiveDict(headers or {})
+    response.url = url
+    response.encoding = "utf-8"
+    return response
+
+
+class TestHTTPCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = HTTPCache(self.temp_dir.name, max_bytes=10_000)
+        self.session = MagicMock()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_first_fetch_is_stored_and_counted_as_miss(self):
+        self.session.get.return_value = make_response(200, PAGE, {"ETag": '"v1"'})
+
+        response = fetch(URL, session=self.session, cache=self.cache)
+
+        self.assertEqual(response.content, PAGE)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+        self.assertEqual(self.cache.stats()["entries"], 1)
+
+    def test_refresh_sends_validators_and_serves_304_from_disk(self):
+        headers = {"ETag": '"v1"', "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"}
+        self.session.get.return_value = make_response(200, PAGE, headers)
+        fetch(URL, session=self.session, cache=self.cache)
+
+        self.session.get.return_value = make_response(304)
+        response = fetch(URL, session=self.session, headers={"User-Agent": "Elk"}, cache=self.cache)
+
+        sent = self.session.get.call_args.kwargs["headers"]
+        self.assertEqual(sent["If-None-Match"], '"v1"')
+        self.assertEqual(sent["If-Modified-Since"], headers["Last-Modified"])
+        self.assertEqual(sent["User-Agent"], "Elk")
+        self.assertTrue(response.from_cache)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.text, PAGE.decode("utf-8"))
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    def test_response_without_validators_is_not_stored(self):
+        self.session.get.return_value = make_response(200, PAGE)
+        fetch(URL, session=self.session, cache=self.cache)
+        self.assertEqual(self.cache.stats()["entries"], 0)
+        self.assertEqual(self.cache.conditional_headers(URL), {})
+
+    def test_new_body_drops_old_parsed_result(self):
+        self.session.get.return_value = make_response(200, PAGE, {"ETag": '"v1"'})
+        fetch(URL, session=self.session, cache=self.cache)
+        self.cache.store_parsed(URL, "movies", [{"title": "Old"}])
+
+        self.session.get.return_value = make_response(200, PAGE + b" ", {"ETag": '"v2"'})
+        fetch(URL, session=self.session, cache=self.cache)
+
+        self.assertIsNone(self.cache.load_parsed(URL, "movies"))
+        self.assertEqual(self.cache.conditional_headers(URL), {"If-None-Match": '"v2"'})
+
+    def test_new_body_without_validators_drops_old_entry(self):
+        self.session.get.return_value = make_response(200, PAGE, {"ETag": '"v1"'})
+        fetch(URL, session=self.session, cache=self.cache)
+        self.cache.store_parsed(URL, "movies", [{"title": "Old"}])
+
+        self.session.get.return_value = make_response(200, b"<html>new</html>")
+        fetch(URL, session=self.session, cache=self.cache)
+
+        self.assertEqual(self.cache.conditional_headers(URL), {})
+        self.assertIsNone(self.cache.load_parsed(URL, "movies"))
+        # The dropped entry stays dropped for a fresh instance reading the index
+        self.assertEqual(HTTPCache(self.temp_dir.name).stats()["entries"], 0)
+        self.assertEqual(os.listdir(self.temp_dir.name), ["index.json"])
+
+    def test_instances_sharing_a_directory_write_safely(self):
+        barrier = threading.Barrier(6)
+        errors = []
+
+        def store(n):
+            # Separate instances stand in for processes sharing ELK_CACHE_DIR
+            cache = HTTPCache(self.temp_dir.name, max_bytes=10_000_000)
+            barrier.wait()
+            try:
+                for i in range(30):
+                    cache.store(URL, make_response(200, PAGE * (n + 1), {"ETag": f'"{n}-{i}"'}))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=store, args=(n,)) for n in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+        self.assertFalse([name for name in os.listdir(self.temp_dir.name) if name.endswith(".tmp")])
+
+    def test_missing_body_after_304_refetches_unconditionally(self):
+        self.session.get.return_value = make_response(200, PAGE, {"ETag": '"v1"'})
+        fetch(URL, session=self.session, cache=self.cache)
+        for name in os.listdir(self.temp_dir.name):
+            if name.endswith(".body"):
+                os.remove(os.path.join(self.temp_dir.name, name))
+
+        self.session.get.side_effect = [make_response(304), make_response(200, PAGE, {"ETag": '"v1"'})]
+        response = fetch(URL, session=self.session, cache=self.cache)
+
+        self.assertEqual(response.content, PAGE)
+        self.assertNotIn("If-None-Match", self.session.get.call_args.kwargs["headers"])
+
+    def test_lru_eviction_respects_size_cap(self):
+        cache = HTTPCache(os.path.join(self.temp_dir.name, "small"), max_bytes=250)
+        body = b"x" * 100
+        for name in ("a", "b"):
+            cache.store(f"{URL}&{name}", make_response(200, body, {"ETag": name}))
+        cache.cached_response(f"{URL}&a")  # touch a, so b is now least recent
+        cache.store(f"{URL}&c", make_response(200, body, {"ETag": "c"}))
+
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertIsNone(cache.cached_response(f"{URL}&b"))
+        self.assertIsNotNone(cache.cached_response(f"{URL}&a"))
+        self.assertLessEqual(cache.stats()["bytes"], 250)
+
+    def test_index_persists_across_instances(self):
+        self.cache.store(URL, make_response(200, PAGE, {"ETag": '"v1"'}))
+        reopened = HTTPCache(self.temp_dir.name)
+        self.assertEqual(reopened.conditional_headers(URL), {"If-None-Match": '"v1"'})
+        self.assertEqual(reopened.cached_response(URL).content, PAGE)
+
+    def test_metrics_text(self):
+        self.cache.store(URL, make_response(200, PAGE, {"ETag": '"v1"'}))
+        text = self.cache.metrics_text()
+        self.assertIn("elk_http_cache_misses_total 1", text)
+        self.assertIn("elk_http_cache_entries 1", text)
+
+    def test_scraper_skips_parse_on_304(self):
+        scraper = MovieScraper(session=self.session, cache=self.cache)
+        self.session.get.return_value = make_response(200, PAGE, {"ETag": '"v1"'})
+        first = scraper.scrape_movies(2020)
+
+        self.session.get.return_value = make_response(304)
+        with patch.object(scraper, "parse_page") as parse_page:
+            second = scraper.scrape_movies(2020)
+
+        parse_page.assert_not_called()
+        self.assertEqual(first, second)
+        self.assertEqual(second[0]["title"], "Cached Movie")
+
+    def test_iter_movies_stores_and_reuses_parsed_page(self):
+        scraper = MovieScraper(session=self.session, cache=self.cache)
+        self.session.get.return_value = make_response(200, PAGE, {"ETag": '"v1"'})
+        first = [movie.to_json() for movie in scraper.iter_movies(2020)]
+
+        self.session.get.return_value = make_response(304)
+        with patch.object(scraper, "iter_page") as iter_page:
+            second = [movie.to_json() for movie in scraper.iter_movies(2020)]
+
+        iter_page.assert_not_called()
+        self.assertEqual(first, second)
+        self.assertEqual(second, [{"title": "Cached Movie", "rating": 7.7, "plot": "A plot worth caching."}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+
+import requests
+
+import http_client
+
+
+class TestHttpClient(unittest.TestCase):
+
+    def tearDown(self):
+        http_client.reset_session()
+
+    def test_create_session_mounts_pooled_adapter(self):
+        session = http_client.create_session(pool_connections=3, pool_maxsize=7)
+        adapter = session.get_adapter("https://www.imdb.com/")
+        self.assertEqual(adapter._pool_connections, 3)
+        self.assertEqual(adapter._pool_maxsize, 7)
+        self.assertIs(session.get_adapter("http://example.com/"), adapter)
+
+    def test_create_session_applies_headers(self):
+        session = http_client.create_session(headers={"User-Agent": "Elk"})
+        self.assertEqual(session.headers["User-Agent"], "Elk")
+
+    def test_get_session_is_shared(self):
+        first = http_client.get_session()
+        self.assertIsInstance(first, requests.Session)
+        self.assertIs(first, http_client.get_session())
+
+    def test_reset_session_builds_new_one(self):
+        first = http_client.get_session()
+        http_client.reset_session()
+        self.assertIsNot(first, http_client.get_session())
+
+
+if __name__ == "__main__":
+    unittest.main()
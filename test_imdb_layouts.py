@@ -0,0 +1,100 @@
+import os
+import unittest
+from unittest.mock import patch
+
+import imdb_layouts
+from html_parsing import make_soup
+from imdb_layouts import Field, LayoutPlan, detect_layout, extract_movies
+from movie_scraper import parse_search_page
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def fixture_soup(name):
+    with open(os.path.join(FIXTURES, name), 'r', encoding='utf-8') as f:
+        return make_soup(f.read(), 'html.parser')
+
+
+class TestDetectLayout(unittest.TestCase):
+
+    def test_detects_each_known_layout(self):
+        for name, layout in (('imdb_search_old_layout.html', 'lister'), ('imdb_search_new_layout.html', 'ipc')):
+            with self.subTest(page=name):
+                plan, containers = detect_layout(fixture_soup(name))
+                self.assertEqual(plan.name, layout)
+                self.assertEqual(len(containers), 50)
+
+    def test_unknown_page(self):
+        soup = make_soup('<div class="something-else"><h3>Nope</h3></div>', 'html.parser')
+        self.assertEqual(detect_layout(soup), (None, []))
+        self.assertEqual(extract_movies(soup), [])
+
+    def test_only_the_detected_plan_runs(self):
+        """New-layout containers are never searched with old-layout selectors."""
+        soup = fixture_soup('imdb_search_new_layout.html')
+        lister = imdb_layouts.LAYOUTS[0]
+        with patch.object(lister, 'extract', side_effect=AssertionError('lister plan ran')):
+            movies = extract_movies(soup)
+        self.assertEqual(len(movies), 50)
+        self.assertEqual(movies[0]['rating'], '4.6')
+
+
+class TestField(unittest.TestCase):
+
+    def setUp(self):
+        self.container = make_soup('''
+            <div class="c">
+                <h3 class="t"><span>skip</span><a>First</a></h3>
+                <p class="m">one</p><p class="m">two</p>
+                <span class="star"><span class="score">7.1</span> (10K)</span>
+                <div class="r" data-value="6.4"></div>
+                <h4 class="n">2. Numbered</h4>
+            </div>''', 'html.parser').div
+
+    def extract(self, field, position=1):
+        return field.compile()(self.container, position)
+
+    def test_path_and_text(self):
+        self.assertEqual(self.extract(Field(('h3', 't'), ('a', None))), 'First')
+
+    def test_step_without_class_matches_any_tag(self):
+        self.assertEqual(self.extract(Field(('h3', None), ('span', None))), 'skip')
+
+    def test_index_attr_prefer_and_prefix(self):
+        self.assertEqual(self.extract(Field(('p', 'm'), index=1)), 'two')
+        self.assertEqual(self.extract(Field(('div', 'r'), attr='data-value')), '6.4')
+        self.assertEqual(self.extract(Field(('span', 'star'), prefer=('span', 'score'))), '7.1')
+        self.assertEqual(self.extract(Field(('h4', 'n'), strip_index_prefix=True), position=2), 'Numbered')
+
+    def test_defaults(self):
+        self.assertEqual(self.extract(Field(('p', 'm'), index=5, default='none')), 'none')
+        self.assertEqual(self.extract(Field(('div', 'r'), attr='data-missing', default='N/A')), 'N/A')
+        self.assertIsNone(self.extract(Field(('ul', None), ('li', None))))
+
+    def test_needs_a_path(self):
+        with self.assertRaises(ValueError):
+            Field()
+
+
+class TestLayoutPlan(unittest.TestCase):
+
+    def test_new_layout_is_just_a_plan(self):
+        plan = LayoutPlan('cards', container=('article', 'card'), fields={
+            'title': Field(('h2', None)),
+            'rating': Field(('b', 'score'), default='N/A'),
+        })
+        html = '''<html><body><nav><h2>Menu</h2></nav>
+            <article class="card"><h2>One</h2><b class="score">9.0</b></article>
+            <article class="card"><p>No title, skipped</p></article>
+            <article class="card"><h2>Two</h2></article></body></html>'''
+        with patch.object(imdb_layouts, 'LAYOUTS', imdb_layouts.LAYOUTS + [plan]):
+            # The default strained parse must keep containers of any tag, not just divs
+            for strained in (True, False):
+                with self.subTest(strained=strained):
+                    self.assertEqual(parse_search_page(html, 'html.parser', strained=strained), [
+                        {'title': 'One', 'rating': '9.0'},
+                        {'title': 'Two', 'rating': 'N/A'},
+                    ])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,256 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, PropertyMock, patch
+
+import requests
+
+import movie_scraper
+
+
+class TestParseSearchPage(unittest.TestCase):
+
+    def _fixture(self, name):
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', name)
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def test_strained_parse_matches_full_parse(self):
+        for name in ('imdb_search_old_layout.html', 'imdb_search_new_layout.html'):
+            with self.subTest(page=name):
+                html = self._fixture(name)
+                full = movie_scraper.parse_search_page(html, strained=False)
+                self.assertEqual(len(full), 50)
+                self.assertEqual(movie_scraper.parse_search_page(html, strained=True), full)
+
+    def test_strained_parse_builds_only_result_containers(self):
+        soup = movie_scraper.make_soup(self._fixture('imdb_search_new_layout.html'),
+                                       parse_only=movie_scraper.results_strainer())
+        self.assertIsNone(soup.find('script'))
+        self.assertIsNone(soup.find('nav'))
+        self.assertEqual(len(soup.find_all('div', class_='ipc-metadata-list-summary-item__tc')), 50)
+
+    def test_setting_disables_strained_parse(self):
+        html = self._fixture('imdb_search_old_layout.html')
+        with patch.object(movie_scraper.settings, 'STRAINED_PARSE', False), \
+                patch.object(movie_scraper, 'make_soup', wraps=movie_scraper.make_soup) as soup:
+            movie_scraper.parse_search_page(html)
+        self.assertIsNone(soup.call_args.kwargs['parse_only'])
+
+    def test_raw_bytes_parse_like_text(self):
+        for name in ('imdb_search_old_layout.html', 'imdb_search_new_layout.html'):
+            with self.subTest(page=name):
+                html = self._fixture(name)
+                expected = movie_scraper.parse_search_page(html)
+                self.assertEqual(movie_scraper.parse_search_page(html.encode('utf-8')), expected)
+                self.assertEqual(movie_scraper.parse_search_page(html.encode('utf-8'), encoding='utf-8'), expected)
+
+    def test_raw_bytes_use_declared_encoding(self):
+        html = '<div class="lister-item-content"><h3 class="lister-item-header"><a>Amélie</a></h3></div>'
+        movies = movie_scraper.parse_search_page(html.encode('cp1252'), encoding='windows-1252')
+        self.assertEqual(movies[0]['title'], 'Amélie')
+
+    def _next_data_page(self, items):
+        payload = json.dumps({'props': {'pageProps': {'searchResults': {'titleResults': {'titleListItems': items}}}}})
+        return f'<html><body><script id="__NEXT_DATA__" type="application/json">{payload}</script></body></html>'
+
+    def test_next_data_matches_dom_parse(self):
+        html = self._fixture('imdb_search_new_layout.html')
+        dom_only = movie_scraper.NEXT_DATA_RE.sub('', html)
+        from_json = movie_scraper.parse_next_data(html)
+        self.assertEqual(len(from_json), 50)
+        self.assertIsNone(movie_scraper.parse_next_data(dom_only))
+        self.assertEqual(from_json, movie_scraper.parse_search_page(dom_only))
+
+    def test_next_data_skips_dom_construction(self):
+        html = self._fixture('imdb_search_new_layout.html')
+        with patch.object(movie_scraper, 'make_soup') as soup:
+            movies = movie_scraper.parse_search_page(html)
+        soup.assert_not_called()
+        self.assertEqual(len(movies), 50)
+
+    def test_next_data_missing_fields(self):
+        html = self._next_data_page([
+            {'titleText': 'Unrated', 'ratingSummary': {'aggregateRating': None}},
+            {'titleText': 'Round', 'ratingSummary': {'aggregateRating': 7}, 'plot': ' A plot. '},
+            {'titleText': ''},
+        ])
+        self.assertEqual(movie_scraper.parse_next_data(html), [
+            {'title': 'Unrated', 'rating': 'N/A', 'plot': 'No description available'},
+            {'title': 'Round', 'rating': '7.0', 'plot': 'A plot.'},
+        ])
+
+    def test_next_data_text_objects(self):
+        html = self._next_data_page([
+            {'titleText': {'text': ' Object Title '}, 'ratingSummary': {'aggregateRating': 8.1},
+             'plot': {'text': 'An object plot.'}},
+            {'titleText': {'id': 'no text'}},
+            {'titleText': 42},
+            {'titleText': 'Plain', 'plot': ['not', 'text']},
+        ])
+        self.assertEqual(movie_scraper.parse_next_data(html), [
+            {'title': 'Object Title', 'rating': '8.1', 'plot': 'An object plot.'},
+            {'title': 'Plain', 'rating': 'N/A', 'plot': 'No description available'},
+        ])
+
+    def test_unexpected_next_data_falls_back_to_dom(self):
+        container = ('<div class="ipc-metadata-list-summary-item__tc"><h3 class="ipc-title__text">1. From DOM</h3>'
+                     '<span class="ipc-rating-star"><span class="ipc-rating-star--rating">6.1</span>'
+                     '<span class="ipc-rating-star--voteCount"> (12K)</span></span></div>')
+        for payload in ('{not json', '{"props": {}}', '{"props": {"pageProps": null}}'):
+            with self.subTest(payload=payload):
+                html = f'<script id="__NEXT_DATA__" type="application/json">{payload}</script>{container}'
+                self.assertIsNone(movie_scraper.parse_next_data(html))
+                self.assertEqual(movie_scraper.parse_search_page(html),
+                                 [{'title': 'From DOM', 'rating': '6.1', 'plot': 'No description available'}])
+
+
+class TestWarmUp(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cookie_file = os.path.join(self.temp_dir.name, 'cookies.json')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _session(self):
+        """A real session whose requests set an IMDb cookie instead of hitting the network."""
+        session = requests.Session()
+        session.requested = []
+
+        def fake_get(url, headers=None):
+            session.requested.append(url)
+            session.cookies.set('session-id', '123-456', domain='.imdb.com', path='/',
+                                expires=int(time.time()) + 3600)
+
+        session.get = fake_get
+        return session
+
+    def test_warm_up_runs_once_per_session(self):
+        session = self._session()
+        self.assertTrue(movie_scraper.warm_up(session, cookie_file=self.cookie_file))
+        self.assertFalse(movie_scraper.warm_up(session, cookie_file=self.cookie_file))
+        self.assertEqual(len(session.requested), 2)
+
+    def test_saved_cookies_skip_warm_up_in_new_session(self):
+        movie_scraper.warm_up(self._session(), cookie_file=self.cookie_file)
+
+        fresh = requests.Session()
+        with patch.object(fresh, 'get') as mock_get:
+            self.assertFalse(movie_scraper.warm_up(fresh, cookie_file=self.cookie_file))
+        mock_get.assert_not_called()
+        self.assertEqual(fresh.cookies.get('session-id', domain='.imdb.com'), '123-456')
+
+    def test_expired_cookies_trigger_warm_up(self):
+        with open(self.cookie_file, 'w', encoding='utf-8') as f:
+            json.dump({'saved_at': time.time(), 'cookies': [{
+                'name': 'session-id', 'value': 'old', 'domain': '.imdb.com',
+                'path': '/', 'expires': int(time.time()) - 10, 'secure': False,
+            }]}, f)
+        self.assertTrue(movie_scraper.warm_up(self._session(), cookie_file=self.cookie_file))
+
+    def test_stale_cookie_file_triggers_warm_up(self):
+        movie_scraper.warm_up(self._session(), cookie_file=self.cookie_file)
+        with open(self.cookie_file, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        saved['saved_at'] -= movie_scraper.settings.COOKIE_MAX_AGE + 1
+        with open(self.cookie_file, 'w', encoding='utf-8') as f:
+            json.dump(saved, f)
+
+        self.assertTrue(movie_scraper.warm_up(self._session(), cookie_file=self.cookie_file))
+
+    def test_force_warm_up(self):
+        session = self._session()
+        movie_scraper.warm_up(session, cookie_file=self.cookie_file)
+        self.assertTrue(movie_scraper.warm_up(session, cookie_file=self.cookie_file, force=True))
+
+
+
+class TestGetMoviesManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir.name)
+        self.addCleanup(os.chdir, cwd)
+        for name, value in (('warm_up', MagicMock()), ('get_default_cache', MagicMock(return_value=None))):
+            patcher = patch.object(movie_scraper, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.session = MagicMock()
+        self.serve('The First')
+
+    def serve(self, title):
+        html = f'''<div class="lister-item-content"><h3 class="lister-item-header"><a>{title}</a></h3>
+            <div class="ratings-imdb-rating" data-value="7.0"></div></div>'''
+        response = self.session.get.return_value
+        response.status_code = 200
+        response.text = html
+        response.content = html.encode('utf-8')
+
+    def run_get_movies(self, **kwargs):
+        with patch('builtins.print'), \
+                patch.object(movie_scraper, 'parse_search_page', wraps=movie_scraper.parse_search_page) as parse:
+            self.assertTrue(movie_scraper.get_movies(2001, session=self.session, **kwargs))
+        return parse
+
+    def saved_titles(self):
+        with open(os.path.join('DataSets', 'IMDB_Top_50_2001.json'), encoding='utf-8') as f:
+            return [m['title'] for m in json.load(f)]
+
+    def test_unchanged_page_skips_parse_and_writes(self):
+        self.run_get_movies()
+        os.remove('debug.html')
+        mtime = os.path.getmtime(os.path.join('DataSets', 'IMDB_Top_50_2001.json'))
+
+        parse = self.run_get_movies()
+
+        parse.assert_not_called()
+        self.assertFalse(os.path.exists('debug.html'))
+        self.assertEqual(os.path.getmtime(os.path.join('DataSets', 'IMDB_Top_50_2001.json')), mtime)
+
+    def test_changed_page_is_parsed_again(self):
+        self.run_get_movies()
+        self.serve('The Second')
+        parse = self.run_get_movies()
+        parse.assert_called_once()
+        self.assertEqual(self.saved_titles(), ['The Second'])
+
+    def test_missing_dataset_is_rebuilt(self):
+        self.run_get_movies()
+        os.remove(os.path.join('DataSets', 'IMDB_Top_50_2001.json'))
+        self.run_get_movies().assert_called_once()
+        self.assertEqual(self.saved_titles(), ['The First'])
+
+    def test_parses_and_saves_raw_bytes(self):
+        html = '<div class="lister-item-content"><h3 class="lister-item-header"><a>Amélie</a></h3></div>'
+        response = self.session.get.return_value
+        response.content = html.encode('cp1252')
+        response.headers = {'Content-Type': 'text/html; charset=windows-1252'}
+        type(response).text = PropertyMock(side_effect=AssertionError('response.text was decoded'))
+
+        self.run_get_movies()
+
+        with open('debug.html', 'rb') as f:
+            self.assertEqual(f.read(), html.encode('cp1252'))
+        self.assertEqual(self.saved_titles(), ['Amélie'])
+
+    def test_parser_argument_and_setting(self):
+        with patch('settings.SEARCH_PARSER', 'html5lib'):
+            self.assertEqual(self.run_get_movies().call_args.kwargs['parser'], 'html5lib')
+            self.serve('The Second')
+            self.assertEqual(self.run_get_movies(parser='html.parser').call_args.kwargs['parser'], 'html.parser')
+        self.serve('The Third')
+        self.assertIsNone(self.run_get_movies().call_args.kwargs['parser'])
+
+    def test_force_bypasses_manifest(self):
+        self.run_get_movies()
+        self.run_get_movies(force=True).assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,14 +1,22 @@
+import os
+import threading
+import time
 import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from unittest.mock import patch, MagicMock
 from bs4 import BeautifulSoup
-from movie_scraper_implementation import MovieScraper
+from movie_implementation import Movie
+from movie_scraper_implementation import MovieScraper, _parse_in_worker, movie_from_dict
+from html_parsing import make_soup
+from http_client import get_session
 
 
 class TestMovieScraper(unittest.TestCase):
     
     def setUp(self):
         """Set up test fixtures before each test method."""
-        self.scraper = MovieScraper()
+        self.session = MagicMock()
+        self.scraper = MovieScraper(session=self.session)
     
     def test_init(self):
         """Test MovieScraper initialization."""
@@ -16,8 +24,12 @@ class TestMovieScraper(unittest.TestCase):
         self.assertIn('User-Agent', self.scraper.headers)
         self.assertEqual(self.scraper.headers['User-Agent'], 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
     
-    @patch('movie_scraper_implementation.requests.get')
-    def test_scrape_movies_success(self, mock_get):
+    def test_default_session_is_shared(self):
+        """Test that scrapers without an injected session reuse the shared one."""
+        self.assertIs(MovieScraper().session, get_session())
+        self.assertIs(MovieScraper().session, MovieScraper().session)
+
+    def test_scrape_movies_success(self):
         """Test successful movie scraping."""
         # Mock HTML response
         mock_html = '''
@@ -40,8 +52,8 @@ class TestMovieScraper(unittest.TestCase):
         '''
         
         mock_response = MagicMock()
-        mock_response.text = mock_html
-        mock_get.return_value = mock_response
+        mock_response.content = mock_html.encode('utf-8')
+        self.session.get.return_value = mock_response
         
         result = self.scraper.scrape_movies(2020)
         
@@ -115,33 +127,326 @@ class TestMovieScraper(unittest.TestCase):
         self.assertEqual(result['rating'], '6.8')
         self.assertEqual(result['plot'], 'No description available')
     
-    @patch('movie_scraper_implementation.requests.get')
     def test_scrape_movies_url_construction(self):
         """Test that the correct URL is constructed and called."""
         mock_response = MagicMock()
-        mock_response.text = '<div class="lister-item-content"></div>'
+        mock_response.content = b'<div class="lister-item-content"></div>'
         
-        with patch('movie_scraper_implementation.requests.get') as mock_get:
-            mock_get.return_value = mock_response
-            
-            self.scraper.scrape_movies(2021)
-            
-            expected_url = "https://www.imdb.com/search/title/?title_type=feature&release_date=2021&sort=num_votes,desc&count=50"
-            mock_get.assert_called_once_with(expected_url, headers=self.scraper.headers)
+        self.session.get.return_value = mock_response
+
+        self.scraper.scrape_movies(2021)
+
+        expected_url = "https://www.imdb.com/search/title/?title_type=feature&release_date=2021&sort=num_votes,desc&count=50"
+        self.session.get.assert_called_once_with(expected_url, headers=self.scraper.headers, timeout=15)
     
-    @patch('movie_scraper_implementation.requests.get')
     def test_scrape_movies_empty_results(self):
         """Test handling when no movie containers are found."""
         mock_response = MagicMock()
-        mock_response.text = '<html><body>No movies found</body></html>'
+        mock_response.content = b'<html><body>No movies found</body></html>'
         
-        with patch('movie_scraper_implementation.requests.get') as mock_get:
-            mock_get.return_value = mock_response
-            
-            result = self.scraper.scrape_movies(1900)
-            
-            self.assertEqual(result, [])
+        self.session.get.return_value = mock_response
+
+        result = self.scraper.scrape_movies(1900)
+
+        self.assertEqual(result, [])
+
+
+    def _year_page(self, year):
+        return f'''
+        <div class="lister-item-content">
+            <h3 class="lister-item-header"><a>Movie of {year}</a></h3>
+            <div class="ratings-imdb-rating" data-value="7.0"></div>
+            <p class="text-muted">Genre info</p>
+            <p class="text-muted">Plot for {year}.</p>
+        </div>
+        '''
+
+    def test_scrape_years_returns_results_keyed_by_year(self):
+        """Test that every requested year is scraped over the scraper's session."""
+        def fake_get(url, headers=None, timeout=None):
+            response = MagicMock()
+            year = url.split('release_date=')[1].split('&')[0]
+            response.content = self._year_page(year).encode('utf-8')
+            return response
+
+        self.session.get.side_effect = fake_get
+
+        results, errors = self.scraper.scrape_years([2019, 2020, 2021], max_workers=2)
+
+        self.assertEqual(self.session.get.call_count, 3)
+        self.assertEqual(errors, {})
+        self.assertEqual(list(results), [2019, 2020, 2021])
+        self.assertEqual(results[2020][0]['title'], 'Movie of 2020')
+        self.assertEqual(results[2021][0]['plot'], 'Plot for 2021.')
+
+    def test_scrape_years_reports_failures_per_year(self):
+        """Test that one failing year does not stop the rest of the batch."""
+        def fake_get(url, headers=None, timeout=None):
+            response = MagicMock()
+            if 'release_date=1999' in url:
+                response.raise_for_status.side_effect = Exception("503 Server Error")
+            response.content = self._year_page(2000).encode('utf-8')
+            return response
+
+        self.session.get.side_effect = fake_get
+
+        results, errors = self.scraper.scrape_years([1999, 2000], max_workers=2)
+
+        self.assertEqual(list(results), [2000])
+        self.assertEqual(list(errors), [1999])
+        self.assertIn('503', str(errors[1999]))
+
+    def test_scrape_years_empty_input(self):
+        """Test that an empty batch returns empty results without any requests."""
+        self.assertEqual(self.scraper.scrape_years([]), ({}, {}))
+
+    def test_scrape_years_rejects_invalid_worker_count(self):
+        """Test that max_workers must be positive."""
+        with self.assertRaises(ValueError):
+            self.scraper.scrape_years([2020], max_workers=0)
+
+    def _year_get(self, url, headers=None, timeout=None):
+        response = MagicMock()
+        year = url.split('release_date=')[1].split('&')[0]
+        if year == '1999':
+            response.raise_for_status.side_effect = Exception("503 Server Error")
+        response.content = self._year_page(year).encode('utf-8')
+        return response
+
+    def test_scrape_years_pipelined_parses_in_processes(self):
+        """Test that the process-pool pipeline gives the same results as scrape_years."""
+        self.session.get.side_effect = self._year_get
+        years = [1999, 2018, 2019, 2020]
+
+        results, errors = self.scraper.scrape_years_pipelined(years, fetch_workers=2, parse_workers=2)
+
+        self.assertEqual((results, list(errors)), (self.scraper.scrape_years(years)[0], [1999]))
+        self.assertEqual(list(results), [2018, 2019, 2020])
+        self.assertEqual(results[2019][0]['title'], 'Movie of 2019')
+
+    def test_pipeline_workers_parse_without_session_or_cache(self):
+        """Test that the parse worker entry point builds neither a session nor a cache."""
+        html = self._year_page(2020).encode('utf-8')
+        with patch('movie_scraper_implementation.get_session', side_effect=AssertionError('session')), \
+                patch('movie_scraper_implementation.get_default_cache', side_effect=AssertionError('cache')), \
+                patch.dict('movie_scraper_implementation._worker_scrapers', clear=True):
+            movies = _parse_in_worker(MovieScraper, 'html.parser', html)
+        self.assertEqual(movies[0]['title'], 'Movie of 2020')
+
+    def test_search_parser_setting(self):
+        """Test that ELK_SEARCH_PARSER applies unless the scraper names a parser."""
+        html = self._year_page(2020)
+        with patch('settings.SEARCH_PARSER', 'html.parser'), \
+                patch('movie_scraper_implementation.make_soup', wraps=make_soup) as soup:
+            MovieScraper.for_parsing().parse_page(html)
+            MovieScraper.for_parsing('html5lib').parse_page(html)
+        self.assertEqual([c.args[1] for c in soup.call_args_list], ['html.parser', 'html5lib'])
+
+    def test_pipeline_pool_is_not_forked(self):
+        """Test that parse processes are not forked from the threaded parent."""
+        self.session.get.side_effect = self._year_get
+        with patch('movie_scraper_implementation.ProcessPoolExecutor', wraps=ProcessPoolExecutor) as pool:
+            results, _ = self.scraper.scrape_years_pipelined([2020], parse_workers=1)
+        self.assertEqual(list(results), [2020])
+        self.assertNotEqual(pool.call_args.kwargs['mp_context'].get_start_method(), 'fork')
+
+    def test_scrape_years_pipelined_reports_parse_failures(self):
+        """Test that a page the parser chokes on only fails its own year."""
+        self.session.get.side_effect = self._year_get
+        real_parse = MovieScraper.parse_page
+
+        def parse_page(scraper, html, strained=None, encoding=None):
+            if b'2020' in html:
+                raise ValueError("bad page")
+            return real_parse(scraper, html, strained, encoding)
+
+        with patch.object(MovieScraper, 'parse_page', parse_page), ThreadPoolExecutor(2) as pool:
+            results, errors = self.scraper.scrape_years_pipelined([2020, 2021], parse_executor=pool)
+
+        self.assertEqual(list(results), [2021])
+        self.assertIsInstance(errors[2020], ValueError)
+
+    def test_scrape_years_pipelined_survives_a_dead_fetcher(self):
+        """Test that a fetch thread dying outside its error handling fails its year instead of hanging."""
+        class WorkerDied(BaseException):
+            pass
+
+        def get(url, headers=None, timeout=None):
+            if 'release_date=2020' in url:
+                raise WorkerDied()
+            return self._year_get(url)
+
+        self.session.get.side_effect = get
+        with ThreadPoolExecutor(1) as pool:
+            results, errors = self.scraper.scrape_years_pipelined([2020, 2021], parse_executor=pool)
+
+        self.assertEqual(list(results), [2021])
+        self.assertIsInstance(errors[2020], RuntimeError)
+
+    def test_scrape_years_pipelined_applies_backpressure(self):
+        """Test that fetchers stop getting ahead once the page queue is full."""
+        lock = threading.Lock()
+        counts = {'fetched': 0, 'parsed': 0, 'ahead': 0}
+
+        def fake_get(url, headers=None, timeout=None):
+            with lock:
+                counts['fetched'] += 1
+                counts['ahead'] = max(counts['ahead'], counts['fetched'] - counts['parsed'])
+            return self._year_get(url)
+
+        real_parse = MovieScraper.parse_page
+
+        def slow_parse(scraper, html, strained=None, encoding=None):
+            time.sleep(0.02)
+            with lock:
+                counts['parsed'] += 1
+            return real_parse(scraper, html, strained, encoding)
+
+        self.session.get.side_effect = fake_get
+        with patch.object(MovieScraper, 'parse_page', slow_parse), ThreadPoolExecutor(1) as pool:
+            results, _ = self.scraper.scrape_years_pipelined(
+                range(2000, 2030), fetch_workers=3, parse_workers=1, queue_size=2, parse_executor=pool)
+
+        self.assertEqual(len(results), 30)
+        # queued pages + the one being parsed + one in hand per fetcher
+        self.assertLessEqual(counts['ahead'], 2 + 1 + 3)
+
+    def test_scrape_years_pipelined_rejects_invalid_worker_counts(self):
+        with self.assertRaises(ValueError):
+            self.scraper.scrape_years_pipelined([2020], fetch_workers=0)
+        with self.assertRaises(ValueError):
+            self.scraper.scrape_years_pipelined([2020], parse_workers=0)
+        self.assertEqual(self.scraper.scrape_years_pipelined([]), ({}, {}))
+
+    def _paged_get(self, total, requested):
+        """Fake session.get serving ``total`` movies in pages sized by the count param."""
+        def fake_get(url, headers=None, timeout=None):
+            requested.append(url)
+            query = dict(part.split('=') for part in url.split('?')[1].split('&'))
+            start, count = int(query['start']), int(query['count'])
+            items = ''.join(
+                f'''<div class="lister-item-content">
+                    <h3 class="lister-item-header"><a>Movie {n}</a></h3>
+                </div>'''
+                for n in range(start, min(start + count, total + 1))
+            )
+            response = MagicMock()
+            response.content = f'<html><body>{items}</body></html>'.encode('utf-8')
+            return response
+        return fake_get
+
+    def test_stream_movies_walks_pages_by_offset(self):
+        """Test that paginated mode yields every movie across pages in order."""
+        requested = []
+        self.session.get.side_effect = self._paged_get(23, requested)
+
+        titles = [m['title'] for m in self.scraper.stream_movies(2020, page_size=10)]
+
+        self.assertEqual(titles, [f'Movie {n}' for n in range(1, 24)])
+        self.assertIn('count=10&start=21', requested[2])
+        self.assertEqual(len(requested), 3)
+
+    def test_stream_movies_respects_max_results(self):
+        """Test that streaming stops after max_results without extra pages."""
+        requested = []
+        self.session.get.side_effect = self._paged_get(100, requested)
+
+        movies = list(self.scraper.stream_movies(2020, page_size=10, max_results=15))
+
+        self.assertEqual(len(movies), 15)
+        self.assertEqual(len(requested), 2)
+
+    def test_stream_movies_prefetches_next_page(self):
+        """Test that the next page is requested before the current one is consumed."""
+        requested = []
+        self.session.get.side_effect = self._paged_get(100, requested)
+
+        stream = self.scraper.stream_movies(2020, page_size=10)
+        self.assertEqual(next(stream)['title'], 'Movie 1')
+        for _ in range(100):
+            if len(requested) >= 2:
+                break
+            time.sleep(0.01)
+        stream.close()
+
+        self.assertIn('start=11', requested[1])
+
+    def test_stream_movies_stops_on_repeated_page(self):
+        """Test that a page repeated past the end does not loop forever."""
+        self.session.get.return_value.content = self._year_page(2020).encode('utf-8')
+
+        movies = list(self.scraper.stream_movies(2020, page_size=1))
+
+        self.assertEqual(len(movies), 1)
+
+    def test_strained_parse_matches_full_parse(self):
+        """Test that parsing only the result containers gives identical movies."""
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'imdb_search_old_layout.html')
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+
+        full = self.scraper.parse_page(html, strained=False)
+        strained = self.scraper.parse_page(html, strained=True)
+
+        self.assertEqual(len(full), 50)
+        self.assertEqual(strained, full)
+
+    def test_strained_parse_edge_cases(self):
+        """Test that untitled containers and missing fields behave the same strained or not."""
+        html = '''
+        <html><head><script>var x = "<div class='lister-item-content'>";</script></head>
+        <body>
+        <div class="lister-item-content"><p class="text-muted">No title here</p></div>
+        <div class="lister-item mode-advanced"><div class="lister-item-content">
+            <h3 class="lister-item-header"><a>Only Title</a></h3>
+        </div></div>
+        <div class="lister-item-content extra">
+            <h3 class="lister-item-header"><a>Second</a></h3>
+            <div class="ratings-imdb-rating" data-value="6.5"></div>
+            <p class="text-muted">Genre</p><p class="text-muted">Plot &amp; more</p>
+        </div>
+        </body></html>
+        '''
+        self.assertEqual(self.scraper.parse_page(html, strained=True), self.scraper.parse_page(html, strained=False))
+        self.assertEqual([m['title'] for m in self.scraper.parse_page(html)], ['Only Title', 'Second'])
+
+    def test_iter_movies_yields_typed_movies(self):
+        """Test that iter_movies yields Movie objects with float ratings and None for N/A."""
+        page = self._year_page(2020) + '''
+        <div class="lister-item-content"><h3 class="lister-item-header"><a>Unrated</a></h3></div>'''
+        self.session.get.return_value.content = page.encode('utf-8')
+
+        movies = list(self.scraper.iter_movies(2020))
+
+        self.assertTrue(all(isinstance(m, Movie) for m in movies))
+        self.assertEqual([(m.title, m.rating) for m in movies], [('Movie of 2020', 7.0), ('Unrated', None)])
+        self.assertEqual(movies[1].plot, 'No description available')
+
+    def test_iter_movies_yields_before_the_page_is_parsed(self):
+        """Test that the first Movie arrives before later containers are parsed."""
+        self.session.get.return_value.content = (self._year_page(2019) + self._year_page(2020)).encode('utf-8')
+        with patch.object(MovieScraper, 'parse_movie_data', autospec=True,
+                          side_effect=MovieScraper.parse_movie_data) as parse:
+            movies = self.scraper.iter_movies(2020)
+            self.assertEqual(next(movies).title, 'Movie of 2019')
+            self.assertEqual(parse.call_count, 1)
+            self.assertEqual(next(movies).title, 'Movie of 2020')
+
+    def test_iter_movies_for_years(self):
+        """Test that the multi-year iterator tags movies with their year, in order."""
+        self.session.get.side_effect = self._year_get
+
+        pairs = [(year, movie.title) for year, movie in self.scraper.iter_movies_for_years([2019, 2020, 2019])]
+
+        self.assertEqual(pairs, [(2019, 'Movie of 2019'), (2020, 'Movie of 2020')])
+        self.assertEqual(self.session.get.call_count, 2)
+        with self.assertRaises(Exception):
+            list(self.scraper.iter_movies_for_years([1999]))
 
+    def test_movie_from_dict(self):
+        movie = movie_from_dict({'title': 'T', 'rating': '8.1', 'plot': 'P'})
+        self.assertEqual(movie.to_json(), {'title': 'T', 'rating': 8.1, 'plot': 'P'})
+        self.assertIsNone(movie_from_dict({'title': 'T', 'rating': 'N/A', 'plot': 'P'}).rating)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,115 @@
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+import page_archive
+from http_client import fetch
+from page_archive import PageArchive, read_segment
+
+URL = 'https://www.imdb.com/search/title/?release_date=2020'
+DAY = 1_760_000_000.0
+
+
+def make_response(status, body=b'', headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.headers = CaseInsensitiveDict(headers or {})
+    return response
+
+
+class TestPageArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.archive = PageArchive(self.temp_dir.name)
+
+    def test_round_trip(self):
+        self.archive.add(URL, b'<p>caf\xc3\xa9</p>', {'Content-Type': 'text/html; charset=UTF-8'}, fetched_at=DAY)
+        self.archive.add(URL, b'second', fetched_at=DAY + 1)
+
+        first, second = list(self.archive)
+        self.assertEqual((first.url, first.fetched_at, first.status), (URL, DAY, 200))
+        self.assertEqual(first.body, b'<p>caf\xc3\xa9</p>')
+        self.assertEqual(first.encoding, 'utf-8')
+        self.assertEqual(second.body, b'second')
+        self.assertIsNone(second.encoding)
+
+    def test_appends_never_rewrite_earlier_records(self):
+        self.archive.add(URL, b'one', fetched_at=DAY)
+        path, = self.archive.segments()
+        with open(path, 'rb') as f:
+            before = f.read()
+        self.archive.add(URL, b'two', fetched_at=DAY)
+        with open(path, 'rb') as f:
+            self.assertTrue(f.read().startswith(before))
+
+    def test_segments_per_day_in_order(self):
+        self.archive.add(URL, b'later', fetched_at=DAY + 86400)
+        self.archive.add(URL, b'earlier', fetched_at=DAY)
+        self.assertEqual(len(self.archive.segments()), 2)
+        self.assertEqual([page.body for page in self.archive], [b'earlier', b'later'])
+
+    def test_torn_tail_keeps_earlier_records(self):
+        self.archive.add(URL, b'kept', fetched_at=DAY)
+        self.archive.add(URL, b'x' * 1000, fetched_at=DAY)
+        path, = self.archive.segments()
+        with open(path, 'rb') as f:
+            data = f.read()
+        with open(path, 'wb') as f:
+            f.write(data[:-20])
+        self.assertEqual([page.body for page in read_segment(path)], [b'kept'])
+
+    def test_appends_after_a_torn_record_stay_readable(self):
+        self.archive.add('u1', b'one', fetched_at=DAY)
+        path, = self.archive.segments()
+        with open(path, 'rb') as f:
+            record = f.read()
+        # A crash half way through writing a record, then the process restarts and keeps archiving
+        with open(path, 'ab') as f:
+            f.write(record[:len(record) // 2])
+        self.archive.add('u2', b'two', fetched_at=DAY)
+        self.archive.add('u3', b'three', fetched_at=DAY)
+        self.assertEqual([page.url for page in self.archive], ['u1', 'u2', 'u3'])
+        self.assertEqual([page.body for page in self.archive], [b'one', b'two', b'three'])
+
+    def test_needs_a_directory(self):
+        with patch.object(page_archive.settings, 'ARCHIVE_DIR', ''):
+            with self.assertRaises(ValueError):
+                PageArchive()
+            self.assertIsNone(page_archive.get_default_archive())
+
+
+class TestFetchArchives(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.archive = PageArchive(self.temp_dir.name)
+        self.session = MagicMock()
+
+    def test_fresh_pages_are_archived(self):
+        self.session.get.return_value = make_response(200, b'page', {'Content-Type': 'text/html'})
+        fetch(URL, session=self.session, archive=self.archive)
+        page, = list(self.archive)
+        self.assertEqual((page.url, page.body, page.headers), (URL, b'page', {'Content-Type': 'text/html'}))
+
+    def test_errors_are_not_archived(self):
+        self.session.get.return_value = make_response(503, b'busy')
+        fetch(URL, session=self.session, archive=self.archive)
+        self.assertEqual(list(self.archive), [])
+
+    def test_default_archive_comes_from_settings(self):
+        self.session.get.return_value = make_response(200, b'page')
+        with patch.object(page_archive, '_default_archive', None), \
+                patch.object(page_archive.settings, 'ARCHIVE_DIR', self.temp_dir.name):
+            fetch(URL, session=self.session)
+        self.assertEqual([page.body for page in PageArchive(self.temp_dir.name)], [b'page'])
+
+
+if __name__ == '__main__':
+    unittest.main()
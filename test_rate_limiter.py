@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import requests
+
+import http_client
+from rate_limiter import HostRateLimiter, TokenBucket, get_rate_limiter, set_rate_limiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.bucket = TokenBucket(rate=2, capacity=2, clock=self.clock, sleep=self.clock.sleep)
+
+    def test_burst_is_free_then_rate_applies(self):
+        self.bucket.acquire()
+        self.bucket.acquire()
+        self.assertEqual(self.clock.slept, [])
+        self.bucket.acquire()
+        self.assertEqual(self.clock.slept, [0.5])
+
+    def test_refill_is_capped(self):
+        self.clock.now = 100
+        for _ in range(2):
+            self.bucket.acquire()
+        self.bucket.acquire()
+        self.assertEqual(self.clock.slept, [0.5])
+
+    def test_waiters_queue_in_arrival_order(self):
+        self.bucket.reserve()
+        self.bucket.reserve()
+        self.assertEqual(self.bucket.reserve(), 0.5)
+        self.assertEqual(self.bucket.reserve(), 1.0)
+
+    def test_invalid_rate(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0)
+
+    def test_thread_safe_reservations(self):
+        bucket = TokenBucket(rate=1, capacity=1000)
+        threads = [threading.Thread(target=lambda: [bucket.reserve() for _ in range(100)]) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertLessEqual(bucket._tokens, 1000 - 800 + 1)
+
+    def test_acquire_async_sleeps_without_blocking(self):
+        bucket = TokenBucket(rate=2, capacity=1, clock=self.clock)
+        bucket.reserve()
+        with patch('rate_limiter.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+            asyncio.run(bucket.acquire_async())
+        mock_sleep.assert_awaited_once_with(0.5)
+
+
+class TestHostRateLimiter(unittest.TestCase):
+
+    def test_one_bucket_per_host(self):
+        limiter = HostRateLimiter(rate=1, burst=1)
+        self.assertIs(limiter.bucket('https://www.imdb.com/a'), limiter.bucket('https://WWW.IMDB.com/b'))
+        self.assertIsNot(limiter.bucket('https://www.imdb.com/'), limiter.bucket('https://www.xula.edu/'))
+
+    def test_per_host_override_and_unlimited(self):
+        limiter = HostRateLimiter(rate=1, per_host={'www.xula.edu': 0})
+        self.assertIsNone(limiter.bucket('https://www.xula.edu/about'))
+        self.assertEqual(limiter.bucket('www.imdb.com').rate, 1)
+        limiter.acquire('https://www.xula.edu/about')  # must not block
+
+    def test_default_limiter_can_be_replaced(self):
+        custom = HostRateLimiter(rate=0)
+        set_rate_limiter(custom)
+        try:
+            self.assertIs(get_rate_limiter(), custom)
+        finally:
+            set_rate_limiter(None)
+        self.assertIsNot(get_rate_limiter(), custom)
+
+
+class TestRateLimitedSession(unittest.TestCase):
+
+    def test_session_requests_wait_on_limiter(self):
+        limiter = MagicMock()
+        session = http_client.create_session(limiter=limiter)
+        adapter = session.get_adapter('https://www.imdb.com/')
+        sent = requests.Response()
+        sent.status_code = 200
+        with patch.object(requests.adapters.HTTPAdapter, 'send', return_value=sent) as send:
+            request = requests.Request('GET', 'https://www.imdb.com/').prepare()
+            self.assertIs(adapter.send(request), sent)
+        limiter.acquire.assert_called_once_with('https://www.imdb.com/')
+        send.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+import email.utils
+import io
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from http_client import create_session
+from rate_limiter import HostRateLimiter
+from retry_policy import CircuitBreaker, CircuitOpenError, RetryPolicy
+
+
+def make_response(status, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    response.raw = io.BytesIO(b'')
+    return response
+
+
+class TestRetryPolicy(unittest.TestCase):
+
+    def test_exponential_backoff_with_jitter(self):
+        low = RetryPolicy(max_attempts=5, backoff_base=1, backoff_max=30, rand=lambda: 0.0)
+        high = RetryPolicy(max_attempts=5, backoff_base=1, backoff_max=30, rand=lambda: 1.0)
+        self.assertEqual([low.next_delay(a) for a in (1, 2, 3)], [0.5, 1.0, 2.0])
+        self.assertEqual([high.next_delay(a) for a in (1, 2, 3)], [1.0, 2.0, 4.0])
+
+    def test_backoff_is_capped(self):
+        policy = RetryPolicy(max_attempts=20, backoff_base=1, backoff_max=5, rand=lambda: 1.0)
+        self.assertEqual(policy.next_delay(10), 5)
+
+    def test_gives_up_after_max_attempts(self):
+        policy = RetryPolicy(max_attempts=3)
+        self.assertIsNotNone(policy.next_delay(2))
+        self.assertIsNone(policy.next_delay(3))
+
+    def test_retry_after_seconds(self):
+        policy = RetryPolicy(max_attempts=3, backoff_max=30)
+        self.assertEqual(policy.next_delay(1, '7'), 7)
+        self.assertIsNone(policy.next_delay(1, '3600'))
+
+    def test_retry_after_http_date(self):
+        policy = RetryPolicy(max_attempts=3, backoff_max=30)
+        when = email.utils.formatdate(time.time() + 10, usegmt=True)
+        self.assertAlmostEqual(policy.next_delay(1, when), 10, delta=2)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        self.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=lambda: self.now)
+
+    def test_opens_after_consecutive_failures(self):
+        self.breaker.record_failure('imdb')
+        self.breaker.before_request('imdb')
+        self.breaker.record_failure('imdb')
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_request('imdb')
+        self.breaker.before_request('xula')  # other hosts are unaffected
+
+    def test_success_resets_failure_count(self):
+        self.breaker.record_failure('imdb')
+        self.breaker.record_success('imdb')
+        self.breaker.record_failure('imdb')
+        self.assertFalse(self.breaker.is_open('imdb'))
+
+    def test_half_open_allows_single_trial(self):
+        self.breaker.record_failure('imdb')
+        self.breaker.record_failure('imdb')
+        self.now = 11
+        self.breaker.before_request('imdb')
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_request('imdb')
+        self.breaker.record_success('imdb')
+        self.breaker.before_request('imdb')
+
+    def test_failed_trial_reopens(self):
+        self.breaker.record_failure('imdb')
+        self.breaker.record_failure('imdb')
+        self.now = 11
+        self.breaker.before_request('imdb')
+        self.breaker.record_failure('imdb')
+        self.now = 15
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_request('imdb')
+
+    def test_released_trial_lets_next_request_probe(self):
+        self.breaker.record_failure('imdb')
+        self.breaker.record_failure('imdb')
+        self.now = 11
+        self.assertTrue(self.breaker.before_request('imdb'))
+        self.breaker.release_trial('imdb')
+        self.assertTrue(self.breaker.before_request('imdb'))
+
+
+class TestScraperAdapterRetries(unittest.TestCase):
+
+    def setUp(self):
+        self.sleep = MagicMock()
+        self.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+        self.session = create_session(
+            limiter=HostRateLimiter(rate=0),
+            retry=RetryPolicy(max_attempts=3, backoff_base=1, sleep=self.sleep, rand=lambda: 0.0),
+            breaker=self.breaker,
+        )
+        send_patch = patch('requests.adapters.HTTPAdapter.send')
+        self.send = send_patch.start()
+        self.addCleanup(send_patch.stop)
+
+    def test_retries_5xx_then_succeeds(self):
+        self.send.side_effect = [make_response(503), make_response(200)]
+        response = self.session.get('https://www.imdb.com/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.send.call_count, 2)
+        self.sleep.assert_called_once_with(0.5)
+
+    def test_honours_retry_after_on_429(self):
+        self.send.side_effect = [make_response(429, {'Retry-After': '4'}), make_response(200)]
+        self.session.get('https://www.imdb.com/')
+        self.sleep.assert_called_once_with(4.0)
+        self.assertFalse(self.breaker.is_open('www.imdb.com'))
+
+    def test_retries_connection_errors(self):
+        self.send.side_effect = [requests.ConnectionError('reset'), make_response(200)]
+        self.assertEqual(self.session.get('https://www.imdb.com/').status_code, 200)
+
+    def test_returns_last_response_when_attempts_run_out(self):
+        self.send.side_effect = [make_response(503) for _ in range(3)]
+        response = self.session.get('https://www.imdb.com/')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.send.call_count, 3)
+
+    def test_open_circuit_fails_fast(self):
+        self.send.side_effect = [make_response(503) for _ in range(3)]
+        self.session.get('https://www.imdb.com/')
+        self.send.reset_mock()
+        with self.assertRaises(CircuitOpenError):
+            self.session.get('https://www.imdb.com/title/')
+        self.send.assert_not_called()
+
+    def half_open(self):
+        self.now = 0.0
+        self.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: self.now)
+        self.session = create_session(
+            limiter=HostRateLimiter(rate=0),
+            retry=RetryPolicy(max_attempts=1, sleep=self.sleep),
+            breaker=self.breaker,
+        )
+        self.send.side_effect = [make_response(503)]
+        self.session.get('https://www.imdb.com/')
+        self.now = 20
+
+    def test_half_open_trial_answered_with_429_closes_circuit(self):
+        self.half_open()
+        self.send.side_effect = [make_response(429)]
+        self.assertEqual(self.session.get('https://www.imdb.com/').status_code, 429)
+        self.now = 10000
+        self.send.side_effect = [make_response(200)]
+        self.assertEqual(self.session.get('https://www.imdb.com/').status_code, 200)
+
+    def test_half_open_trial_that_raises_is_released(self):
+        self.half_open()
+        self.send.side_effect = [requests.exceptions.InvalidURL('bad')]
+        with self.assertRaises(requests.exceptions.InvalidURL):
+            self.session.get('https://www.imdb.com/')
+        self.send.side_effect = [make_response(200)]
+        self.assertEqual(self.session.get('https://www.imdb.com/').status_code, 200)
+        self.assertFalse(self.breaker.is_open('www.imdb.com'))
+
+    def test_non_idempotent_requests_are_not_retried(self):
+        self.send.side_effect = [make_response(503), make_response(200)]
+        self.assertEqual(self.session.post('https://www.imdb.com/').status_code, 503)
+        self.sleep.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
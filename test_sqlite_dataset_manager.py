@@ -0,0 +1,124 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from sqlite_dataset_manager import SQLiteDataSetManager
+
+
+class TestSQLiteDataSetManager(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.manager = SQLiteDataSetManager(self.temp_dir.name)
+        self.addCleanup(self.manager.close)
+        self.sample_movies = [
+            {'title': 'Movie A', 'year': '2020', 'rating': '8.5', 'genre': 'Drama'},
+            {'title': 'Movie B', 'year': '2019', 'rating': '7.2', 'genre': 'Comedy'},
+            {'title': 'Movie C', 'year': '2021', 'rating': 'N/A', 'genre': 'Horror'},
+        ]
+
+    def test_save_and_load_typed_rows(self):
+        self.manager.save_movies(self.sample_movies, 'movies.csv')
+        loaded = self.manager.load_movies('movies.csv')
+        self.assertEqual([m['title'] for m in loaded], ['Movie A', 'Movie B', 'Movie C'])
+        self.assertEqual(loaded[0], {'title': 'Movie A', 'year': 2020, 'rating': 8.5, 'genre': 'Drama'})
+        self.assertIsNone(loaded[2]['rating'])
+
+    def test_save_replaces_and_datasets_are_separate(self):
+        self.manager.save_movies(self.sample_movies, 'a')
+        self.manager.save_movies(self.sample_movies[:1], 'a')
+        self.manager.save_movies([], 'b')
+        self.assertEqual(len(self.manager.load_movies('a')), 1)
+        self.assertEqual(self.manager.load_movies('b'), [])
+        self.assertEqual(self.manager.datasets(), ['a', 'b'])
+
+    def test_uses_wal_and_one_database_file(self):
+        self.manager.save_movies(self.sample_movies, 'movies.csv')
+        mode = self.manager._connection().execute('PRAGMA journal_mode').fetchone()[0]
+        self.assertEqual(mode, 'wal')
+        self.assertTrue(os.path.isfile(os.path.join(self.temp_dir.name, 'datasets.db')))
+
+    def test_invalid_input(self):
+        with self.assertRaises(TypeError):
+            self.manager.save_movies('not a list', 'movies.csv')
+        with self.assertRaises(TypeError):
+            self.manager.save_movies([self.sample_movies[0], 'not a dict'], 'movies.csv')
+        with self.assertRaises(ValueError):
+            self.manager.save_movies([dict(self.sample_movies[0], director='X')], 'movies.csv')
+
+    def test_failed_save_keeps_previous_rows(self):
+        self.manager.save_movies(self.sample_movies, 'movies.csv')
+        with self.assertRaises(TypeError):
+            self.manager.save_movies([self.sample_movies[0], 'not a dict'], 'movies.csv')
+        self.assertEqual(len(self.manager.load_movies('movies.csv')), 3)
+
+    def test_load_missing_dataset(self):
+        with self.assertRaises(FileNotFoundError):
+            self.manager.load_movies('non_existent_file.csv')
+        with self.assertRaises(FileNotFoundError):
+            self.manager.iter_movies('non_existent_file.csv')
+        self.manager.save_movies(self.sample_movies, 'movies.csv')
+        with self.assertRaises(ValueError):
+            self.manager.iter_movies('movies.csv', batch_size=0)
+
+    def test_append_and_iterate_in_batches(self):
+        self.manager.append_movies(self.sample_movies, 'catalog')
+        self.assertEqual(self.manager.append_movies(iter(self.sample_movies), 'catalog'), 3)
+        batches = list(self.manager.iter_movies('catalog', batch_size=4))
+        self.assertEqual([len(batch) for batch in batches], [4, 2])
+        self.assertEqual(next(self.manager.iter_movies('catalog'))['title'], 'Movie A')
+
+    def test_queries(self):
+        self.manager.save_movies(self.sample_movies, 'movies.csv')
+        self.assertEqual([m['year'] for m in self.manager.find_by_title('movies.csv', 'Movie B')], [2019])
+        self.assertEqual([m['title'] for m in self.manager.find_by_year_range('movies.csv', 2020, 2021)],
+                         ['Movie A', 'Movie C'])
+        self.assertEqual([m['title'] for m in self.manager.top_rated('movies.csv', 5)], ['Movie A', 'Movie B'])
+        self.assertEqual(len(self.manager.top_rated('movies.csv', 1)), 1)
+
+    def test_queries_use_indexes(self):
+        self.manager.save_movies(self.sample_movies, 'movies.csv')
+        connection = self.manager._connection()
+        statements = []
+        # The SQL the methods actually run, with their parameters filled in
+        connection.set_trace_callback(statements.append)
+        try:
+            self.manager.load_movies('movies.csv')
+            self.manager.find_by_title('movies.csv', 'Movie B')
+            self.manager.find_by_year_range('movies.csv', 2019, 2020)
+            self.manager.top_rated('movies.csv', 5)
+        finally:
+            connection.set_trace_callback(None)
+        queries = [sql for sql in statements if sql.startswith('SELECT') and 'FROM movies' in sql]
+        self.assertEqual(len(queries), 4)
+        for sql in queries:
+            with self.subTest(sql=sql):
+                plan = ' '.join(row[-1] for row in connection.execute('EXPLAIN QUERY PLAN ' + sql))
+                self.assertIn('USING', plan)
+                self.assertIn('INDEX', plan)
+                self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_threads_get_their_own_connections(self):
+        errors = []
+
+        def worker(n):
+            try:
+                self.manager.append_movies([dict(self.sample_movies[0], title=f'T{n}-{i}') for i in range(50)], 'shared')
+            except Exception as e:
+                errors.append(e)
+            finally:
+                self.manager.close()
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.manager.load_movies('shared')), 200)
+
+
+if __name__ == '__main__':
+    unittest.main()